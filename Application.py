@@ -1,5 +1,10 @@
 import streamlit as st
 
+from dashboard.monitoring import finish_page, start_page
+
+# Mesure de l'exécution de la page (barre latérale de débogage : ?debug=1)
+start_page("accueil")
+
 # Titre principal
 st.title("📊 Application de Visualisation de Données - Centre de Génie Industriel (CGI)")
 
@@ -56,6 +61,9 @@ Utilisez le menu sur le côté pour accéder aux sections suivantes :
 
 - **Publications publiées entre 2019 et 2024** : Découvrez les publications scientifiques du CGI.  
 - **Communications de congrès entre 2019 et 2024** : Explorez les communications de congrès réalisées par les chercheurs du CGI.  
+- **Recherche** : Retrouvez publications et communications par thème (titre, résumé, mots-clés).  
+- **Réseau des co-auteurs** : Explorez les collaborations entre chercheurs (centralités, communautés, évolution).  
+- **Tendances des thématiques** : Repérez les thèmes émergents et en déclin, par famille de publications.  
 """)
 
 # Boutons interactifs
@@ -104,4 +112,6 @@ st.markdown("""
         <span>📞 <strong>Téléphone :</strong> +33 (0)5 63 49 30 00</span>
         <span>✉️ <strong>Email :</strong> <a href="mailto:contact@imt-mines-albi.fr">contact@imt-mines-albi.fr</a></span>
     </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+finish_page()
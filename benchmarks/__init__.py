@@ -0,0 +1 @@
+"""Bancs d'essai hors Streamlit des traitements du tableau de bord."""
@@ -0,0 +1,155 @@
+"""Banc d'essai des traitements de chaque page, hors Streamlit.
+
+Pour chaque taille de corpus, un CSV synthétique est généré (voir
+`benchmarks.synthetic`) puis chaque étape du pipeline est exécutée et mesurée :
+lecture du CSV par blocs et normalisation (dont les dates) comme à
+l'ingestion (`dashboard.data.write_snapshot`), instantané Arrow, tables
+dérivées (auteurs, lieux, mots-clés), cubes de comptage et construction puis
+sérialisation de chaque graphique dans l'état par défaut des pages.
+
+Chaque mesure est écrite sur une ligne JSON (temps réel en secondes, pic de
+mémoire Python en octets, taille de la sérialisation pour les graphiques) :
+
+    python -m benchmarks.run --rows 10000 100000 --output bench.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_ROWS = [10_000, 100_000]
+
+
+# tracemalloc ralentit nettement le code Python pur : --no-memory le désactive
+TRACE_MEMORY = True
+
+
+@contextmanager
+def measure(record):
+    """Mesure le temps réel et le pic mémoire du bloc dans `record`."""
+    if TRACE_MEMORY:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        if TRACE_MEMORY:
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+def page_figures(ds, source):
+    """Graphiques de la page dans son état par défaut : (nom, fonction sans argument)."""
+    from dashboard import figures
+
+    annees = ds.column("Année")
+    years = (int(annees.min()), int(annees.max()))
+    familles = tuple(figures.familles(ds, years))
+    builders = [
+        ("types_bar", lambda: figures.types_bar(ds, years, "Types", "Type")),
+        ("types_cumulative", lambda: figures.types_cumulative(ds, years, "Cumul par type")),
+        ("langues_pie", lambda: figures.langues_pie(ds, years, "Langues")),
+        ("familles_bar", lambda: figures.familles_bar(ds, years, familles, "Familles")),
+        ("familles_cumulative", lambda: figures.familles_cumulative(ds, years, familles, "Cumul par famille")),
+        ("wordcloud", lambda: figures.wordcloud_png(ds, years, familles)),
+        ("parallel_categories", lambda: figures.parallel_categories(ds, years, familles)),
+        ("authors_cumulative", lambda: figures.authors_cumulative(ds, 5)),
+        ("places_cumulative", lambda: figures.places_cumulative(ds, 5)),
+    ]
+    if source == "congres":
+        builders.append(("famille_network", lambda: figures.famille_network(ds, years, familles)))
+    return builders
+
+
+def _payload_size(result):
+    if result is None:
+        return 0
+    if isinstance(result, bytes):
+        return len(result)
+    return len(result.to_json())
+
+
+def run(source, n_rows, workdir, emit):
+    from benchmarks.synthetic import generate, write_csv
+    from dashboard import data, pipeline
+
+    csv_path = Path(workdir) / f"{source}-{n_rows}.csv"
+    write_csv(generate(data.DATASETS[source].path, n_rows), csv_path)
+    spec = data.DatasetSpec(f"bench-{source}-{n_rows}", csv_path, unit=data.DATASETS[source].unit,
+                            excluded_places=data.DATASETS[source].excluded_places)
+    base = {"dataset": source, "rows": n_rows, "csv_bytes": csv_path.stat().st_size}
+
+    def stage(name, fn, *args):
+        record = dict(base, stage=name)
+        with measure(record):
+            result = fn(*args)
+        emit(record)
+        return result
+
+    # Même lecteur que l'ingestion : tout en texte, par blocs de CHUNK_ROWS lignes
+    categories = stage("csv_scan", data.scan_categories, csv_path)
+    chunks = stage("csv_parse", lambda path: list(data._read_csv(path, chunksize=data.CHUNK_ROWS)), csv_path)
+    normalised = stage("normalise", lambda parts: [data.normalise(chunk, categories) for chunk in parts], chunks)
+    del chunks, normalised
+    stage("snapshot_write", data.build_snapshot, spec)
+    ds = stage("snapshot_load", lambda: data.Dataset(spec))
+    stage("authors", lambda: ds.authors)
+    stage("places", lambda: ds.places)
+    stage("keywords", lambda: ds.keywords)
+    stage("cubes", lambda: (ds.cube, ds.date_cube))
+
+    pipeline.clear()
+    for name, build in page_figures(ds, source):
+        record = dict(base, stage=f"figure:{name}")
+        with measure(record):
+            result = build()
+            record["payload_bytes"] = _payload_size(result)
+        emit(record)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="tailles de corpus à mesurer (par exemple 10000 100000 1000000)")
+    parser.add_argument("--dataset", nargs="+", default=["publications", "congres"],
+                        help="CSV réels servant de modèle au corpus synthétique")
+    parser.add_argument("--output", help="fichier JSON lines (sortie standard par défaut)")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire (temps plus fidèles)")
+    args = parser.parse_args(argv)
+
+    global TRACE_MEMORY
+    TRACE_MEMORY = not args.no_memory
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    with tempfile.TemporaryDirectory(prefix="dashboard-bench-") as workdir:
+        # Les instantanés du banc d'essai ne doivent pas polluer le cache de l'application
+        os.environ["DASHBOARD_CACHE_DIR"] = workdir
+        from dashboard import data
+        data.SNAPSHOT_DIR = Path(workdir) / "snapshots"
+        # Mêmes réglages pandas que les points d'entrée de l'application
+        data.enable_copy_on_write()
+
+        meta = {"python": platform.python_version(), "machine": platform.machine()}
+
+        def emit(record):
+            out.write(json.dumps(dict(record, **meta), ensure_ascii=False) + "\n")
+            out.flush()
+
+        for source in args.dataset:
+            for n_rows in args.rows:
+                run(source, n_rows, workdir, emit)
+
+    if out is not sys.stdout:
+        out.close()
+
+
+if __name__ == "__main__":
+    main()
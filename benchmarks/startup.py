@@ -0,0 +1,125 @@
+"""Temps de démarrage à froid de chaque page Streamlit.
+
+Chaque page est exécutée sans navigateur (`streamlit.testing`) dans un
+processus Python neuf, comme pour une première session sur un serveur qui
+vient de démarrer. Pour chaque page sont mesurés :
+
+- `import_seconds` : les imports en tête de la page ;
+- `first_chart_seconds` : du lancement de la page au premier graphique envoyé ;
+- `first_paint_seconds` : l'exécution complète de la page (premier affichage) ;
+- `warm_run_seconds` : une seconde exécution, caches remplis ;
+- `heavy_modules` : les bibliothèques lourdes chargées pendant l'exécution.
+
+Chaque mesure est écrite sur une ligne JSON :
+
+    python -m benchmarks.startup --output startup.jsonl
+    python -m benchmarks.startup --open-sections   # sections repliées dépliées
+
+Les instantanés et graphiques pré-calculés du cache sont utilisés s'ils
+existent : lancer `python -m dashboard.prerender` avant change donc les temps.
+"""
+import argparse
+import ast
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Bibliothèques dont le chargement pèse sur le démarrage
+HEAVY_MODULES = ("matplotlib", "wordcloud", "networkx", "scipy", "plotly.express", "pyarrow")
+
+
+def pages():
+    return [ROOT / "Application.py"] + sorted((ROOT / "pages").glob("*.py"))
+
+
+def page_imports(path):
+    """Instructions `import` de premier niveau de la page."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return compile(ast.Module(body=nodes, type_ignores=[]), str(path), "exec")
+
+
+def measure_page(path, open_sections=False):
+    """Mesures d'une page, dans le processus courant (qui doit être neuf)."""
+    start = time.perf_counter()
+    exec(page_imports(path), {})
+    record = {"import_seconds": round(time.perf_counter() - start, 6)}
+
+    import streamlit as st
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.testing.v1 import AppTest
+
+    # Premier graphique envoyé par la page : `st.plotly_chart` ou `st.image`
+    first_chart = []
+    for method in ("plotly_chart", "image"):
+        original = getattr(DeltaGenerator, method)
+
+        def timed(self, *args, _original=original, **kwargs):
+            if not first_chart:
+                first_chart.append(time.perf_counter())
+            return _original(self, *args, **kwargs)
+
+        setattr(DeltaGenerator, method, timed)
+        # `st.plotly_chart` est lié au conteneur principal dès l'import de streamlit
+        setattr(st, method, getattr(st._main, method))
+
+    at = AppTest.from_file(str(path), default_timeout=600)
+    if open_sections:
+        from dashboard.ui import SECTIONS, section_key
+        for section in SECTIONS:
+            at.session_state[section_key(section)] = True
+
+    before = set(sys.modules)
+    start = time.perf_counter()
+    at.run()
+    record["first_paint_seconds"] = round(time.perf_counter() - start, 6)
+    record["first_chart_seconds"] = round(first_chart[0] - start, 6) if first_chart else None
+    if at.exception:
+        record["exception"] = at.exception[0].message
+    record["heavy_modules"] = sorted(m for m in HEAVY_MODULES if m in set(sys.modules) - before)
+
+    start = time.perf_counter()
+    at.run()
+    record["warm_run_seconds"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", nargs="+", type=Path, default=None, help="pages à mesurer (toutes par défaut)")
+    parser.add_argument("--open-sections", action="store_true", help="déplier les sections repliées des pages")
+    parser.add_argument("--output", help="fichier JSON lines (sortie standard par défaut)")
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        # Processus de mesure d'une seule page
+        print(json.dumps(measure_page(args.child.resolve(), args.open_sections), ensure_ascii=False))
+        return
+
+    meta = {"python": platform.python_version(), "machine": platform.machine(),
+            "open_sections": args.open_sections}
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    for path in args.page or pages():
+        command = [sys.executable, "-m", "benchmarks.startup", "--child", str(path)]
+        if args.open_sections:
+            command.append("--open-sections")
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True)
+        # Démarrage de l'interpréteur compris
+        record = {"page": Path(path).name, "process_seconds": round(time.perf_counter() - start, 6)}
+        record.update(json.loads(result.stdout.strip().splitlines()[-1]))
+        out.write(json.dumps(dict(record, **meta), ensure_ascii=False) + "\n")
+        out.flush()
+
+    if out is not sys.stdout:
+        out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Générateur de corpus synthétiques au schéma des exports HAL.
+
+Le corpus est obtenu en échantillonnant un CSV réel : les colonnes
+catégorielles suivent leurs fréquences observées, les textes (`Titre`,
+`Résumé`…) sont tirés de lignes réelles, et les listes (`Auteurs`, `Lieu`,
+`Mots_clés`) gardent la distribution réelle de leur longueur tout en puisant
+dans des vocabulaires agrandis avec la taille du corpus, avec une popularité
+en loi de Zipf (quelques auteurs et mots-clés très fréquents, une longue
+traîne de noms rares).
+
+    python -m benchmarks.synthetic --rows 100000 --output /tmp/hal-100k.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from dashboard.data import DATASETS
+
+# Colonnes vides de fin de ligne présentes dans les exports réels
+TRAILING_EMPTY_COLUMNS = 4
+
+
+def _zipf_weights(n, exponent=1.1):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _split(column):
+    return column.fillna("").str.split(",").map(lambda items: [i.strip() for i in items if i.strip()])
+
+
+def _vocabulary(observed, target_size, make_extra, rng):
+    """Vocabulaire réel trié par fréquence, complété jusqu'à `target_size`."""
+    real = pd.Series(observed).value_counts().index.tolist()
+    extra = make_extra(max(0, target_size - len(real)), rng)
+    return np.asarray(real + extra, dtype=object)
+
+
+def _lists(template_lengths, pool, n_rows, rng, separator=", "):
+    """Une liste par ligne : longueur tirée des lignes réelles, éléments du vocabulaire."""
+    lengths = rng.choice(template_lengths, size=n_rows)
+    picks = pool[rng.choice(len(pool), size=int(lengths.sum()), p=_zipf_weights(len(pool)))]
+    bounds = np.cumsum(lengths)[:-1]
+    return [separator.join(items) for items in np.split(picks, bounds)]
+
+
+def generate(source, n_rows, seed=0):
+    """Corpus brut de `n_rows` lignes au format du CSV `source`."""
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(source, encoding="utf-8-sig")
+    base = base.loc[:, ~base.columns.str.startswith("Unnamed:")]
+    sample = base.iloc[rng.integers(0, len(base), size=n_rows)].reset_index(drop=True)
+    out = sample.copy()
+
+    # Catégories indépendantes les unes des autres, selon leurs fréquences réelles
+    for col in ["Type", "Langue", "Famille"]:
+        freqs = base[col].value_counts(normalize=True)
+        out[col] = rng.choice(freqs.index.to_numpy(), size=n_rows, p=freqs.to_numpy())
+
+    # Dates : même mélange de granularités que dans le fichier réel
+    years = rng.integers(base["Année"].min(), base["Année"].max() + 1, size=n_rows)
+    months = rng.integers(1, 13, size=n_rows)
+    days = rng.integers(1, 29, size=n_rows)
+    lengths = base["Date"].astype(str).str.len()
+    kind = rng.choice(lengths.to_numpy(), size=n_rows)
+    out["Année"] = years
+    out["Date"] = np.select(
+        [kind == 4, kind == 7],
+        [years.astype(str), np.char.add(np.char.add(years.astype(str), "-"), np.char.zfill(months.astype(str), 2))],
+        default=[f"{d:02d}/{m:02d}/{y}" for d, m, y in zip(days, months, years)],
+    )
+
+    # Auteurs : couples « Nom, Prénom » recombinés pour agrandir le vivier
+    tokens = _split(base["Auteurs"])
+    surnames = [t for items in tokens for t in items[0::2]]
+    firstnames = [t for items in tokens for t in items[1::2]] or ["A."]
+
+    def more_authors(n, rng):
+        s = rng.choice(surnames, size=n)
+        f = rng.choice(firstnames, size=n)
+        return [f"{a}{i}, {b}" for i, (a, b) in enumerate(zip(s, f))]
+
+    pairs = [f"{items[i]}, {items[i + 1]}" for items in tokens for i in range(0, len(items) - 1, 2)]
+    author_pool = _vocabulary(pairs, max(len(set(pairs)), n_rows // 3), more_authors, rng)
+    out["Auteurs"] = _lists([max(1, len(t) // 2) for t in tokens], author_pool, n_rows, rng)
+
+    # Lieux : institutions réelles puis laboratoires fictifs, rarement cités
+    places = _split(base["Lieu"])
+
+    def more_places(n, rng):
+        return [f"Laboratoire synthétique {i} (LS{i})" for i in range(n)]
+
+    place_pool = _vocabulary([p for items in places for p in items], max(50, n_rows // 20), more_places, rng)
+    out["Lieu"] = _lists([len(p) or 1 for p in places], place_pool, n_rows, rng)
+
+    # Mots-clés : le vocabulaire croît moins vite que le corpus (loi de Heaps)
+    keywords = _split(base["Mots_clés"])
+    words = sorted({w for items in keywords for k in items for w in k.split()})
+
+    def more_keywords(n, rng):
+        a = rng.choice(words, size=n)
+        b = rng.choice(words, size=n)
+        return [f"{x} {y} {i}" for i, (x, y) in enumerate(zip(a, b))]
+
+    keyword_pool = _vocabulary([k for items in keywords for k in items], int(30 * n_rows ** 0.6), more_keywords, rng)
+    missing = base["Mots_clés"].isna().mean()
+    out["Mots_clés"] = _lists([len(k) for k in keywords if k], keyword_pool, n_rows, rng)
+    out.loc[rng.random(n_rows) < missing, "Mots_clés"] = np.nan
+
+    return out
+
+
+def write_csv(df, path):
+    """Écrit le corpus comme un export HAL (BOM UTF-8, colonnes vides de fin)."""
+    df = df.copy()
+    for i in range(TRAILING_EMPTY_COLUMNS):
+        df[f" {i}"] = np.nan
+    df.to_csv(path, index=False, encoding="utf-8-sig", header=list(df.columns[:-TRAILING_EMPTY_COLUMNS]) + [""] * TRAILING_EMPTY_COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--source", default="publications", choices=sorted(DATASETS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_csv(generate(DATASETS[args.source].path, args.rows, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
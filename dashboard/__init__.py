@@ -0,0 +1 @@
+"""Briques partagées par les pages Streamlit du tableau de bord du CGI."""
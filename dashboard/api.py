@@ -0,0 +1,322 @@
+"""API HTTP en lecture seule des agrégats du tableau de bord (JSON).
+
+Les autres outils obtiennent ici les comptages et classements affichés par
+les pages, sans ouvrir de session Streamlit :
+
+    python -m dashboard.api --port 8502
+
+Le serveur (bibliothèque standard, un thread par connexion) lit les mêmes
+jeux de données et cubes de comptages que les pages et recharge les CSV
+modifiés de la même façon. Routes (GET) :
+
+- `/api/datasets` : jeux de données du registre, version et années ;
+- `/api/<jeu>/counts?par=Type` : effectifs par `Type`, `Famille` ou `Langue` ;
+- `/api/<jeu>/timeline?par=Famille` : effectifs par valeur et par année ;
+- `/api/<jeu>/authors?n=10` : auteurs les plus prolifiques ;
+- `/api/<jeu>/places?n=10` : lieux les plus fréquents (hors lieux exclus).
+
+Les paramètres reprennent les filtres des pages : `annees=2019-2024` (ou une
+seule année), `famille` (répétable, ignoré par les auteurs et les lieux
+comme sur les pages), `recherche` (requête plein texte) et `dedup=1`
+(quasi-doublons écartés).
+
+Chaque réponse porte un ETag dérivé de la version des données et de la
+requête : un client qui renvoie `If-None-Match` reçoit `304 Not Modified`
+tant que les données n'ont pas changé. Les corps déjà encodés sont gardés en
+mémoire, si bien qu'une requête répétée ne coûte que son analyse.
+"""
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from dashboard import profiling
+from dashboard.data import DATASETS, deduplicate, enable_copy_on_write, get_dataset
+from dashboard.pipeline import node
+
+# Incrémenter cette version invalide les ETag déjà distribués
+API_VERSION = 1
+
+# Nombre de corps de réponse encodés conservés
+MAX_BODIES = 512
+
+# Borne du paramètre `n` des classements
+MAX_TOP = 200
+
+_bodies = OrderedDict()
+_bodies_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    """Requête invalide : renvoyée au client avec le code `status`."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ------------------------ Filtres ------------------------
+
+def _years(ds, value):
+    """Plage d'années `(début, fin)` du paramètre `annees` (toutes par défaut)."""
+    if not value:
+        return ds.years[0], ds.years[-1]
+    try:
+        bounds = [int(v) for v in value.split("-", 1)]
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"annees invalide : {value!r} (attendu : 2019-2024 ou 2022)")
+    return bounds[0], bounds[-1]
+
+
+def _where(familles):
+    return {"Famille": list(familles)} if familles else None
+
+
+@node
+def search_rows(ds, query):
+    rows, _ = ds.search_index.search(query)
+    return rows
+
+
+def _dedup(params):
+    return params.get("dedup") in ("1", "true", "oui")
+
+
+def _view(name, params):
+    """Jeu de données `name` restreint par les paramètres `recherche` et `dedup`."""
+    if name not in DATASETS:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"jeu de données inconnu : {name!r}")
+    ds = get_dataset(name)
+    query = params.get("recherche")
+    if query:
+        ds = ds.subset(search_rows(ds, query))
+    if _dedup(params):
+        ds = deduplicate(ds)
+    return ds
+
+
+# ------------------------ Agrégats ------------------------
+
+def _date_years(dates):
+    return dates.astype("datetime64[Y]").astype(np.int64) + 1970
+
+
+@node(persist=False)
+def counts(ds, by, years, familles):
+    series = ds.cube.counts(by, *years, where=_where(familles))
+    return [{by: label, "count": int(count)} for label, count in series.items()]
+
+
+@node(persist=False)
+def timeline(ds, by, years, familles):
+    table = ds.cube.combinations([by], *years, where=_where(familles))
+    return [
+        {by: label, "Année": int(year), "count": int(count)}
+        for label, year, count in zip(table[by], table["Année"], table["count"])
+    ]
+
+
+@node
+def authors(ds, n, years):
+    """Auteurs les plus prolifiques ; sur une plage d'années, selon leurs publications de la plage."""
+    ranking, series = ds.authors
+    if years is not None:
+        annees = _date_years(series["Date"].to_numpy())
+        in_range = series[(annees >= years[0]) & (annees <= years[1])]
+        totals = in_range.groupby("author_key", sort=False)["Nombre de publications"].sum()
+        # À égalité, l'ordre du classement général est conservé
+        totals = totals.reindex([k for k in ranking if k in totals.index])
+        top = totals.sort_values(ascending=False, kind="stable").head(n)
+    else:
+        totals = series.groupby("author_key", sort=False)["Nombre de publications cumulées"].max()
+        top = totals.reindex(ranking[:n])
+    names = series.drop_duplicates("author_key").set_index("author_key")["Auteur"]
+    return [{"Auteur": names[key], "count": int(count)} for key, count in top.items()]
+
+
+@node
+def places(ds, n, years):
+    """Lieux les plus fréquents hors lieux exclus ; sur une plage d'années, selon ses publications."""
+    index = ds.places
+    if years is None:
+        ids = index.top(n, exclude=ds.excluded_places)
+        return [{"Lieu": index.names[i], "count": int(index.totals[i])} for i in ids]
+    codes = np.repeat(np.arange(len(index.names)), np.diff(index.series_offsets))
+    annees = _date_years(index.series_dates)
+    in_range = (annees >= years[0]) & (annees <= years[1])
+    totals = np.bincount(codes[in_range], weights=index.series_counts[in_range], minlength=len(index.names))
+    excluded = np.isin(index.names, ds.excluded_places)
+    order = np.argsort(-totals, kind="stable")
+    ids = [i for i in order if totals[i] > 0 and not excluded[i]][:n]
+    return [{"Lieu": index.names[i], "count": int(totals[i])} for i in ids]
+
+
+# ------------------------ Routes ------------------------
+
+def _by(ds, params):
+    by = params.get("par", "Type")
+    if by not in ds.cube.dims:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"par invalide : {by!r} (valeurs : {', '.join(ds.cube.dims)})")
+    return by
+
+
+def _top(params):
+    try:
+        n = int(params.get("n", 10))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "n doit être un entier")
+    return min(max(n, 1), MAX_TOP)
+
+
+# Route → (agrégat, arguments tirés du jeu de données et des paramètres)
+ROUTES = {
+    "counts": (counts, lambda ds, p: (_by(ds, p), _years(ds, p.get("annees")), p["famille"])),
+    "timeline": (timeline, lambda ds, p: (_by(ds, p), _years(ds, p.get("annees")), p["famille"])),
+    "authors": (authors, lambda ds, p: (_top(p), _years(ds, p["annees"]) if p.get("annees") else None)),
+    "places": (places, lambda ds, p: (_top(p), _years(ds, p["annees"]) if p.get("annees") else None)),
+}
+
+
+def _params(query):
+    """Paramètres de la requête : dernière valeur de chacun, familles triées."""
+    raw = parse_qs(query)
+    params = {key: values[-1] for key, values in raw.items()}
+    params["famille"] = tuple(sorted(set(raw.get("famille", ()))))
+    return params
+
+
+def _datasets():
+    return [
+        {"name": name, "label": spec.label, "kind": spec.kind, "version": ds.version,
+         "rows": len(ds), "years": ds.years}
+        for name, spec in DATASETS.items()
+        for ds in [get_dataset(name)]
+    ]
+
+
+def _etag(*parts):
+    digest = hashlib.blake2b(repr((API_VERSION,) + parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def respond(path, query=""):
+    """`(etag, corps JSON)` de la requête GET `path?query` ; lève `ApiError` sinon."""
+    parts = [p for p in path.split("/") if p]
+    if parts == ["api", "datasets"]:
+        versions = tuple(get_dataset(name).version for name in DATASETS)
+        return _cached(_etag("datasets", versions), lambda: {"datasets": _datasets()})
+    if len(parts) != 3 or parts[0] != "api":
+        raise ApiError(HTTPStatus.NOT_FOUND, f"route inconnue : {path}")
+    _, name, route = parts
+    if route not in ROUTES:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"route inconnue : {route!r} (routes : {', '.join(ROUTES)})")
+
+    params = _params(query)
+    ds = _view(name, params)
+    aggregate, arguments = ROUTES[route]
+    args = arguments(ds, params)
+    filters = {"recherche": params.get("recherche"), "dedup": _dedup(params)}
+
+    def build():
+        with profiling.span(f"api:{route}"):
+            data = aggregate(ds, *args)
+        return {"dataset": name, "version": ds.version, "rows": len(ds), "arguments": args,
+                "filters": filters, "data": data}
+
+    return _cached(_etag(route, ds.version, args, filters), build)
+
+
+def _cached(etag, build):
+    with _bodies_lock:
+        body = _bodies.get(etag)
+        if body is not None:
+            _bodies.move_to_end(etag)
+            return etag, body
+    body = json.dumps(build(), ensure_ascii=False, default=str).encode("utf-8")
+    with _bodies_lock:
+        _bodies[etag] = body
+        while len(_bodies) > MAX_BODIES:
+            _bodies.popitem(last=False)
+    return etag, body
+
+
+# ------------------------ Serveur ------------------------
+
+def _matches(header, etag):
+    """Vrai si l'en-tête `If-None-Match` désigne `etag`."""
+    if not header:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Connexions persistantes : un client peut enchaîner ses requêtes
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps sont écrits séparément : sans cela, l'algorithme de
+    # Nagle retarde chaque réponse d'une connexion persistante
+    disable_nagle_algorithm = True
+    server_version = "DashboardAPI/1"
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            etag, body = respond(url.path, url.query)
+        except ApiError as error:
+            self._send(error.status, json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8"))
+            return
+        if _matches(self.headers.get("If-None-Match"), etag):
+            self._send(HTTPStatus.NOT_MODIFIED, b"", etag)
+        else:
+            self._send(HTTPStatus.OK, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            # Les clients revalident à chaque fois : la réponse change avec les données
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def serve(host="127.0.0.1", port=8502, quiet=False):
+    """Sert l'API jusqu'à l'interruption du processus."""
+    enable_copy_on_write()
+    Handler.quiet = quiet
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    print(f"API du tableau de bord sur http://{host}:{server.server_port}/api/datasets")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--quiet", action="store_true", help="ne pas journaliser chaque requête")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.quiet)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Graphiques pré-calculés par `python -m dashboard.prerender`.
+
+Les nœuds déclarés avec un format d'artefact (`@node(artefact="plotly")`)
+cherchent leur résultat sur disque avant de le calculer : une première
+visite sur un état pré-calculé est alors aussi rapide qu'une visite suivante.
+Les fichiers sont rangés par jeu de données, par version et par empreinte du
+code (`store.CODE_VERSION`), puis nommés d'après le nœud et l'empreinte de
+ses arguments : après un déploiement qui modifie le paquet, les graphiques
+pré-calculés par l'ancien code ne sont plus relus.
+"""
+import hashlib
+import warnings
+
+import plotly.io as pio
+
+from dashboard.data import CACHE_DIR
+from dashboard.files import atomic_path
+from dashboard.store import CODE_VERSION
+
+ARTEFACT_DIR = CACHE_DIR / "figures"
+
+# Extension, écriture et lecture de chaque format
+FORMATS = {
+    "plotly": (".json", lambda path, fig: path.write_text(fig.to_json(), encoding="utf-8"),
+               lambda path: pio.from_json(path.read_text(encoding="utf-8"))),
+    "png": (".png", lambda path, data: path.write_bytes(data), lambda path: path.read_bytes()),
+}
+
+# État du pré-rendu dans ce processus (cf. `start_recording`)
+_recording = False
+_image_formats = ()
+recorded = []
+
+
+def start_recording(image_formats=()):
+    """Écrit désormais les artefacts calculés, avec leurs images `image_formats`."""
+    global _recording, _image_formats
+    _recording = True
+    _image_formats = tuple(image_formats)
+
+
+def directory(dataset, version, code=CODE_VERSION):
+    """Dossier des artefacts de la version `version` du jeu `dataset`, calculés par le code `code`."""
+    return ARTEFACT_DIR / dataset / f"{version}-{code}"
+
+
+def version_dir(ds):
+    return directory(ds.name, ds.version)
+
+
+def artefact_path(ds, name, args, artefact):
+    digest = hashlib.blake2b(repr(args).encode(), digest_size=8).hexdigest()
+    extension = FORMATS[artefact][0]
+    return version_dir(ds) / f"{name}-{digest}{extension}"
+
+
+def load(ds, name, args, artefact):
+    """Artefact pré-calculé de `name(ds, *args)`, ou `None` s'il n'existe pas."""
+    path = artefact_path(ds, name, args, artefact)
+    if not path.exists():
+        return None
+    if _recording:
+        recorded.append(path)
+    return FORMATS[artefact][2](path)
+
+
+def save(ds, name, args, artefact, value):
+    """Enregistre `value` si un pré-rendu est en cours."""
+    global _image_formats
+    if not _recording or value is None:
+        return
+    path = artefact_path(ds, name, args, artefact)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Écriture dans un fichier temporaire : plusieurs processus du pré-rendu
+    # peuvent calculer le même graphique
+    with atomic_path(path) as tmp:
+        FORMATS[artefact][1](tmp, value)
+    recorded.append(path)
+
+    if artefact == "plotly":
+        for image in _image_formats:
+            try:
+                # Le format de l'image est déduit de l'extension du fichier
+                with atomic_path(path.with_suffix(f".{image}"), f".tmp.{image}") as tmp:
+                    value.write_image(tmp)
+            except (ImportError, ValueError, RuntimeError) as exc:
+                # kaleido est facultatif : seules les images sont omises
+                warnings.warn(f"Export {image} impossible ({exc}) ; seules les figures JSON sont écrites.")
+                _image_formats = ()
+                break
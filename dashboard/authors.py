@@ -0,0 +1,120 @@
+"""Table longue des auteurs, construite une fois par version des données.
+
+La colonne `Auteurs` des exports HAL alterne nom et prénom séparés par des
+virgules (`Fontanili, Franck, Lauras, Matthieu`). Au lieu de parcourir le
+jeu de données avec `iterrows`, les jetons sont éclatés en une seule passe
+vectorisée puis appariés selon leur position dans la liste ; seules les
+listes irrégulières (virgule dans un nom) sont redécoupées une à une.
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.ingest import append_rows
+from dashboard.resolution import fold, lookup, segment_authors
+
+
+def author_key(names):
+    """Clé de regroupement d'un nom d'auteur (casse et espaces ignorés)."""
+    return names.str.casefold().str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def explode_authors(df):
+    """Éclate `Auteurs` en une ligne par couple (publication, auteur).
+
+    Colonnes produites : `publication_id` (position de la ligne dans le jeu
+    de données), `author_key` (identifiant entier interné), `display_name`
+    (nom canonique, cf. `dashboard.resolution`) et `date`.
+    """
+    tokens = df["Auteurs"].str.split(",").explode().str.strip()
+    tokens = tokens[tokens.notna() & (tokens != "")]
+
+    # Les jetons pairs sont des noms, les jetons impairs les prénoms associés
+    position = tokens.groupby(level=0).cumcount()
+    regular = (tokens.groupby(level=0).transform("size") % 2 == 0).to_numpy()
+    even = regular & (position % 2 == 0).to_numpy()
+    odd = regular & (position % 2 == 1).to_numpy()
+    pairs = pd.DataFrame({
+        "publication_id": tokens.index.to_numpy()[even],
+        "rank": (position.to_numpy() // 2)[even],
+        "surname": tokens.to_numpy()[even],
+        "firstname": tokens.to_numpy()[odd],
+    })
+
+    # Listes de longueur impaire : une virgule appartient à un nom ou à un
+    # prénom, l'alternance est reconstruite à partir des couples réguliers
+    irregular = tokens[~regular]
+    if len(irregular):
+        # Couples réguliers de ce fichier et auteurs déjà résolus ailleurs
+        known = set(pairs[["surname", "firstname"]].itertuples(index=False, name=None))
+        known_pairs = {(fold(s), fold(f)) for s, f in known | set(lookup("auteurs").known())}
+        known_surnames = {s for s, _ in known_pairs}
+        repaired = [
+            (publication_id, rank, surname, firstname)
+            for publication_id, group in irregular.groupby(level=0)
+            for rank, (surname, firstname) in enumerate(segment_authors(group.tolist(), known_pairs, known_surnames))
+        ]
+        pairs = pd.concat(
+            [pairs, pd.DataFrame(repaired, columns=pairs.columns)], ignore_index=True
+        ).sort_values(["publication_id", "rank"], kind="stable", ignore_index=True)
+
+    # Variantes d'un même auteur regroupées sous son nom canonique
+    variants = list(zip(pairs["surname"], pairs["firstname"]))
+    display_name = pd.Series(lookup("auteurs").resolve(variants), index=pairs.index)
+    codes, _ = pd.factorize(author_key(display_name))
+
+    authors = pd.DataFrame({
+        "publication_id": pairs["publication_id"].astype("int32"),
+        "author_key": codes.astype("int32"),
+        "display_name": display_name.astype("category"),
+        "date": df["Date"].to_numpy()[pairs["publication_id"].to_numpy()],
+    })
+    # Un auteur cité sous deux graphies dans la même liste ne compte qu'une fois
+    return authors.drop_duplicates(["publication_id", "author_key"], ignore_index=True)
+
+
+def append_authors(authors, tail, offset):
+    """Ajoute à `authors` la table `tail` des publications ajoutées à partir de `offset`.
+
+    Les auteurs déjà connus gardent leur identifiant ; les nouveaux sont
+    numérotés à la suite, dans leur ordre d'apparition, comme l'aurait fait
+    `explode_authors` sur le fichier complet.
+    """
+    # Identifiant de chaque clé connue, à partir des noms affichés distincts
+    names = authors["display_name"].cat
+    first = pd.Series(authors["author_key"].to_numpy()).groupby(names.codes.to_numpy()).first()
+    keys = author_key(pd.Series(names.categories[first.index.to_numpy()]))
+    known = pd.Series(first.to_numpy(), index=keys.to_numpy())
+    known = known[~known.index.duplicated()]
+
+    tail_names = tail.groupby("author_key", sort=True)["display_name"].first().astype(str)
+    codes = author_key(tail_names).map(known).to_numpy(dtype=float, copy=True)
+    new = np.isnan(codes)
+    start = int(authors["author_key"].max()) + 1 if len(authors) else 0
+    codes[new] = start + np.arange(new.sum())
+
+    tail = tail.assign(
+        publication_id=(tail["publication_id"] + offset).astype("int32"),
+        author_key=codes.astype("int32")[tail["author_key"].to_numpy()],
+    )
+    return append_rows(authors, tail)
+
+
+def author_timeseries(authors):
+    """Prépare le classement et les courbes cumulées de tous les auteurs.
+
+    Renvoie `(ranking, series)` : les `author_key` triés par nombre total de
+    publications décroissant, et le nombre cumulé de publications de chaque
+    auteur à chaque date. Le curseur « nombre d'auteurs » n'a plus qu'à
+    filtrer `series` sur les premiers éléments de `ranking`.
+    """
+    names = authors.groupby("author_key", sort=False)["display_name"].first()
+    counts = authors.groupby(["author_key", "date"], observed=True).size().rename("Nombre de publications")
+    series = counts.reset_index()
+    series["Nombre de publications cumulées"] = series.groupby("author_key")["Nombre de publications"].cumsum()
+    series["Auteur"] = series["author_key"].map(names).astype(str)
+    series = series.rename(columns={"date": "Date"})
+
+    totals = authors["author_key"].value_counts(sort=False)
+    # Tri stable : à égalité, l'ordre de première apparition est conservé
+    ranking = totals.sort_values(ascending=False, kind="stable").index.to_numpy()
+    return ranking, series
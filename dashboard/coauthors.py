@@ -0,0 +1,270 @@
+"""Réseau de co-signature des auteurs.
+
+Deux auteurs sont reliés quand ils ont signé au moins une publication
+ensemble, avec pour poids le nombre de publications communes. Le graphe est
+tenu en matrices creuses (scipy) : la matrice d'incidence publications ×
+auteurs `B`, construite directement depuis la table longue des auteurs, donne
+l'adjacence pondérée par un seul produit `BᵀB`, sans boucle Python sur les
+lignes ni sur les paires d'auteurs.
+
+Quand des publications sont ajoutées (ingestion incrémentale), leurs lignes
+d'incidence sont empilées sous les anciennes et seul leur produit est ajouté
+à l'adjacence existante.
+"""
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import scipy.sparse as sp
+
+from dashboard import profiling
+
+# Nombre de sources tirées pour estimer l'intermédiarité (Brandes échantillonné)
+BETWEENNESS_SAMPLES = 64
+
+# Nombre de dispositions de sous-graphes conservées
+LAYOUT_CACHE_SIZE = 32
+
+
+def incidence(authors, n_publications, n_authors):
+    """Matrice creuse publications × auteurs (1 si l'auteur signe la publication)."""
+    B = sp.csr_matrix(
+        (np.ones(len(authors), dtype=np.int32),
+         (authors["publication_id"].to_numpy(), authors["author_key"].to_numpy())),
+        shape=(n_publications, n_authors),
+    )
+    # Un auteur cité deux fois dans la même liste ne compte qu'une fois
+    B.data = np.minimum(B.data, 1)
+    return B
+
+
+def _cooccurrence(B):
+    """Adjacence pondérée `BᵀB` sans la diagonale."""
+    A = (B.T @ B).tocsr()
+    A.setdiag(0)
+    A.eliminate_zeros()
+    return A
+
+
+def _pairs(A):
+    """Nombre d'arêtes (paires d'auteurs distinctes) d'une adjacence symétrique."""
+    return A.nnz // 2
+
+
+class CoauthorGraph:
+    """Graphe de co-signature d'un jeu de données.
+
+    `authors` est la table longue de `explode_authors` et `years` l'année de
+    chaque publication (par position). Les auteurs sont les `author_key`
+    internés, de 0 à `n_authors - 1`.
+    """
+
+    def __init__(self, authors, years):
+        names = authors.groupby("author_key", sort=True)["display_name"].first()
+        n_authors = int(names.index.max()) + 1 if len(names) else 0
+        self.names = np.full(n_authors, "", dtype=object)
+        self.names[names.index.to_numpy()] = names.astype(str).to_numpy()
+        self.years = np.asarray(years)
+        self.incidence = incidence(authors, len(self.years), n_authors)
+        self.adjacency = _cooccurrence(self.incidence)
+
+    @classmethod
+    def _from_parts(cls, names, years, B, A):
+        graph = cls.__new__(cls)
+        graph.names, graph.years, graph.incidence, graph.adjacency = names, years, B, A
+        return graph
+
+    def extend(self, authors, years):
+        """Graphe après ajout des publications de `authors` (lignes ajoutées seulement).
+
+        `years` est l'année de toutes les publications, anciennes et nouvelles.
+        """
+        n_old_pubs, n_old_authors = self.incidence.shape
+        years = np.asarray(years)
+        n_authors = max(n_old_authors, int(authors["author_key"].max()) + 1 if len(authors) else 0)
+
+        names = np.full(n_authors, "", dtype=object)
+        names[:n_old_authors] = self.names
+        new = authors.groupby("author_key", sort=True)["display_name"].first()
+        new = new[new.index >= n_old_authors]
+        names[new.index.to_numpy()] = new.astype(str).to_numpy()
+
+        tail = incidence(
+            authors.assign(publication_id=authors["publication_id"] - n_old_pubs),
+            len(years) - n_old_pubs, n_authors,
+        )
+        B = sp.vstack([_resize(self.incidence, (n_old_pubs, n_authors)), tail], format="csr")
+        A = _resize(self.adjacency, (n_authors, n_authors)) + _cooccurrence(tail)
+        return CoauthorGraph._from_parts(names, years, B, A.tocsr())
+
+    @property
+    def n_authors(self):
+        return self.adjacency.shape[0]
+
+    @property
+    def n_edges(self):
+        return _pairs(self.adjacency)
+
+    @cached_property
+    def publications(self):
+        """Nombre de publications de chaque auteur."""
+        return np.asarray(self.incidence.sum(axis=0)).ravel()
+
+    @cached_property
+    def degree(self):
+        """Nombre de co-auteurs distincts de chaque auteur."""
+        return np.diff(self.adjacency.indptr)
+
+    @cached_property
+    def strength(self):
+        """Nombre total de co-signatures de chaque auteur (degré pondéré)."""
+        return np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+    @cached_property
+    def degree_centrality(self):
+        return self.degree / max(self.n_authors - 1, 1)
+
+    @cached_property
+    def _nx(self):
+        import networkx as nx
+        return nx.from_scipy_sparse_array(self.adjacency)
+
+    @cached_property
+    def betweenness(self):
+        """Centralité d'intermédiarité, estimée sur `BETWEENNESS_SAMPLES` sources.
+
+        Les chemins sont comptés en nombre de liens, sans tenir compte des poids.
+        """
+        import networkx as nx
+
+        k = min(BETWEENNESS_SAMPLES, self.n_authors)
+        if k == 0:
+            return np.zeros(0)
+        with profiling.span("coauthors:betweenness"):
+            values = nx.betweenness_centrality(self._nx, k=k, normalized=True, seed=0)
+        return np.array([values[i] for i in range(self.n_authors)])
+
+    @cached_property
+    def communities(self):
+        """Communauté de chaque auteur (Louvain), numérotée de la plus grande à la plus petite."""
+        import networkx as nx
+
+        with profiling.span("coauthors:louvain"):
+            groups = nx.community.louvain_communities(self._nx, weight="weight", seed=0)
+        labels = np.empty(self.n_authors, dtype=np.int64)
+        for label, members in enumerate(sorted(groups, key=lambda g: (-len(g), min(g)))):
+            labels[list(members)] = label
+        return labels
+
+    def top(self, n):
+        """Les `n` auteurs les plus connectés (co-signatures, puis publications)."""
+        order = np.lexsort((-self.publications, -self.strength))
+        return order[:n]
+
+    def table(self, ids):
+        """Indicateurs des auteurs `ids`."""
+        return pd.DataFrame({
+            "Auteur": self.names[ids],
+            "Publications": self.publications[ids],
+            "Co-auteurs": self.degree[ids],
+            "Co-signatures": self.strength[ids],
+            "Centralité de degré": self.degree_centrality[ids],
+            "Intermédiarité": self.betweenness[ids],
+            "Communauté": self.communities[ids] + 1,
+        })
+
+    def timeline(self):
+        """Collaboration par année.
+
+        Pour chaque année : publications, part des publications co-signées,
+        nombre moyen d'auteurs, collaborations actives (paires d'auteurs ayant
+        co-signé dans l'année) et nouvelles collaborations (paires jamais
+        observées les années précédentes).
+        """
+        authors_per_pub = np.diff(self.incidence.indptr)
+        rows, seen = [], 0
+        cumulative = None
+        for year in np.unique(self.years):
+            mask = self.years == year
+            B_year = self.incidence[mask]
+            A_year = _cooccurrence(B_year)
+            cumulative = A_year if cumulative is None else cumulative + A_year
+            # Les poids ne font que croître : les nouvelles paires sont les nouveaux non-nuls
+            total = _pairs(cumulative)
+            counts = authors_per_pub[mask]
+            rows.append({
+                "Année": int(year),
+                "Publications": int(mask.sum()),
+                "Part co-signée (%)": 100 * float((counts >= 2).mean()) if len(counts) else 0.0,
+                "Auteurs par publication": float(counts.mean()) if len(counts) else 0.0,
+                "Collaborations actives": _pairs(A_year),
+                "Nouvelles collaborations": total - seen,
+            })
+            seen = total
+        return pd.DataFrame(rows)
+
+    def edges(self, ids):
+        """Arêtes `(i, j, poids)` entre les auteurs `ids` (indices dans `ids`)."""
+        sub = sp.triu(self.adjacency[ids][:, ids], k=1).tocoo()
+        return sub.row, sub.col, sub.data
+
+
+def _resize(matrix, shape):
+    matrix = matrix.tocsr(copy=True)
+    matrix.resize(shape)
+    return matrix
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+@profiling.timed("layout:spring")
+def _layout(n_nodes, edges):
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(range(n_nodes))
+    G.add_weighted_edges_from(edges)
+    pos = nx.spring_layout(G, weight="weight", seed=0, k=2 / np.sqrt(max(n_nodes, 1)))
+    return np.array([pos[i] for i in range(n_nodes)])
+
+
+def layout(n_nodes, rows, cols, weights):
+    """Positions des nœuds d'un sous-graphe, mises en cache selon ses arêtes."""
+    return _layout(n_nodes, tuple(zip(rows.tolist(), cols.tolist(), weights.tolist())))
+
+
+def network_figure(graph, n, title, palette):
+    """Graphe Plotly des `n` auteurs les plus connectés, colorés par communauté."""
+    ids = graph.top(n)
+    rows, cols, weights = graph.edges(ids)
+    fig = go.Figure()
+    if not len(ids):
+        fig.update_layout(title=title)
+        return fig
+
+    pos = layout(len(ids), rows, cols, weights)
+    xs = np.column_stack([pos[rows, 0], pos[cols, 0], np.full(len(rows), np.nan)]).ravel()
+    ys = np.column_stack([pos[rows, 1], pos[cols, 1], np.full(len(rows), np.nan)]).ravel()
+    fig.add_trace(go.Scatter(x=xs, y=ys, mode="lines", hoverinfo="skip", showlegend=False,
+                             line=dict(width=1, color="rgba(128, 128, 128, 0.4)")))
+
+    communities = graph.communities[ids]
+    sizes = graph.publications[ids]
+    fig.add_trace(go.Scatter(
+        x=pos[:, 0], y=pos[:, 1], mode="markers", showlegend=False,
+        marker=dict(
+            size=8 + 22 * np.sqrt(sizes / max(sizes.max(), 1)),
+            color=[palette[c % len(palette)] for c in communities],
+            line=dict(width=1, color="white"),
+        ),
+        hovertext=[
+            f"{name}<br>{p} publications, {d} co-auteurs<br>Communauté {c + 1}"
+            for name, p, d, c in zip(graph.names[ids], sizes, graph.degree[ids], communities)
+        ],
+        hoverinfo="text",
+    ))
+    fig.update_layout(
+        title=title, height=700, plot_bgcolor="white",
+        xaxis=dict(visible=False), yaxis=dict(visible=False),
+    )
+    return fig
@@ -0,0 +1,113 @@
+"""Cube de comptages pré-agrégé sur les colonnes catégorielles.
+
+Le cube est un tableau NumPy dense indexé par les codes des catégories
+(`Type`, `Famille`, `Langue`…) et par un axe de temps trié (`Année` ou
+`Date`). Il stocke les sommes cumulées le long du temps : le nombre de lignes
+d'une plage `[début, fin]` est une simple différence de deux tranches, sans
+parcourir le jeu de données.
+"""
+import numpy as np
+import pandas as pd
+
+
+class CountCube:
+    def __init__(self, frame, dims, time, rows=None):
+        """Cube des lignes de `frame`, ou de ses seules positions `rows`."""
+        self.dims = list(dims)
+        self.time = time
+        self.labels = [np.asarray(frame[d].cat.categories.astype(str), dtype=object) for d in self.dims]
+
+        codes = [frame[d].cat.codes.to_numpy() for d in self.dims]
+        time_values = frame[time].to_numpy()
+        if rows is not None:
+            codes = [c[rows] for c in codes]
+            time_values = time_values[rows]
+        # Les lignes sans catégorie ou sans date ne sont comptées nulle part
+        valid = pd.notna(time_values)
+        for c in codes:
+            valid &= c >= 0
+
+        self.times, time_codes = np.unique(time_values[valid], return_inverse=True)
+        shape = tuple(len(labels) for labels in self.labels) + (len(self.times),)
+        flat = np.ravel_multi_index(tuple(c[valid] for c in codes) + (time_codes,), shape)
+        counts = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+        # prefix[..., t] = nombre de lignes strictement avant le t-ième instant
+        self.prefix = np.zeros(shape[:-1] + (shape[-1] + 1,), dtype=np.int64)
+        np.cumsum(counts, axis=-1, out=self.prefix[..., 1:])
+
+    def _bounds(self, start, end):
+        """Indices `[i, j)` de l'axe du temps couvrant `start <= t <= end`."""
+        return (
+            int(np.searchsorted(self.times, start, side="left")),
+            int(np.searchsorted(self.times, end, side="right")),
+        )
+
+    def _select(self, where):
+        """Restreint le cube aux catégories de `where` (dimension → valeurs)."""
+        prefix, labels = self.prefix, list(self.labels)
+        for dim, values in (where or {}).items():
+            axis = self.dims.index(dim)
+            positions = {label: i for i, label in enumerate(labels[axis])}
+            keep = [positions[v] for v in values if v in positions]
+            prefix = np.take(prefix, keep, axis=axis)
+            labels[axis] = labels[axis][keep]
+        return prefix, labels
+
+    def _marginal(self, array, by):
+        """Somme `array` sur toutes les dimensions sauf `by` et le temps."""
+        axis = self.dims.index(by)
+        others = tuple(k for k in range(len(self.dims)) if k != axis)
+        return array.sum(axis=others)
+
+    def counts(self, by, start, end, where=None):
+        """Nombre de lignes par valeur de `by` entre `start` et `end` inclus.
+
+        Les valeurs absentes sont omises ; le résultat est trié par effectif
+        décroissant, comme `value_counts`.
+        """
+        prefix, labels = self._select(where)
+        i, j = self._bounds(start, end)
+        totals = self._marginal(prefix[..., j] - prefix[..., i], by)
+        series = pd.Series(totals, index=pd.Index(labels[self.dims.index(by)], name=by))
+        return series[series > 0].sort_values(ascending=False, kind="stable")
+
+    def cumulative(self, by, start, end, where=None):
+        """Effectifs et cumuls par (instant, valeur de `by`) entre `start` et `end`.
+
+        Seuls les instants où la valeur apparaît sont renvoyés, triés par
+        instant ; le cumul repart de zéro au début de la plage.
+        """
+        prefix, labels = self._select(where)
+        i, j = self._bounds(start, end)
+        running = self._marginal(prefix[..., i:j + 1] - prefix[..., i:i + 1], by)
+        steps = np.diff(running, axis=-1)
+
+        t_idx, label_idx = np.nonzero(steps.T)
+        return pd.DataFrame({
+            self.time: self.times[i + t_idx],
+            by: labels[self.dims.index(by)][label_idx],
+            "count": steps[label_idx, t_idx],
+            "cumulative": running[label_idx, t_idx + 1],
+        })
+
+    def combinations(self, by, start, end, where=None):
+        """Effectif de chaque combinaison des dimensions `by` et de l'instant.
+
+        Renvoie une ligne par combinaison présente entre `start` et `end` :
+        colonnes `by`, puis la colonne de temps, puis `count`.
+        """
+        prefix, labels = self._select(where)
+        i, j = self._bounds(start, end)
+        axes = [self.dims.index(d) for d in by]
+        others = tuple(k for k in range(len(self.dims)) if k not in axes)
+        counts = np.diff(prefix[..., i:j + 1], axis=-1).sum(axis=others)
+        # Remettre les dimensions dans l'ordre demandé, le temps en dernier
+        order = np.argsort(np.argsort(axes))
+        counts = np.moveaxis(counts, list(order), list(range(len(axes))))
+
+        positions = np.nonzero(counts)
+        columns = {d: labels[self.dims.index(d)][p] for d, p in zip(by, positions[:-1])}
+        columns[self.time] = self.times[i + positions[-1]]
+        columns["count"] = counts[positions]
+        return pd.DataFrame(columns)
@@ -0,0 +1,657 @@
+"""Couche de données partagée par les pages du tableau de bord.
+
+Les jeux de données sont déclarés dans le registre `datasets.toml`. Chaque
+CSV source est lu une seule fois, par blocs : son schéma est normalisé puis
+un instantané Arrow (Feather v2 non compressé) est écrit dans le cache, indexé
+par l'empreinte du fichier source. Les pages relisent ensuite cet instantané
+en mémoire mappée au lieu de re-tokeniser le CSV à chaque démarrage à froid.
+
+Le jeu de données chargé est partagé par toutes les sessions du processus et
+n'est jamais modifié : les filtres produisent des vues (positions de lignes)
+et toute modification d'une table obtenue via `Dataset.frame` reste locale
+grâce au copy-on-write de pandas. Le module ne change pas l'état global de
+pandas : les points d'entrée (pages, API, pré-rendu) l'activent avec
+`enable_copy_on_write` (c'est le comportement par défaut de pandas 3).
+
+Quand un CSV source change, `get_dataset` construit la nouvelle version (en
+n'ingérant que les lignes ajoutées si possible, cf. `dashboard.ingest`) et la
+substitue à l'ancienne pour les exécutions suivantes des pages.
+"""
+import glob
+import hashlib
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+from dashboard import profiling
+from dashboard.authors import append_authors, author_timeseries, explode_authors
+from dashboard.cube import CountCube
+from dashboard.dates import normalise_dates
+from dashboard.files import atomic_path
+from dashboard.ingest import append_rows, is_append, read_tail, source_state
+from dashboard.keywords import append_keywords, explode_keywords
+from dashboard.places import AffiliationIndex, append_places, explode_places
+from dashboard.resolution import lookup
+from dashboard.search import SearchIndex
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data"
+REGISTRY = Path(os.environ.get("DASHBOARD_DATASETS", ROOT / "datasets.toml"))
+CACHE_DIR = Path(os.environ.get("DASHBOARD_CACHE_DIR", ROOT / ".cache"))
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
+
+# Surveiller les CSV sources et recharger les jeux de données modifiés
+HOT_RELOAD = os.environ.get("DASHBOARD_HOT_RELOAD", "1") != "0"
+
+# Incrémenter cette version invalide tous les instantanés déjà écrits
+SCHEMA_VERSION = 3
+
+# Nombre de lignes du CSV lues à la fois : la table brute complète n'est
+# jamais chargée en mémoire, même pour un export très volumineux
+CHUNK_ROWS = 10_000
+
+# Nombre de vues filtrées (résultats de recherche) conservées par jeu de données
+MAX_VIEWS = 32
+
+# Colonnes à faible cardinalité stockées en catégories
+CATEGORY_COLUMNS = ["Type", "Langue", "Famille"]
+
+# Les chaînes Arrow restent adossées au fichier mappé au lieu d'être copiées
+_ARROW_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
+
+
+def enable_copy_on_write():
+    """Active le copy-on-write de pandas, dont dépend l'isolement des sessions.
+
+    Les vues d'un DataFrame partagent alors ses colonnes tant qu'elles ne
+    sont pas modifiées.
+    """
+    if not pd.options.mode.copy_on_write:
+        pd.set_option("mode.copy_on_write", True)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    path: Path
+    label: str = ""
+    # Page qui affiche le jeu de données (« publications » ou « congres »)
+    kind: str = "publications"
+    # Nom des éléments comptés dans les libellés des graphiques
+    unit: str = "publications"
+    # Lieux ignorés par les classements « top N » des institutions
+    excluded_places: tuple = ()
+
+
+# Tables dérivées enregistrées à côté de l'instantané : fonction de
+# construction et fonction d'ajout des lignes d'une ingestion incrémentale
+STAGES = {
+    "auteurs": (explode_authors, append_authors),
+    "lieux": (explode_places, append_places),
+    "mots_cles": (explode_keywords, append_keywords),
+}
+
+
+
+def load_registry(path=REGISTRY):
+    """Jeux de données déclarés dans le registre TOML `path`."""
+    with open(path, "rb") as f:
+        entries = tomllib.load(f)
+    return {
+        name: DatasetSpec(
+            name,
+            path.parent / entry["path"],
+            label=entry.get("label", name),
+            kind=entry.get("kind", "publications"),
+            unit=entry.get("unit", "publications"),
+            excluded_places=tuple(entry.get("excluded_places", ())),
+        )
+        for name, entry in entries.items()
+    }
+
+
+DATASETS = load_registry()
+
+
+def file_hash(path):
+    """Empreinte BLAKE2 du contenu d'un fichier source."""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def normalise(df, categories=None):
+    """Normalise le schéma brut d'un export HAL.
+
+    `categories` fixe les modalités de chaque colonne catégorielle : tous les
+    blocs d'un même fichier partagent alors le même dictionnaire.
+    """
+    # Les lignes se terminent par `,,,,` : ces colonnes n'ont pas d'en-tête
+    df = df.loc[:, ~df.columns.str.startswith("Unnamed:")].copy()
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype(pd.CategoricalDtype(categories[col]) if categories else "category")
+    df["Année"] = df["Année"].astype("int16")
+    # Les dates sont converties une fois pour toutes à l'ingestion
+    with profiling.span("normalise:dates"):
+        df["Date"], df["Précision_date"] = normalise_dates(df["Date"])
+    return df.reset_index(drop=True)
+
+
+def _read_csv(source, **kwargs):
+    # Tout est lu comme du texte : le schéma ne dépend pas du contenu d'un bloc
+    return pd.read_csv(source, encoding="utf-8-sig", dtype=str, **kwargs)
+
+
+def read_source(path):
+    return normalise(_read_csv(path))
+
+
+def scan_categories(path):
+    """Premier passage sur le CSV : modalités triées des colonnes catégorielles."""
+    values = {col: set() for col in CATEGORY_COLUMNS}
+    for chunk in _read_csv(path, usecols=CATEGORY_COLUMNS, chunksize=CHUNK_ROWS):
+        for col in CATEGORY_COLUMNS:
+            values[col].update(chunk[col].dropna())
+    return {col: sorted(v) for col, v in values.items()}
+
+
+def write_snapshot(source, path):
+    """Réduit le CSV `source` à l'instantané Arrow `path`, bloc par bloc.
+
+    Un premier passage relève les modalités des colonnes catégorielles, le
+    second normalise chaque bloc et l'ajoute au fichier Arrow IPC : seul un
+    bloc de `CHUNK_ROWS` lignes brutes est en mémoire à la fois.
+    """
+    categories = scan_categories(source)
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    with atomic_path(path) as tmp:
+        schema, writer = None, None
+        try:
+            for chunk in _read_csv(source, chunksize=CHUNK_ROWS):
+                df = normalise(chunk, categories)
+                if writer is None:
+                    # Une colonne vide dans le premier bloc reste une colonne de texte
+                    schema = pa.Schema.from_pandas(df, preserve_index=False)
+                    schema = pa.schema([
+                        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                        for field in schema
+                    ])
+                    writer = ipc.new_file(tmp, schema)
+                writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            # CSV sans aucune ligne
+            feather.write_feather(read_source(source), tmp, compression="uncompressed")
+
+
+def snapshot_path(spec, version):
+    return SNAPSHOT_DIR / f"{spec.name}-{version}.arrow"
+
+
+def dataset_version(spec):
+    return f"{file_hash(spec.path)}-v{SCHEMA_VERSION}"
+
+
+def _write_atomic(df, path):
+    # Écriture dans un fichier temporaire puis renommage atomique : plusieurs
+    # réplicas ou threads peuvent construire le même instantané en parallèle
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    with atomic_path(path) as tmp:
+        feather.write_feather(df, tmp, compression="uncompressed")
+
+
+def _read_mapped(path):
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas(types_mapper=_ARROW_TYPES.get)
+
+
+def _unlink(path):
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        # Fichier encore mappé par un autre processus (Windows)
+        pass
+
+
+def remove_old_versions(spec, version):
+    """Supprime les autres versions de ce jeu de données et leurs tables dérivées."""
+    previous = re.compile(rf"{re.escape(spec.name)}-[0-9a-f]+-v\d+\.")
+    for old in SNAPSHOT_DIR.iterdir():
+        if previous.match(old.name) and not old.name.startswith(f"{spec.name}-{version}."):
+            _unlink(old)
+
+
+def remove_version(name, version):
+    """Supprime l'instantané de la version `version` du jeu `name` et ses tables dérivées."""
+    for old in SNAPSHOT_DIR.glob(f"{glob.escape(name)}-{version}.*"):
+        _unlink(old)
+
+
+def build_snapshot(spec, version=None):
+    """Écrit l'instantané Arrow du jeu de données s'il n'existe pas encore."""
+    version = version or dataset_version(spec)
+    path = snapshot_path(spec, version)
+    if path.exists():
+        return path
+
+    with profiling.span("snapshot:build"):
+        write_snapshot(spec.path, path)
+    return path
+
+
+_build_locks_lock = threading.Lock()
+
+
+class locked_cached_property(cached_property):
+    """`cached_property` calculée par un seul thread à la fois.
+
+    Le jeu de données est partagé par toutes les sessions : les sessions qui
+    demandent en même temps un index pas encore construit attendent celle
+    qui le construit au lieu de le calculer chacune.
+    """
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cache = instance.__dict__
+        if self.attrname not in cache:
+            with instance._build_lock(self.attrname):
+                if self.attrname not in cache:
+                    cache[self.attrname] = self.func(instance)
+        return cache[self.attrname]
+
+
+class Dataset:
+    """Une version chargée d'un jeu de données et ses tables dérivées.
+
+    Les tables dérivées (auteurs, lieux, mots-clés) sont calculées au premier
+    accès puis enregistrées à côté de l'instantané : les processus suivants
+    les relisent directement.
+
+    `previous` est la version précédente déjà chargée : si le CSV n'a fait
+    que s'allonger, seules les lignes ajoutées sont lues et ajoutées à son
+    instantané et à ses tables dérivées. Les fichiers de `previous` restent
+    sur disque tant que cette version est encore référencée.
+    """
+
+    def __init__(self, spec, previous=None):
+        self.spec = spec
+        self.name = spec.name
+        # Relevé avant l'empreinte : une modification pendant le calcul sera
+        # détectée au prochain appel de `get_dataset`
+        self.source = source_state(spec.path)
+        self.version = dataset_version(spec)
+        self.snapshot = snapshot_path(spec, self.version)
+        if not self.snapshot.exists():
+            if previous is not None and is_append(spec.path, previous.source.size, previous.digest):
+                with profiling.span("snapshot:append"):
+                    self._append(previous)
+            else:
+                build_snapshot(spec, self.version)
+        if previous is None:
+            # Versions laissées par les exécutions précédentes du tableau de bord
+            remove_old_versions(spec, self.version)
+        elif previous.version != self.version:
+            # Les sessions qui détiennent encore l'ancienne version peuvent en
+            # lire les tables dérivées : ses fichiers ne sont supprimés
+            # qu'une fois plus aucune d'elles ne la référence
+            weakref.finalize(previous, remove_version, spec.name, previous.version)
+        self._frame = _read_mapped(self.snapshot)
+        self._views = OrderedDict()
+        self._views_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frame)
+
+    @property
+    def digest(self):
+        """Empreinte du CSV source de cette version."""
+        return self.version.split("-v")[0]
+
+    def _append(self, previous):
+        """Construit cette version en ajoutant les lignes nouvelles à `previous`."""
+        tail = read_tail(self.spec.path, previous.source.size, read_source)
+        _write_atomic(append_rows(previous._frame, tail), self.snapshot)
+        for name, (build, append) in STAGES.items():
+            # Seules les tables déjà construites sont prolongées, les autres
+            # le seront au premier accès
+            old = previous._stage_path(name)
+            if old.exists():
+                _write_atomic(append(_read_mapped(old), build(tail), len(previous)), self._stage_path(name))
+        old_topics = previous._topics_path()
+        if old_topics.exists():
+            # Seules les publications ajoutées sont tokenisées
+            from dashboard.topics import TopicIndex
+
+            with profiling.span("topics:extend"):
+                TopicIndex.load(old_topics).extend(tail).save(self._topics_path())
+        if "coauthors" in previous.__dict__:
+            # Le réseau de co-signature est prolongé au lieu d'être reconstruit
+            self._coauthors_base = (previous.coauthors, len(previous.stage("auteurs")))
+
+    def refreshed(self):
+        """Version à jour du jeu de données : `self` si le CSV n'a pas changé."""
+        if source_state(self.spec.path) == self.source:
+            return self
+        return Dataset(self.spec, previous=self)
+
+    @property
+    def frame(self):
+        """Table des lignes, en lecture seule.
+
+        Copie superficielle : elle partage les colonnes de l'instance commune,
+        et une modification ne copie que les colonnes touchées sans jamais
+        altérer ce que voient les autres sessions.
+        """
+        return self._frame.copy(deep=False)
+
+    def column(self, name):
+        """Colonne `name`, sans copier le reste de la table."""
+        return self._frame[name]
+
+    def _stage_path(self, stage):
+        return self.snapshot.with_name(f"{self.snapshot.stem}.{stage}.arrow")
+
+    def _build_lock(self, key):
+        """Verrou de la construction `key` de cette version (table dérivée, index)."""
+        with _build_locks_lock:
+            return self.__dict__.setdefault("_build_locks", {}).setdefault(key, threading.RLock())
+
+    def stage(self, stage):
+        """Table dérivée `stage` (cf. `STAGES`), calculée si besoin."""
+        path = self._stage_path(stage)
+        if not path.exists():
+            with self._build_lock(f"stage:{stage}"):
+                if not path.exists():
+                    build, _ = STAGES[stage]
+                    with profiling.span(f"stage:{stage}"):
+                        _write_atomic(build(self.frame), path)
+        return _read_mapped(path)
+
+    @locked_cached_property
+    def years(self):
+        """Années présentes dans les données, triées."""
+        return [int(y) for y in np.unique(self.column("Année").to_numpy())]
+
+    @locked_cached_property
+    def authors(self):
+        """Couple `(ranking, series)` des courbes cumulées par auteur."""
+        from dashboard import store
+
+        def build():
+            auteurs = self.stage("auteurs")
+            with profiling.span("index:authors"):
+                return author_timeseries(auteurs)
+
+        # Relu depuis le cache persistant après un redémarrage
+        return store.cached(self, "index:authors", build)
+
+    @locked_cached_property
+    def coauthors(self):
+        """Réseau de co-signature des auteurs (cf. `dashboard.coauthors`)."""
+        # scipy n'est importé que par les pages qui affichent le réseau
+        from dashboard.coauthors import CoauthorGraph
+
+        authors = self.stage("auteurs")
+        years = self.column("Année").to_numpy()
+        base = self.__dict__.pop("_coauthors_base", None)
+        with profiling.span("coauthors:build"):
+            if base is not None:
+                graph, n_rows = base
+                return graph.extend(authors.iloc[n_rows:], years)
+            return CoauthorGraph(authors, years)
+
+    def _topics_path(self):
+        return self.snapshot.with_name(f"{self.snapshot.stem}.topics.npz")
+
+    @locked_cached_property
+    def topics(self):
+        """Index des thématiques (cf. `dashboard.topics`), relu depuis le disque s'il existe déjà."""
+        from dashboard.topics import TopicIndex
+
+        path = self._topics_path()
+        if path.exists():
+            return TopicIndex.load(path)
+        with profiling.span("topics:build"):
+            index = TopicIndex.build(self.frame)
+        index.save(path)
+        return index
+
+    @locked_cached_property
+    def places(self):
+        from dashboard import store
+
+        def build():
+            lieux = self.stage("lieux")
+            with profiling.span("index:places"):
+                return AffiliationIndex(lieux)
+
+        return store.cached(self, "index:places", build)
+
+    @locked_cached_property
+    def excluded_places(self):
+        """Noms canoniques des lieux exclus des classements (cf. `DatasetSpec`)."""
+        return tuple(lookup("lieux").resolve(list(self.spec.excluded_places)))
+
+    @locked_cached_property
+    def keywords(self):
+        return self.stage("mots_cles")
+
+    @locked_cached_property
+    def cube(self):
+        """Comptages Type × Famille × Langue × Année."""
+        with profiling.span("cube:years"):
+            return CountCube(self.frame, ["Type", "Famille", "Langue"], "Année")
+
+    @locked_cached_property
+    def date_cube(self):
+        """Comptages Famille × Date, pour les courbes cumulées au jour près."""
+        with profiling.span("cube:dates"):
+            return CountCube(self.frame, ["Famille"], "Date")
+
+    @locked_cached_property
+    def search_index(self):
+        """Index plein texte, relu depuis le disque s'il existe déjà."""
+        path = self.snapshot.with_name(f"{self.snapshot.stem}.search.npz")
+        if path.exists():
+            return SearchIndex.load(path)
+        with profiling.span("search:build"):
+            index = SearchIndex.build(self.frame)
+        index.save(path)
+        return index
+
+    def subset(self, rows):
+        """Vue sur les lignes `rows` (positions), par exemple une recherche.
+
+        Les sessions qui appliquent le même filtre partagent la même vue.
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        rows.flags.writeable = False
+        key = hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()
+        with self._views_lock:
+            view = self._views.get(key)
+            if view is None:
+                view = self._views[key] = Subset(self, rows, key)
+                if len(self._views) > MAX_VIEWS:
+                    self._views.popitem(last=False)
+            else:
+                self._views.move_to_end(key)
+            return view
+
+
+class Subset(Dataset):
+    """Vue en lecture seule sur une partie des lignes d'un jeu de données.
+
+    Les graphiques s'en servent comme d'un `Dataset` ordinaire. La vue ne
+    conserve que les positions des lignes retenues : les cubes et les
+    mots-clés sont dérivés de ceux du jeu complet, et la table n'est
+    extraite qu'à la demande pour les autres tables dérivées.
+    """
+
+    def __init__(self, parent, rows, key):
+        self.spec = parent.spec
+        self.name = parent.name
+        self.version = f"{parent.version}:{key}"
+        self.parent = parent
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    @locked_cached_property
+    def _frame(self):
+        return self.parent._frame.take(self.rows).reset_index(drop=True)
+
+    def column(self, name):
+        return self.parent.column(name).take(self.rows).reset_index(drop=True)
+
+    @property
+    def years(self):
+        # Le curseur garde les bornes du jeu complet
+        return self.parent.years
+
+    def stage(self, stage):
+        build, _ = STAGES[stage]
+        return build(self.frame)
+
+    @locked_cached_property
+    def excluded_places(self):
+        """Noms canoniques des lieux exclus des classements (cf. `DatasetSpec`)."""
+        return tuple(lookup("lieux").resolve(list(self.spec.excluded_places)))
+
+    @locked_cached_property
+    def keywords(self):
+        # Mots-clés du jeu complet, renumérotés selon les positions de la vue
+        keywords = self.parent.keywords
+        positions = np.full(len(self.parent), -1, dtype=np.int64)
+        positions[self.rows] = np.arange(len(self.rows))
+        ids = positions[keywords["publication_id"].to_numpy()]
+        keep = ids >= 0
+        return keywords[keep].assign(publication_id=ids[keep].astype("int32")).reset_index(drop=True)
+
+    @locked_cached_property
+    def topics(self):
+        return self.parent.topics.take(self.rows)
+
+    def subset(self, rows):
+        # Positions relatives à la vue, ramenées à celles du jeu complet
+        return self.parent.subset(self.rows[np.asarray(rows, dtype=np.int64)])
+
+    @locked_cached_property
+    def cube(self):
+        return CountCube(self.parent._frame, ["Type", "Famille", "Langue"], "Année", rows=self.rows)
+
+    @locked_cached_property
+    def date_cube(self):
+        return CountCube(self.parent._frame, ["Famille"], "Date", rows=self.rows)
+
+    @locked_cached_property
+    def search_index(self):
+        return SearchIndex.build(self.frame)
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+# Un verrou par jeu de données, tenu par le thread qui le charge ou le recharge
+_loading = {}
+
+
+def get_dataset(name):
+    """Jeu de données `name`, chargé une seule fois par processus.
+
+    Si son CSV a changé depuis le chargement, un seul thread construit la
+    nouvelle version, sans bloquer les autres jeux de données : pendant ce
+    temps, les autres sessions continuent de recevoir l'ancienne. Elle est
+    ensuite remplacée ; les sessions qui l'ont déjà obtenue la gardent
+    jusqu'à leur prochaine exécution.
+    """
+    with _loaded_lock:
+        ds = _loaded.get(name)
+        loading = _loading.setdefault(name, threading.Lock())
+    if ds is None:
+        # Premier chargement : rien à servir en attendant
+        with loading:
+            with _loaded_lock:
+                ds = _loaded.get(name)
+            if ds is None:
+                ds = Dataset(DATASETS[name])
+                with _loaded_lock:
+                    _loaded[name] = ds
+        return ds
+    if HOT_RELOAD and source_state(ds.spec.path) != ds.source and loading.acquire(blocking=False):
+        try:
+            with _loaded_lock:
+                ds = _loaded[name]
+            fresh = ds.refreshed()
+            with _loaded_lock:
+                _loaded[name] = fresh
+            return fresh
+        finally:
+            loading.release()
+    return ds
+
+
+_duplicates = None
+_duplicates_lock = threading.Lock()
+
+
+def get_duplicates():
+    """Quasi-doublons entre tous les jeux du registre (cf. `dashboard.dedup`).
+
+    L'index couvre les versions courantes des jeux de données : il est
+    enregistré dans le cache et reconstruit dès que l'un d'eux change.
+    """
+    from dashboard.dedup import DuplicateIndex
+    from dashboard.store import CODE_VERSION
+
+    global _duplicates
+    datasets = [get_dataset(name) for name in DATASETS]
+    # L'index est aussi reconstruit quand le code de la détection change
+    versions = "|".join([f"{ds.name}={ds.version}" for ds in datasets] + [CODE_VERSION])
+    key = hashlib.blake2b(versions.encode(), digest_size=8).hexdigest()
+    with _duplicates_lock:
+        if _duplicates is not None and _duplicates[0] == key:
+            return _duplicates[1]
+        path = SNAPSHOT_DIR / f"doublons-{key}.npz"
+        if path.exists():
+            index = DuplicateIndex.load(path)
+        else:
+            with profiling.span("dedup:build"):
+                index = DuplicateIndex.build({ds.name: ds.frame for ds in datasets})
+            index.save(path)
+            for old in SNAPSHOT_DIR.glob("doublons-*.npz"):
+                if re.fullmatch(r"doublons-[0-9a-f]+\.npz", old.name) and old != path:
+                    old.unlink(missing_ok=True)
+        _duplicates = (key, index)
+        return index
+
+
+def deduplicate(ds):
+    """Vue de `ds` (jeu complet ou vue) sans ses quasi-doublons (cf. `get_duplicates`)."""
+    keep = get_duplicates().keep(ds.name)
+    if isinstance(ds, Subset):
+        keep = keep[ds.rows]
+    return ds.subset(np.flatnonzero(keep))
@@ -0,0 +1,41 @@
+"""Normalisation vectorisée des dates des exports HAL.
+
+Les exports mélangent trois granularités dans la colonne `Date` : l'année
+seule (`2019`), l'année et le mois (`2020-11`) et la date complète
+(`05/07/2022`). Chaque valeur est classée par masque d'expression régulière,
+puis chaque classe est convertie en un seul appel à `pd.to_datetime` avec un
+format explicite. La précision retenue est conservée dans une colonne dédiée.
+"""
+import pandas as pd
+
+PRECISIONS = ["année", "mois", "jour"]
+
+# (motif, format strptime, précision) ; une valeur hors motif devient NaT
+DATE_FORMATS = [
+    (r"\d{4}", "%Y", "année"),
+    (r"\d{4}-\d{1,2}", "%Y-%m", "mois"),
+    (r"\d{1,2}/\d{1,2}/\d{4}", "%d/%m/%Y", "jour"),
+    (r"\d{4}-\d{1,2}-\d{1,2}", "%Y-%m-%d", "jour"),
+]
+
+
+def normalise_dates(values):
+    """Convertit une série de dates brutes.
+
+    Renvoie un couple `(dates, precision)` : une série `datetime64[ns]`
+    (NaT pour les valeurs manquantes ou mal formées) et une série
+    catégorielle indiquant la précision de chaque date.
+    """
+    raw = pd.Series(values).astype("string").str.strip()
+    dates = pd.Series(pd.NaT, index=raw.index, dtype="datetime64[ns]")
+    precision = pd.Series(pd.NA, index=raw.index, dtype=pd.CategoricalDtype(PRECISIONS))
+
+    for pattern, fmt, level in DATE_FORMATS:
+        mask = raw.str.fullmatch(pattern).fillna(False).to_numpy(dtype=bool)
+        if not mask.any():
+            continue
+        parsed = pd.to_datetime(raw[mask], format=fmt, errors="coerce")
+        dates[mask] = parsed
+        precision[mask] = precision[mask].where(parsed.isna(), level)
+
+    return dates, precision
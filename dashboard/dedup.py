@@ -0,0 +1,290 @@
+"""Détection des quasi-doublons entre les jeux de données (MinHash et LSH).
+
+Un même travail apparaît souvent dans plusieurs exports (publication et
+communication de congrès) ou deux fois dans le même, avec un titre un peu
+différent. Chaque ligne est décrite par un ensemble d'empreintes (shingles) :
+
+- les mots du `Titre` et leurs paires consécutives, normalisés comme pour la
+  recherche plein texte (accents, mots vides, pluriels) ;
+- les mots de `Auteurs` (noms et prénoms, sans les initiales), quel que soit
+  leur ordre.
+
+La similarité de Jaccard de deux ensembles est estimée par leurs signatures
+MinHash (`NUM_PERM` fonctions de hachage). Pour ne pas comparer toutes les
+paires de lignes, les signatures sont découpées en `BANDS` bandes : seules
+les lignes qui partagent entièrement au moins une bande sont candidates, puis
+gardées si :
+
+- pour deux lignes de jeux différents, leur similarité estimée atteint
+  `THRESHOLD` et leurs années diffèrent d'au plus `MAX_YEAR_GAP` ;
+- pour deux lignes du même jeu de données, leur similarité atteint
+  `SAME_SOURCE_THRESHOLD` et leurs années sont égales (une introduction de
+  session reprise chaque année n'est pas un doublon) ;
+- leurs titres désignent la même partie (`Part I` et `Part II` d'un même
+  ouvrage, `Volume 2`… restent distincts).
+
+Les groupes ne sont pas formés de proche en proche : chaque groupe réunit une
+ligne conservée, la première dans l'ordre du registre, et les lignes qui lui
+sont directement appariées. Tous ses doublons sont donc proches d'elle, et
+à au plus `MAX_YEAR_GAP` ans d'écart.
+
+Le calcul est linéaire en nombre de lignes : les seaux trop peuplés ne sont
+pas développés en toutes leurs paires mais reliés à leur premier élément.
+"""
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from dashboard import profiling
+from dashboard.files import atomic_path
+from dashboard.search import normalise_tokens, token_series
+
+# Nombre de fonctions de hachage de la signature MinHash
+NUM_PERM = 64
+
+# Découpage de la signature pour le LSH : BANDS bandes de NUM_PERM // BANDS valeurs
+BANDS = 16
+
+# Similarité de Jaccard estimée à partir de laquelle deux lignes sont des doublons
+THRESHOLD = 0.7
+
+# Écart maximal entre les années de deux doublons
+MAX_YEAR_GAP = 1
+
+# Similarité exigée entre deux lignes du même jeu de données (et même année)
+SAME_SOURCE_THRESHOLD = 0.9
+
+# Partie d'un ouvrage citée dans le titre : « Part II », « Vol. 3 », « Tome 1 »…
+PART_PATTERN = r"\b(?:part|partie|vol|volume|tome|chapter|chapitre|book|livre)\.?\s+([ivx]+|\d+)\b"
+
+# Taille de seau au-delà de laquelle les membres ne sont comparés qu'au premier
+MAX_BUCKET = 32
+
+# Nombre de paires candidates vérifiées à la fois
+CHUNK_PAIRS = 200_000
+
+_MASK = np.uint64(0xFFFFFFFF)
+
+
+def _hash_functions(seed=0):
+    """Coefficients `(a, b)` des fonctions `h(x) = (a·x + b) mod 2⁶⁴ >> 32`."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+    return a, b
+
+
+def shingles(frame):
+    """Table longue `(doc, h)` des empreintes de chaque ligne (positions)."""
+    titre = normalise_tokens(token_series(frame["Titre"]))
+    docs = titre.index.to_numpy()
+    words = titre.to_numpy()
+    # Paires de mots consécutifs d'un même titre
+    follows = docs[1:] == docs[:-1]
+    pairs = words[:-1][follows] + " " + words[1:][follows]
+
+    auteurs = token_series(frame["Auteurs"])
+    auteurs = auteurs[auteurs.str.len() > 1]
+
+    values = np.concatenate([words, pairs, "@" + auteurs.to_numpy()])
+    return pd.DataFrame({
+        "doc": np.concatenate([docs, docs[:-1][follows], auteurs.index.to_numpy()]),
+        "h": pd.util.hash_array(values.astype(object), categorize=True),
+    })
+
+
+def signatures(long, n_docs):
+    """Signatures MinHash (`n_docs` × `NUM_PERM`) ; lignes sans empreinte à `uint32` max."""
+    long = long.drop_duplicates().sort_values("doc", kind="stable")
+    docs = long["doc"].to_numpy()
+    h = long["h"].to_numpy(dtype=np.uint64)
+    sig = np.full((n_docs, NUM_PERM), np.iinfo(np.uint32).max, dtype=np.uint32)
+    if not len(docs):
+        return sig
+    starts = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+    a, b = _hash_functions()
+    with np.errstate(over="ignore"):
+        for i in range(NUM_PERM):
+            values = ((a[i] * h + b[i]) >> np.uint64(32)) & _MASK
+            sig[docs[starts], i] = np.minimum.reduceat(values, starts).astype(np.uint32)
+    return sig
+
+
+def _band_keys(sig, band):
+    rows = NUM_PERM // BANDS
+    key = np.zeros(len(sig), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for value in sig[:, band * rows:(band + 1) * rows].T:
+            key = key * np.uint64(1_000_003) ^ value.astype(np.uint64)
+    return key
+
+
+def candidate_pairs(sig):
+    """Paires `(i, j)`, `i < j`, de signatures qui partagent au moins une bande."""
+    pairs = []
+    for band in range(BANDS):
+        keys = _band_keys(sig, band)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        # Seaux de taille raisonnable : toutes leurs paires
+        for size in np.unique(sizes[(sizes > 1) & (sizes <= MAX_BUCKET)]):
+            first = starts[sizes == size]
+            i, j = np.triu_indices(size, 1)
+            pairs.append(np.stack([order[first[:, None] + i].ravel(), order[first[:, None] + j].ravel()], axis=1))
+        # Seaux très peuplés : chaque membre relié au premier
+        for first, size in zip(starts[sizes > MAX_BUCKET], sizes[sizes > MAX_BUCKET]):
+            members = order[first:first + size]
+            pairs.append(np.stack([np.full(size - 1, members[0]), members[1:]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1).astype(np.int64)
+    # Une paire trouvée dans plusieurs bandes n'est gardée qu'une fois
+    codes = np.unique(pairs[:, 0] * len(sig) + pairs[:, 1])
+    return np.stack([codes // len(sig), codes % len(sig)], axis=1)
+
+
+def parts(frame):
+    """Code de la partie d'ouvrage citée par le `Titre` de chaque ligne (0 si aucune)."""
+    cited = frame["Titre"].astype("string").str.lower().str.findall(PART_PATTERN)
+    return pd.factorize(cited.str.join(" ").fillna(""))[0]
+
+
+def similar_pairs(sig, years, sources, part, pairs):
+    """Paires qui satisfont les conditions de similarité, d'années et de partie."""
+    a, b = pairs[:, 0], pairs[:, 1]
+    same_source = sources[a] == sources[b]
+    gap = np.abs(years[a] - years[b])
+    keep = np.where(same_source, gap == 0, gap <= MAX_YEAR_GAP) & (part[a] == part[b])
+    threshold = np.where(same_source, SAME_SOURCE_THRESHOLD, THRESHOLD)
+    for start in range(0, len(pairs), CHUNK_PAIRS):
+        chunk = pairs[start:start + CHUNK_PAIRS]
+        similarity = (sig[chunk[:, 0]] == sig[chunk[:, 1]]).mean(axis=1)
+        keep[start:start + CHUNK_PAIRS] &= similarity >= threshold[start:start + CHUNK_PAIRS]
+    return pairs[keep]
+
+
+def star_groups(n, pairs, order):
+    """Ligne conservée du groupe de chaque nœud (lui-même s'il n'est pas apparié).
+
+    Les nœuds sont parcourus dans l'ordre `order` (rang de leur première
+    ligne) : un nœud encore libre devient la ligne conservée d'un groupe et
+    y attire ses voisins encore libres. Un doublon est ainsi toujours
+    directement apparié à la ligne conservée, jamais par une chaîne de paires.
+    """
+    from scipy.sparse import coo_matrix
+
+    both = np.concatenate([pairs, pairs[:, ::-1]])
+    graph = coo_matrix((np.ones(len(both), dtype=np.int8), (both[:, 0], both[:, 1])), shape=(n, n)).tocsr()
+    indptr, indices = graph.indptr, graph.indices
+    anchor = np.full(n, -1, dtype=np.int64)
+    linked = np.flatnonzero(np.diff(indptr))
+    for node in linked[np.argsort(order[linked], kind="stable")]:
+        if anchor[node] >= 0:
+            continue
+        neighbours = indices[indptr[node]:indptr[node + 1]]
+        free = neighbours[anchor[neighbours] < 0]
+        if len(free):
+            anchor[node] = node
+            anchor[free] = node
+    return np.where(anchor >= 0, anchor, np.arange(n))
+
+
+def clusters(frame, sources=None):
+    """Groupe de chaque ligne de `frame` : -1 si elle n'a pas de doublon.
+
+    `sources` donne le jeu de données de chaque ligne (un seul par défaut).
+    """
+    n = len(frame)
+    if sources is None:
+        sources = np.zeros(n, dtype=np.int64)
+    with profiling.span("dedup:minhash"):
+        sig = signatures(shingles(frame), n)
+    valid = np.flatnonzero((sig != np.iinfo(np.uint32).max).any(axis=1))
+    if not len(valid):
+        return np.full(n, -1, dtype=np.int32)
+
+    # Les copies exactes de la même année et du même jeu sont regroupées d'emblée
+    years = frame["Année"].to_numpy().astype(np.int64)[valid]
+    part = parts(frame)[valid]
+    keys = np.column_stack([sig[valid], years.astype(np.uint32), np.asarray(sources)[valid].astype(np.uint32),
+                            part.astype(np.uint32)])
+    unique, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    signature = unique[:, :NUM_PERM]
+    with profiling.span("dedup:lsh"):
+        pairs = similar_pairs(signature, years[first], unique[:, NUM_PERM + 1], part[first],
+                              candidate_pairs(signature))
+    labels = star_groups(len(unique), pairs, first)[inverse]
+    sizes = np.bincount(labels)
+    labels = np.where(sizes[labels] > 1, labels, -1)
+    # Groupes renumérotés dans l'ordre de leur première ligne
+    result = np.full(n, -1, dtype=np.int32)
+    grouped = labels >= 0
+    _, first, codes = np.unique(labels[grouped], return_index=True, return_inverse=True)
+    rank = np.argsort(np.argsort(first))
+    result[valid[grouped]] = rank[codes.ravel()]
+    return result
+
+
+class DuplicateIndex:
+    """Groupes de quasi-doublons de plusieurs jeux de données mis bout à bout."""
+
+    def __init__(self, names, sizes, groups):
+        self.names = list(names)
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+        self.groups = groups
+        self.offsets = np.r_[0, np.cumsum(self.sizes)]
+
+    @classmethod
+    def build(cls, frames):
+        """Index des lignes de `frames` (noms → tables avec `Titre`, `Auteurs` et `Année`)."""
+        names = list(frames)
+        sizes = [len(frames[name]) for name in names]
+        combined = pd.concat([frames[name][["Titre", "Auteurs", "Année"]] for name in names], ignore_index=True)
+        return cls(names, sizes, clusters(combined, np.repeat(np.arange(len(names)), sizes)))
+
+    def save(self, path):
+        """Écrit l'index dans `path` (.npz), de façon atomique."""
+        with atomic_path(path, ".tmp.npz") as tmp:
+            np.savez(tmp, names=np.array(self.names), sizes=self.sizes, groups=self.groups)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls(z["names"].tolist(), z["sizes"], z["groups"])
+
+    def _slice(self, name):
+        i = self.names.index(name)
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    @cached_property
+    def keep_all(self):
+        """Lignes conservées, tous jeux confondus : hors groupe ou premières de leur groupe."""
+        keep = self.groups < 0
+        _, first = np.unique(self.groups[~keep], return_index=True)
+        keep[np.flatnonzero(~keep)[first]] = True
+        return keep
+
+    def keep(self, name):
+        """Masque des lignes du jeu `name` conservées une fois les doublons écartés."""
+        return self.keep_all[self._slice(name)]
+
+    def n_groups(self):
+        return int(self.groups.max()) + 1 if len(self.groups) else 0
+
+    def table(self, frames):
+        """Une ligne par membre de groupe : jeu de données, position et colonnes de `frames`."""
+        keep = self.keep_all
+        parts = []
+        for name in self.names:
+            part = self._slice(name)
+            rows = np.flatnonzero(self.groups[part] >= 0)
+            frame = frames[name].iloc[rows]
+            parts.append(frame.assign(
+                Groupe=self.groups[part][rows] + 1, Jeu=name, Position=rows, Conservée=keep[part][rows],
+            ))
+        table = pd.concat(parts, ignore_index=True)
+        return table.sort_values(["Groupe", "Conservée"], ascending=[True, False], kind="stable")
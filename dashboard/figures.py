@@ -0,0 +1,257 @@
+"""Graphiques des pages, exprimés comme nœuds de calcul mis en cache.
+
+Chaque fonction reçoit un `Dataset` et les valeurs des contrôles dont elle
+dépend réellement ; voir `dashboard.pipeline` pour la mise en cache.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from dashboard.decimate import decimate_steps
+from dashboard.keywords import keyword_frequencies, render_wordcloud
+from dashboard.network import famille_year_edges, network_figure
+from dashboard.pipeline import node
+
+
+# ------------------------ Filtres ------------------------
+
+@node(persist=False)
+def year_rows(ds, years):
+    """Positions des lignes dont l'année est comprise dans `years`."""
+    annee_debut, annee_fin = years
+    annees = ds.column("Année").to_numpy()
+    return np.flatnonzero((annees >= annee_debut) & (annees <= annee_fin))
+
+
+@node(persist=False)
+def famille_rows(ds, years, familles):
+    """Positions des lignes de `years` appartenant aux `familles` (toutes si vide)."""
+    rows = year_rows(ds, years)
+    if not familles:
+        return rows
+    keep = ds.column("Famille").iloc[rows].isin(familles).to_numpy()
+    return rows[keep]
+
+
+@node(persist=False)
+def familles(ds, years):
+    """Familles présentes sur la plage d'années, des plus fréquentes aux plus rares."""
+    return ds.cube.counts("Famille", *years).index.tolist()
+
+
+def _where(familles):
+    return {"Famille": familles} if familles else None
+
+
+def _date_bounds(years):
+    annee_debut, annee_fin = years
+    return np.datetime64(f"{annee_debut}-01-01"), np.datetime64(f"{annee_fin}-12-31")
+
+
+# ------------------------ Types et langues ------------------------
+# Ces graphiques interrogent le cube de comptages au lieu de parcourir les lignes
+
+@node(artefact="plotly")
+def types_bar(ds, years, title, type_label):
+    label = f"Nombre de {ds.spec.unit}"
+    type_counts = ds.cube.counts("Type", *years).reset_index(name=label)
+    return px.bar(type_counts, x='Type', y=label, title=title,
+                  labels={'Type': type_label, label: label},
+                  color='Type', color_discrete_sequence=px.colors.sequential.Viridis)
+
+
+@node(artefact="plotly")
+def types_cumulative(ds, years, title):
+    label = f"Nombre de {ds.spec.unit}"
+    cumul = f"{label} cumulées"
+    df_grouped = ds.cube.cumulative("Type", *years).rename(columns={"count": label, "cumulative": cumul})
+
+    fig = px.line(df_grouped, x="Année", y=cumul, color="Type", title=title,
+                  labels={'Année': 'Année', cumul: cumul})
+    # Mettre à jour les axes pour personnaliser les graduations
+    fig.update_xaxes(dtick=1, tickformat="%Y")
+    return fig
+
+
+@node(artefact="plotly")
+def langues_pie(ds, years, title):
+    langue_counts = ds.cube.counts("Langue", *years)
+    return px.pie(langue_counts, names=langue_counts.index, values=langue_counts,
+                  title=title, color_discrete_sequence=px.colors.sequential.Plasma)
+
+
+# ------------------------ Familles ------------------------
+
+@node(artefact="plotly")
+def familles_bar(ds, years, familles, title):
+    label = f"Nombre de {ds.spec.unit}"
+    famille_counts = ds.cube.counts("Famille", *years, where=_where(familles)).reset_index(name=label)
+    return px.bar(famille_counts, x='Famille', y=label, title=title,
+                  labels={'Famille': 'Famille', label: label},
+                  color='Famille', color_discrete_sequence=px.colors.sequential.Viridis)
+
+
+@node(artefact="plotly")
+def familles_cumulative(ds, years, familles, title):
+    label = f"Nombre de {ds.spec.unit}"
+    cumul = f"{label} cumulées"
+    df_grouped = ds.date_cube.cumulative("Famille", *_date_bounds(years), where=_where(familles))
+    df_grouped = df_grouped.rename(columns={"count": label, "cumulative": cumul})
+
+    fig = px.line(decimate_steps(df_grouped, "Date", "Famille"), x="Date", y=cumul, color="Famille", title=title,
+                  labels={'Date': 'Date', cumul: cumul}, line_shape="hv")
+    # Afficher les dates au format AAAA-MM-JJ
+    fig.update_xaxes(tickformat="%Y-%m-%d", title="Date")
+    return fig
+
+
+@node(artefact="png")
+def wordcloud_png(ds, years, familles):
+    """Nuage de mots-clés des lignes filtrées (PNG), ou `None` s'il est vide."""
+    frequences = keyword_frequencies(ds.keywords, famille_rows(ds, years, familles), len(ds))
+    return render_wordcloud(frequences)
+
+
+@node(artefact="plotly")
+def parallel_categories(ds, years, familles):
+    """Diagramme Famille → Année → Type, une bande par combinaison présente.
+
+    Les combinaisons sont lues dans le cube de comptages : la taille du
+    graphique dépend du nombre de combinaisons distinctes, pas du nombre de
+    lignes.
+    """
+    combos = ds.cube.combinations(["Famille", "Type"], *years, where=_where(familles))
+    # Une couleur de la palette par famille, dans l'ordre d'apparition
+    codes, noms_familles = pd.factorize(combos["Famille"])
+    palette = px.colors.qualitative.Set2
+    n = max(len(noms_familles), 1)
+    colorscale = [[i / max(n - 1, 1), palette[i % len(palette)]] for i in range(n)]
+    if n == 1:
+        colorscale.append([1.0, palette[0]])
+
+    fig = go.Figure(go.Parcats(
+        dimensions=[
+            dict(label="Famille", values=combos["Famille"]),
+            dict(label="Année", values=combos["Année"], categoryorder="category ascending"),
+            dict(label="Type", values=combos["Type"]),
+        ],
+        counts=combos["count"],
+        line=dict(color=codes, colorscale=colorscale, cmin=0, cmax=max(n - 1, 1), shape="hspline"),
+        hoveron="color",
+        hoverinfo="count+probability",
+    ))
+    fig.update_layout(
+        title_text="Diagramme Parallel Categories : Famille → Type → Année",
+        title_font=dict(size=18, color='rgb(0, 0, 0)', family='Arial, sans-serif'),
+        font=dict(size=14, color='rgb(0, 0, 0)', family='Arial, sans-serif'),
+        height=600,
+        plot_bgcolor='rgb(255, 255, 255)',
+        paper_bgcolor='rgb(255, 255, 255)',
+        margin=dict(t=40, b=40, l=200, r=20)
+    )
+    return fig
+
+
+# ------------------------ Auteurs et lieux ------------------------
+
+@node(artefact="plotly")
+def authors_cumulative(ds, number_of_authors):
+    ranking, series = ds.authors
+    df_selected_authors = series[series["author_key"].isin(ranking[:number_of_authors])]
+    fig = px.line(
+        decimate_steps(df_selected_authors, "Date", "Auteur"),
+        x="Date",
+        y="Nombre de publications cumulées",
+        color="Auteur",
+        title="Évolution cumulée des publications des auteurs au fil du temps",
+        labels={'Date': 'Date', 'Nombre de publications cumulées': 'Nombre de publications cumulées'},
+        line_shape="hv"
+    )
+    fig.update_xaxes(tickformat="%Y-%m-%d", title="Date")
+    return fig
+
+
+@node(artefact="plotly")
+def places_cumulative(ds, number_of_places):
+    # Lieux les plus fréquents, hors institutions exclues dans la configuration du jeu de données
+    top_lieux = ds.places.top(number_of_places, exclude=ds.excluded_places)
+    fig = px.line(
+        decimate_steps(ds.places.series(top_lieux), "Date", "Lieu"),
+        x="Date",
+        y="Nombre de publications cumulées",
+        color="Lieu",
+        title="Évolution cumulée des publications des lieux au fil du temps",
+        labels={'Date': 'Date', 'Nombre de publications cumulées': 'Nombre de publications cumulées'},
+        line_shape="hv",
+        height=450
+    )
+    fig.update_xaxes(tickformat="%Y-%m-%d", title="Date")
+    return fig
+
+
+# ------------------------ Réseau Famille–Année ------------------------
+
+@node(artefact="plotly")
+def famille_network(ds, years, familles):
+    edges = famille_year_edges(ds.cube, years, where=_where(familles))
+    return network_figure(edges, "Graphique des Relations Congrès - Famille et Année")
+
+
+# ------------------------ Réseau des co-auteurs ------------------------
+
+@node(artefact="plotly")
+def coauthor_network(ds, n):
+    from dashboard import coauthors
+
+    return coauthors.network_figure(
+        ds.coauthors, n, f"Réseau de co-signature des {n} auteurs les plus connectés",
+        px.colors.qualitative.Set2,
+    )
+
+
+@node
+def coauthor_table(ds, n):
+    """Indicateurs de centralité des `n` auteurs les plus connectés."""
+    graph = ds.coauthors
+    return graph.table(graph.top(n))
+
+
+@node(artefact="plotly")
+def collaboration_timeline(ds):
+    timeline = ds.coauthors.timeline()
+    fig = px.line(
+        timeline, x="Année", y=["Collaborations actives", "Nouvelles collaborations"], markers=True,
+        title="Collaborations entre auteurs au fil des années",
+        labels={"value": "Nombre de paires d'auteurs", "variable": ""},
+    )
+    fig.update_xaxes(dtick=1)
+    return fig
+
+
+# ------------------------ Thématiques ------------------------
+
+@node
+def topic_trends(ds, years, familles, recent, keywords_only):
+    """Tendance de chaque terme sur les publications filtrées (cf. `dashboard.topics`)."""
+    from dashboard.topics import trends
+
+    annees = np.arange(years[0], years[1] + 1)
+    return trends(ds.topics, famille_rows(ds, years, familles), annees,
+                  recent=recent, keywords_only=keywords_only)
+
+
+@node(artefact="plotly")
+def topic_lines(ds, years, familles, recent, keywords_only, terms):
+    table = topic_trends(ds, years, familles, recent, keywords_only)
+    table = table[table["Terme"].isin(terms)]
+    annees = np.arange(years[0], years[1] + 1)
+    lines = pd.DataFrame({
+        "Année": np.tile(annees, len(table)),
+        "Terme": np.repeat(table["Terme"].to_numpy(), len(annees)),
+        "Part des publications (%)": np.concatenate(table["Tendance"].tolist()) if len(table) else [],
+    })
+    fig = px.line(lines, x="Année", y="Part des publications (%)", color="Terme", markers=True,
+                  title="Part des publications employant chaque terme")
+    fig.update_xaxes(dtick=1)
+    return fig
@@ -0,0 +1,31 @@
+"""Écriture atomique des fichiers du cache.
+
+Chaque écrivain, processus ou thread, remplit son propre fichier temporaire
+à côté de la destination puis le renomme : un lecteur voit l'ancien fichier
+ou le nouveau complet, et plusieurs écrivains simultanés de la même
+destination ne se gênent pas (le dernier renommage l'emporte).
+"""
+import os
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_path(path, suffix=".tmp"):
+    """Fichier temporaire à écrire dans le bloc, renommé en `path` à sa sortie.
+
+    `suffix` termine le nom temporaire, pour les bibliothèques qui déduisent
+    le format de l'extension (`np.savez` ajoute `.npz` sinon).
+    """
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}-{uuid.uuid4().hex[:12]}{suffix}")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            # Fichier encore ouvert (Windows) : il sera écrasé ou ignoré
+            pass
@@ -0,0 +1,91 @@
+"""Ingestion incrémentale des CSV sources.
+
+Les exports HAL grossissent par ajout de lignes en fin de fichier. Quand le
+début du nouveau fichier est identique, octet pour octet, à la version déjà
+ingérée, seules les lignes ajoutées sont lues puis normalisées ; elles sont
+ensuite concaténées aux tables existantes (instantané et tables dérivées).
+Toute autre modification du fichier entraîne une reconstruction complète.
+"""
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+@dataclass(frozen=True)
+class SourceState:
+    """Taille et date de modification d'un fichier source."""
+    size: int
+    mtime_ns: int
+
+
+def source_state(path):
+    stat = os.stat(path)
+    return SourceState(stat.st_size, stat.st_mtime_ns)
+
+
+def prefix_hash(path, size):
+    """Empreinte BLAKE2 des `size` premiers octets de `path` (cf. `data.file_hash`)."""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        remaining = size
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def is_append(path, size, digest):
+    """Vrai si `path` prolonge un fichier de `size` octets d'empreinte `digest`.
+
+    L'ancien fichier doit se terminer par une fin de ligne : sinon sa
+    dernière ligne a pu être complétée et non simplement suivie d'autres.
+    """
+    if os.path.getsize(path) <= size:
+        return False
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            return False
+    return prefix_hash(path, size) == digest
+
+
+def read_tail(path, offset, read):
+    """Lit les lignes de `path` situées après l'octet `offset`.
+
+    L'en-tête du fichier est recopié devant la fin du fichier, puis le tout
+    est passé à `read` (un lecteur de CSV comme `data.read_source`).
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        body = f.read()
+    return read(io.BytesIO(header + body))
+
+
+def append_rows(old, tail):
+    """Concatène `tail` à la suite de `old`, en réindexant depuis zéro.
+
+    Les colonnes catégorielles gardent un dictionnaire trié, comme si la
+    table avait été construite en une fois.
+    """
+    columns = {}
+    for col in old.columns:
+        a, b = old[col], tail[col]
+        if isinstance(a.dtype, pd.CategoricalDtype):
+            if a.cat.categories.equals(b.cat.categories):
+                codes = np.concatenate([a.cat.codes.to_numpy(), b.cat.codes.to_numpy()])
+                values = pd.Categorical.from_codes(codes, dtype=a.dtype)
+            else:
+                values = union_categoricals([a, b], sort_categories=True, ignore_order=True)
+            columns[col] = pd.Series(values, name=col)
+        else:
+            columns[col] = pd.concat([a, b], ignore_index=True)
+    return pd.DataFrame(columns)
@@ -0,0 +1,103 @@
+"""Fréquences des mots-clés et rendu mis en cache du nuage de mots.
+
+`Mots_clés` contient des expressions séparées par des virgules : chaque
+expression est traitée comme un terme à part entière (« Supply chain » plutôt
+que « Supply » et « chain »). La table longue des mots-clés est calculée une
+fois par version des données ; les fréquences d'un filtre s'obtiennent ensuite
+par un simple comptage, et le nuage est dessiné par
+`WordCloud.generate_from_frequencies` sans re-tokeniser le texte.
+"""
+import io
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from dashboard import profiling
+from dashboard.ingest import append_rows
+
+# Nombre d'images PNG conservées en mémoire (environ 100 Ko chacune)
+WORDCLOUD_CACHE_SIZE = 32
+
+
+def explode_keywords(df):
+    """Éclate `Mots_clés` en une ligne par couple (publication, mot-clé).
+
+    Les variantes de casse d'un même mot-clé sont regroupées sous la graphie
+    la plus fréquente.
+    """
+    terms = df["Mots_clés"].str.split(r"[,;]").explode().str.strip()
+    terms = terms[terms.notna() & (terms != "")]
+
+    long = pd.DataFrame({
+        "publication_id": terms.index.to_numpy().astype("int32"),
+        "key": terms.str.casefold().to_numpy(),
+        "term": terms.to_numpy(),
+    }).drop_duplicates(["publication_id", "key"], ignore_index=True)
+
+    # Graphie la plus fréquente de chaque clé (la première rencontrée à égalité)
+    spellings = long.groupby(["key", "term"], sort=False).size().reset_index(name="n")
+    spellings = spellings.sort_values("n", ascending=False, kind="stable").drop_duplicates("key")
+    display = spellings.set_index("key")["term"]
+    return pd.DataFrame({
+        "publication_id": long["publication_id"],
+        "keyword": long["key"].map(display).astype("category"),
+    })
+
+
+def append_keywords(keywords, tail, offset):
+    """Ajoute à `keywords` la table `tail` des publications ajoutées à partir de `offset`.
+
+    Un mot-clé déjà connu garde sa graphie ; seule celle des nouveaux
+    mots-clés est choisie parmi les lignes ajoutées.
+    """
+    known = keywords["keyword"].cat.categories
+    known = pd.Series(known, index=known.str.casefold())
+    added = tail["keyword"].cat.categories
+    spelling = pd.Series(added.str.casefold()).map(known).fillna(pd.Series(added)).tolist()
+    tail = tail.assign(
+        publication_id=(tail["publication_id"] + offset).astype("int32"),
+        keyword=tail["keyword"].cat.rename_categories(spelling),
+    )
+    return append_rows(keywords, tail)
+
+
+def keyword_frequencies(keywords, publication_ids, n_rows):
+    """Nombre de publications par mot-clé parmi `publication_ids`.
+
+    Renvoie une série triée par fréquence décroissante, sans les termes absents.
+    """
+    selected = np.zeros(n_rows, dtype=bool)
+    selected[np.asarray(publication_ids, dtype=int)] = True
+    mask = selected[keywords["publication_id"].to_numpy()]
+
+    codes = keywords["keyword"].cat.codes.to_numpy()[mask]
+    categories = keywords["keyword"].cat.categories
+    counts = np.bincount(codes, minlength=len(categories))
+    freqs = pd.Series(counts, index=categories)
+    return freqs[freqs > 0].sort_values(ascending=False, kind="stable")
+
+
+@lru_cache(maxsize=WORDCLOUD_CACHE_SIZE)
+@profiling.timed("wordcloud:generate")
+def _render(frequencies, width, height):
+    # Import différé : wordcloud n'est chargé qu'au premier rendu
+    from wordcloud import WordCloud
+
+    cloud = WordCloud(width=width, height=height, background_color="white")
+    image = cloud.generate_from_frequencies(dict(frequencies)).to_image()
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_wordcloud(freqs, width=800, height=400):
+    """Image PNG du nuage de mots pour les fréquences `freqs`.
+
+    Les images sont mémorisées dans un cache LRU borné : un même jeu de
+    fréquences n'est dessiné qu'une fois. Renvoie `None` si `freqs` est vide.
+    """
+    if freqs.empty:
+        return None
+    frequencies = tuple(zip(freqs.index.astype(str), freqs.to_numpy().tolist()))
+    return _render(frequencies, width, height)
@@ -0,0 +1,75 @@
+"""Mesures des pages Streamlit et barre latérale de débogage.
+
+Chaque page appelle `start_page` avant son contenu et `finish_page` à la
+fin : la durée de l'exécution est enregistrée sous `page:<nom>`, les
+statistiques Prometheus sont réécrites et, en mode débogage
+(`DASHBOARD_DEBUG=1` ou `?debug=1` dans l'adresse), la barre latérale
+affiche les durées et compteurs de cache de la session et du processus.
+
+Ce module n'importe pas la couche de données : la page d'accueil reste
+légère.
+"""
+import os
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from dashboard import profiling
+
+DEBUG = os.environ.get("DASHBOARD_DEBUG") == "1"
+
+# Clé de `st.session_state` des statistiques de la session
+STATS_KEY = "profilage"
+
+_local = threading.local()
+
+
+def _session_stats():
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    return st.session_state.setdefault(STATS_KEY, profiling.Stats())
+
+
+profiling.set_session_provider(_session_stats)
+
+
+def start_page(name):
+    """Début de l'exécution de la page `name`."""
+    _local.page = (name, time.perf_counter())
+
+
+def finish_page():
+    """Fin de l'exécution de la page : enregistre sa durée et affiche le débogage."""
+    page = getattr(_local, "page", None)
+    if page is not None:
+        name, start = page
+        profiling.record(f"page:{name}", time.perf_counter() - start)
+        _local.page = None
+    profiling.write_metrics()
+    if DEBUG or st.query_params.get("debug") == "1":
+        debug_sidebar()
+
+
+def plotly_chart(fig, container=st, **kwargs):
+    """`container.plotly_chart`, avec la sérialisation du graphique mesurée."""
+    with profiling.span("render:plotly"):
+        return container.plotly_chart(fig, **kwargs)
+
+
+def debug_sidebar():
+    """Durées et compteurs de cache de la session et du processus."""
+    with st.sidebar.expander("🛠️ Profilage", expanded=True):
+        for title, stats in (("Session", _session_stats()), ("Processus", profiling.PROCESS)):
+            st.markdown(f"**{title}**")
+            if stats is None or not stats.spans:
+                st.caption("Aucune mesure.")
+                continue
+            st.dataframe(stats.span_rows(), hide_index=True)
+            if stats.cache:
+                st.dataframe(stats.cache_rows(), hide_index=True)
+        st.download_button("Exporter (Prometheus)", profiling.PROCESS.to_prometheus(),
+                           file_name="dashboard.prom", mime="text/plain")
+        st.download_button("Exporter (JSON lines)", profiling.PROCESS.to_json_lines(),
+                           file_name="dashboard.jsonl", mime="application/jsonl")
@@ -0,0 +1,97 @@
+"""Graphe biparti Famille–Année des communications de congrès.
+
+Les arêtes sont lues directement dans le cube de comptages : une arête relie
+une famille à une année, avec pour poids le nombre de communications qui les
+associent. La disposition des nœuds est calculée de façon déterministe (graine
+fixe, départ depuis une disposition bipartie) et mise en cache par graphe : un
+même graphe n'est disposé qu'une fois, et ne « saute » plus d'une exécution à
+l'autre.
+"""
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+
+from dashboard import profiling
+
+# Nombre de dispositions de graphes conservées
+LAYOUT_CACHE_SIZE = 64
+
+# Épaisseurs de trait utilisées pour les arêtes (une trace Plotly par classe)
+EDGE_WIDTHS = [1, 2, 4, 6, 8]
+
+
+def famille_year_edges(cube, years, where=None):
+    """Arêtes pondérées `(Famille, Année, count)` de la plage `years`."""
+    return cube.combinations(["Famille"], *years, where=where)
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+@profiling.timed("layout:spring")
+def _layout(edges):
+    import networkx as nx
+
+    G = nx.Graph()
+    familles = sorted({f for f, _, _ in edges})
+    G.add_nodes_from(familles, bipartite=0)
+    G.add_weighted_edges_from(edges)
+    initial = nx.bipartite_layout(G, familles)
+    return nx.spring_layout(G, pos=initial, weight="weight", seed=0)
+
+
+def layout(edges):
+    """Positions des nœuds, mises en cache selon le contenu du graphe."""
+    key = tuple(sorted((str(f), int(a), int(w)) for f, a, w in edges.itertuples(index=False)))
+    return _layout(key)
+
+
+def network_figure(edges, title):
+    """Graphe Plotly interactif des arêtes `edges` (voir `famille_year_edges`)."""
+    fig = go.Figure()
+    if edges.empty:
+        fig.update_layout(title=title)
+        return fig
+
+    pos = layout(edges)
+    familles = edges["Famille"].astype(str).to_numpy()
+    annees = edges["Année"].astype(int).to_numpy()
+    weights = edges["count"].to_numpy()
+
+    # Arêtes regroupées par classe d'épaisseur, segments séparés par None
+    classes = np.minimum(
+        (weights - 1) * len(EDGE_WIDTHS) // max(weights.max(), 1), len(EDGE_WIDTHS) - 1
+    )
+    for c, width in enumerate(EDGE_WIDTHS):
+        xs, ys = [], []
+        for f, a in zip(familles[classes == c], annees[classes == c]):
+            xs += [pos[f][0], pos[a][0], None]
+            ys += [pos[f][1], pos[a][1], None]
+        if xs:
+            fig.add_trace(go.Scatter(x=xs, y=ys, mode="lines", hoverinfo="skip", showlegend=False,
+                                     line=dict(width=width, color="rgba(128, 128, 128, 0.5)")))
+
+    # Points invisibles au milieu des arêtes pour afficher leur poids au survol
+    fig.add_trace(go.Scatter(
+        x=[(pos[f][0] + pos[a][0]) / 2 for f, a in zip(familles, annees)],
+        y=[(pos[f][1] + pos[a][1]) / 2 for f, a in zip(familles, annees)],
+        mode="markers", marker=dict(size=8, opacity=0), showlegend=False,
+        hovertext=[f"{f} – {a} : {w}" for f, a, w in zip(familles, annees, weights)], hoverinfo="text",
+    ))
+
+    nodes = list(dict.fromkeys(familles.tolist())) + sorted(set(annees.tolist()))
+    degree = {n: 0 for n in nodes}
+    for f, a, w in zip(familles, annees, weights):
+        degree[f] += w
+        degree[a] += w
+    fig.add_trace(go.Scatter(
+        x=[pos[n][0] for n in nodes], y=[pos[n][1] for n in nodes],
+        mode="markers+text", text=[str(n) for n in nodes], textposition="middle center",
+        marker=dict(size=45, color="skyblue", opacity=0.6), showlegend=False,
+        hovertext=[f"{n} : {degree[n]}" for n in nodes], hoverinfo="text",
+    ))
+
+    fig.update_layout(
+        title=title, height=700, plot_bgcolor="white",
+        xaxis=dict(visible=False), yaxis=dict(visible=False),
+    )
+    return fig
@@ -0,0 +1,88 @@
+"""Nœuds de calcul mis en cache, partagés par toutes les sessions.
+
+Chaque graphique d'une page est produit par un nœud : une fonction pure dont
+le résultat est mémorisé selon la version du jeu de données et ses propres
+entrées (plage d'années, familles, nombre d'auteurs…). Les nœuds s'appellent
+entre eux (le filtre des lignes alimente les graphiques), ce qui forme un petit
+graphe de dépendances : modifier un contrôle ne recalcule que les nœuds qui en
+dépendent, les autres sont servis depuis le cache.
+
+Les nœuds qui produisent un graphique final peuvent en outre être
+pré-calculés sur disque (cf. `dashboard.artefacts`). Les autres résultats
+calculés sont enregistrés dans le cache persistant de l'hôte (cf.
+`dashboard.store`) : ils survivent aux redémarrages et servent aux autres
+réplicas.
+
+Chaque appel est compté selon le niveau qui l'a servi (mémoire, graphique
+pré-calculé, cache persistant ou calcul), et les calculs sont mesurés (cf.
+`dashboard.profiling`).
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+from dashboard import artefacts, profiling, store
+
+# Nombre de résultats conservés, tous nœuds confondus
+MAX_ENTRIES = 256
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def node(fn=None, *, artefact=None, persist=True):
+    """Mémorise `fn(ds, *args)` par (nœud, version de `ds`, arguments).
+
+    Les arguments doivent être hachables (tuples plutôt que listes). Les
+    résultats sont partagés entre les sessions et ne doivent pas être modifiés.
+
+    `artefact` (« plotly » ou « png ») indique que le résultat peut être
+    pré-calculé par `python -m dashboard.prerender` et relu depuis le disque.
+    `persist=False` garde le résultat en mémoire seulement : pour les nœuds
+    triviaux (filtres de lignes, listes de valeurs), le recalcul coûte moins
+    qu'une lecture et une écriture dans le cache persistant.
+    """
+    if fn is None:
+        return functools.partial(node, artefact=artefact, persist=persist)
+
+    @functools.wraps(fn)
+    def wrapper(ds, *args):
+        key = (fn.__module__, fn.__qualname__, ds.name, ds.version, args)
+        with _lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                value = _cache[key]
+                profiling.count_cache(fn.__qualname__, "memory")
+                return value
+
+        stage = f"{fn.__module__}.{fn.__qualname__}"
+        value = artefacts.load(ds, fn.__qualname__, args, artefact) if artefact else None
+        if value is not None:
+            profiling.count_cache(fn.__qualname__, "artefact")
+        else:
+            value = store.get(ds, stage, args) if persist else store.MISSING
+            if value is not store.MISSING:
+                profiling.count_cache(fn.__qualname__, "store")
+            else:
+                with profiling.span(f"node:{fn.__qualname__}"):
+                    value = fn(ds, *args)
+                profiling.count_cache(fn.__qualname__, "computed")
+                if persist:
+                    store.put(ds, stage, args, value)
+            if artefact:
+                # Un pré-rendu écrit aussi les graphiques relus du cache persistant
+                artefacts.save(ds, fn.__qualname__, args, artefact, value)
+
+        with _lock:
+            _cache[key] = value
+            while len(_cache) > MAX_ENTRIES:
+                _cache.popitem(last=False)
+        return value
+
+    return wrapper
+
+
+def clear():
+    """Vide le cache de tous les nœuds."""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,85 @@
+"""Index des affiliations (`Lieu`), construit une fois par version des données.
+
+L'index contient le dictionnaire des institutions, le classement des
+institutions par nombre de publications et, pour chacune, sa courbe cumulée
+déjà calculée. Répondre au curseur « nombre de
+lieux » revient alors à découper les premiers éléments du classement.
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.ingest import append_rows
+from dashboard.resolution import OUTER_COMMA, lookup
+
+
+def explode_places(df):
+    """Éclate `Lieu` en une ligne par couple (publication, institution).
+
+    Les virgules entre parenthèses ou crochets ne séparent pas deux
+    institutions, et les variantes d'une même institution sont regroupées
+    sous son nom canonique (cf. `dashboard.resolution`).
+    """
+    places = df["Lieu"].str.split(OUTER_COMMA, regex=True).explode().str.strip()
+    places = places[places.notna() & (places != "")]
+
+    long = pd.DataFrame({
+        "publication_id": places.index.to_numpy().astype("int32"),
+        "lieu": lookup("lieux").resolve(places.tolist()),
+    }).drop_duplicates(ignore_index=True)
+    long["date"] = df["Date"].to_numpy()[long["publication_id"].to_numpy()]
+    long["lieu"] = long["lieu"].astype("category")
+    return long
+
+
+def append_places(places, tail, offset):
+    """Ajoute à `places` la table `tail` des publications ajoutées à partir de `offset`."""
+    tail = tail.assign(publication_id=(tail["publication_id"] + offset).astype("int32"))
+    return append_rows(places, tail)
+
+
+class AffiliationIndex:
+    def __init__(self, places):
+        codes = places["lieu"].cat.codes.to_numpy()
+        dates = places["date"].to_numpy()
+
+        self.names = np.asarray(places["lieu"].cat.categories, dtype=object)
+        self._ids = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+
+        # Classement par nombre total de publications (alphabétique à égalité) ;
+        # un couple (publication, institution) n'apparaît qu'une fois
+        self.totals = np.bincount(codes, minlength=n)
+        self.ranking = np.argsort(-self.totals, kind="stable")
+
+        # Courbes cumulées de chaque institution, concaténées au format CSR
+        counts = (
+            pd.DataFrame({"code": codes, "date": dates})
+            .dropna()
+            .groupby(["code", "date"])
+            .size()
+        )
+        series_codes = counts.index.get_level_values("code").to_numpy()
+        running = counts.to_numpy().cumsum()
+        self.series_offsets = np.searchsorted(series_codes, np.arange(n + 1))
+        starts = np.concatenate([[0], running])[self.series_offsets[:-1]]
+        self.series_dates = counts.index.get_level_values("date").to_numpy()
+        self.series_counts = counts.to_numpy()
+        self.series_cumulative = running - np.repeat(starts, np.diff(self.series_offsets))
+
+    def top(self, n, exclude=()):
+        """Identifiants des `n` institutions les plus fréquentes hors `exclude`."""
+        excluded = [self._ids[name] for name in exclude if name in self._ids]
+        head = self.ranking[:n + len(excluded)]
+        return head[~np.isin(head, excluded)][:n]
+
+    def series(self, ids):
+        """Courbes cumulées des institutions `ids`, au format attendu par `px.line`."""
+        slices = [np.arange(self.series_offsets[i], self.series_offsets[i + 1]) for i in ids]
+        positions = np.concatenate(slices) if slices else np.empty(0, dtype=int)
+        sizes = [len(s) for s in slices]
+        return pd.DataFrame({
+            "Lieu": np.repeat(self.names[np.asarray(ids, dtype=int)], sizes),
+            "Date": self.series_dates[positions],
+            "Nombre de publications": self.series_counts[positions],
+            "Nombre de publications cumulées": self.series_cumulative[positions],
+        })
@@ -0,0 +1,180 @@
+"""Pré-rendu des graphiques des pages pour les états de filtres courants.
+
+Chaque page est exécutée sans navigateur (`streamlit.testing`) pour l'état
+par défaut de ses contrôles puis pour une grille d'états fréquents : toutes
+les années et chaque année seule, de 1 à 7 auteurs et lieux. Les graphiques
+calculés sont enregistrés dans le cache (JSON Plotly, et PNG/SVG si kaleido
+est installé) ; les pages les relisent ensuite au lieu de les recalculer.
+
+    python -m dashboard.prerender
+    python -m dashboard.prerender --workers 4 --images png svg --site site/
+
+`--site` écrit en plus un site statique (une page HTML par jeu de données et
+plage d'années) qui peut servir de repli sans serveur Streamlit.
+"""
+import argparse
+import base64
+import html
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import plotly.io as pio
+
+from dashboard import artefacts, pipeline, ui
+from dashboard.data import DATASETS, ROOT, STAGES, enable_copy_on_write, get_dataset
+from dashboard.ui import PAGES, SECTIONS, dataset_key, section_key
+
+# Valeurs parcourues par les curseurs « nombre d'auteurs » et « nombre de lieux »
+SLIDER_VALUES = range(1, 8)
+
+# Valeur par défaut de ces curseurs sur les pages
+DEFAULT_SLIDER_VALUE = 5
+
+SLIDER_LABELS = ("Sélectionner le nombre d'auteurs", "Sélectionner le nombre de lieux")
+
+
+def year_ranges(years, single_years=True):
+    """Plages d'années pré-calculées : la plage complète puis chaque année seule."""
+    ranges = [(years[0], years[-1])]
+    if single_years:
+        ranges += [(y, y) for y in years if (y, y) not in ranges]
+    return ranges
+
+
+def _init_worker(image_formats):
+    enable_copy_on_write()
+    artefacts.start_recording(image_formats)
+    # Graphiques construits dans l'ordre de la page : le manifeste suit cet ordre
+    ui.FIGURE_WORKERS = 0
+
+
+def render_state(name, years, sliders=True):
+    """Exécute la page de `name` sur la plage `years` et enregistre ses graphiques.
+
+    Renvoie le manifeste de l'état par défaut des curseurs : les artefacts
+    dans l'ordre de la page, pour le site statique.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    spec = DATASETS[name]
+    ds = get_dataset(name)
+    at = AppTest.from_file(str(ROOT / PAGES[spec.kind]), default_timeout=600)
+    at.session_state[dataset_key(spec.kind)] = name
+    # Toutes les sections repliées sont dépliées pour calculer leurs graphiques
+    for section in SECTIONS:
+        at.session_state[section_key(section)] = True
+    at.run()
+    if tuple(at.select_slider[0].value) != tuple(years):
+        at.select_slider[0].set_value(years)
+
+    # Sans cache mémoire, chaque graphique de la page est relu ou écrit sur
+    # disque, ce qui en dresse la liste dans l'ordre de la page
+    pipeline.clear()
+    del artefacts.recorded[:]
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{name} {years} : {at.exception[0].message}")
+    figures = [str(path.relative_to(artefacts.version_dir(ds))) for path in artefacts.recorded]
+
+    if sliders:
+        for label in SLIDER_LABELS:
+            slider = next(s for s in at.slider if s.label == label)
+            for value in SLIDER_VALUES:
+                slider.set_value(value).run()
+            slider.set_value(DEFAULT_SLIDER_VALUE).run()
+
+    manifest = {"dataset": name, "label": spec.label, "version": ds.version, "code": artefacts.CODE_VERSION,
+                "years": list(years), "figures": figures}
+    path = artefacts.version_dir(ds) / f"manifest-{years[0]}-{years[1]}.json"
+    path.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    return manifest
+
+
+def remove_stale(ds):
+    """Supprime les artefacts des autres versions du jeu de données ou du code."""
+    for old in (artefacts.ARTEFACT_DIR / ds.name).iterdir():
+        if old != artefacts.version_dir(ds):
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def write_site(manifests, site):
+    """Écrit un site statique : un fichier HTML par jeu de données et plage d'années."""
+    site.mkdir(parents=True, exist_ok=True)
+    links = []
+    for manifest in sorted(manifests, key=lambda m: (m["dataset"], m["years"])):
+        base = artefacts.directory(manifest["dataset"], manifest["version"], manifest["code"])
+        debut, fin = manifest["years"]
+        title = f"{manifest['label']} ({debut} - {fin})"
+        blocks = []
+        for i, figure in enumerate(manifest["figures"]):
+            path = base / figure
+            if path.suffix == ".png":
+                data = base64.b64encode(path.read_bytes()).decode()
+                blocks.append(f'<img src="data:image/png;base64,{data}" style="max-width:100%">')
+            else:
+                fig = pio.from_json(path.read_text(encoding="utf-8"))
+                # plotly.js n'est inclus qu'une fois par page (depuis le CDN)
+                blocks.append(pio.to_html(fig, full_html=False, include_plotlyjs="cdn" if i == 0 else False))
+        filename = f"{manifest['dataset']}-{debut}-{fin}.html"
+        (site / filename).write_text(
+            f"<!DOCTYPE html><html lang=\"fr\"><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>"
+            f"<body><h1>{html.escape(title)}</h1>{''.join(blocks)}</body></html>",
+            encoding="utf-8",
+        )
+        links.append(f'<li><a href="{html.escape(filename)}">{html.escape(title)}</a></li>')
+    (site / "index.html").write_text(
+        "<!DOCTYPE html><html lang=\"fr\"><head><meta charset=\"utf-8\"><title>Tableau de bord CGI</title></head>"
+        f"<body><h1>Tableau de bord CGI</h1><ul>{''.join(links)}</ul></body></html>",
+        encoding="utf-8",
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", nargs="+", default=list(DATASETS), help="jeux de données du registre à pré-calculer")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument("--images", nargs="*", default=[], choices=["png", "svg"],
+                        help="exporter aussi chaque graphique en image (nécessite kaleido)")
+    parser.add_argument("--default-only", action="store_true",
+                        help="seulement l'état par défaut des pages (toutes les années, 5 auteurs et lieux)")
+    parser.add_argument("--site", type=Path, help="dossier où écrire le site statique")
+    args = parser.parse_args(argv)
+    enable_copy_on_write()
+
+    jobs = []
+    for name in args.dataset:
+        # Instantané et tables dérivées construits une fois avant de lancer les processus
+        ds = get_dataset(name)
+        for stage in STAGES:
+            ds.stage(stage)
+        (artefacts.ARTEFACT_DIR / name).mkdir(parents=True, exist_ok=True)
+        remove_stale(ds)
+        jobs += [(name, years) for years in year_ranges(ds.years, single_years=not args.default_only)]
+
+    # Les fonctions envoyées aux processus sont désignées par leur module
+    # importable : `streamlit.testing` remplace `__main__` pendant l'exécution
+    # d'une page
+    from dashboard import prerender
+
+    start = time.perf_counter()
+    manifests = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=prerender._init_worker,
+                             initargs=(args.images,)) as pool:
+        futures = [pool.submit(prerender.render_state, name, years, not args.default_only) for name, years in jobs]
+        for future in as_completed(futures):
+            manifest = future.result()
+            manifests.append(manifest)
+            print(f"{manifest['dataset']} {manifest['years']} : {len(manifest['figures'])} graphiques")
+    print(f"{len(jobs)} états pré-calculés en {time.perf_counter() - start:.1f} s dans {artefacts.ARTEFACT_DIR}")
+
+    if args.site:
+        write_site(manifests, args.site)
+        print(f"Site statique écrit dans {args.site}")
+
+
+if __name__ == "__main__":
+    main()
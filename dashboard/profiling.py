@@ -0,0 +1,208 @@
+"""Mesure du temps passé dans chaque étape du tableau de bord.
+
+Les étapes coûteuses (lecture des CSV et conversion des dates, tables
+dérivées, cubes, nœuds de calcul, nuage de mots, dispositions de graphes,
+sérialisation des graphiques Plotly) sont entourées d'un intervalle nommé
+(`span`). Chaque intervalle terminé est agrégé dans les statistiques du
+processus et dans celles de la session Streamlit en cours ; les nœuds de
+calcul comptent en plus leurs succès et échecs de cache.
+
+Les statistiques s'affichent dans la barre latérale de débogage (cf.
+`dashboard.monitoring`) et s'exportent :
+
+- au format texte de Prometheus, dans `DASHBOARD_METRICS_FILE`, réécrit
+  après chaque exécution de page (collecteur « textfile » de node_exporter) ;
+- en JSON lines, dans `DASHBOARD_PROFILE_LOG`, un événement par intervalle.
+
+Ce module n'importe ni Streamlit ni pandas : les scripts hors Streamlit
+peuvent l'utiliser.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from dashboard.files import atomic_path
+
+METRICS_FILE = os.environ.get("DASHBOARD_METRICS_FILE")
+PROFILE_LOG = os.environ.get("DASHBOARD_PROFILE_LOG")
+
+# Bornes (en secondes) des histogrammes exportés, pour suivre des objectifs de latence
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Issue d'un appel de nœud : cache mémoire, graphique pré-calculé, cache
+# persistant (cf. `dashboard.store`) ou calcul
+CACHE_RESULTS = ("memory", "artefact", "store", "computed")
+
+
+class Stats:
+    """Durées agrégées par intervalle et compteurs de cache par nœud."""
+
+    def __init__(self):
+        self.spans = {}
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, seconds):
+        with self._lock:
+            entry = self.spans.get(name)
+            if entry is None:
+                entry = self.spans[name] = {"count": 0, "total": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    entry["buckets"][i] += 1
+
+    def add_cache(self, node, result):
+        with self._lock:
+            counts = self.cache.setdefault(node, dict.fromkeys(CACHE_RESULTS, 0))
+            counts[result] += 1
+
+    def span_rows(self):
+        """Une ligne par intervalle, du plus coûteux au moins coûteux."""
+        with self._lock:
+            rows = [
+                {"Étape": name, "Appels": e["count"], "Total (s)": round(e["total"], 4),
+                 "Moyenne (s)": round(e["total"] / e["count"], 4), "Max (s)": round(e["max"], 4)}
+                for name, e in self.spans.items()
+            ]
+        return sorted(rows, key=lambda r: -r["Total (s)"])
+
+    def cache_rows(self):
+        """Une ligne par nœud : appels servis par chaque niveau de cache."""
+        with self._lock:
+            rows = [dict({"Nœud": node}, **counts) for node, counts in self.cache.items()]
+        for row in rows:
+            calls = sum(row[r] for r in CACHE_RESULTS)
+            row["Taux de succès (%)"] = round(100 * (calls - row["computed"]) / calls, 1) if calls else 0.0
+        return sorted(rows, key=lambda r: r["Nœud"])
+
+    def to_prometheus(self, prefix="dashboard"):
+        """Statistiques au format texte d'exposition de Prometheus."""
+        with self._lock:
+            spans = {name: dict(e, buckets=list(e["buckets"])) for name, e in self.spans.items()}
+            cache = {node: dict(counts) for node, counts in self.cache.items()}
+        lines = [
+            f"# HELP {prefix}_span_seconds Durée des étapes du tableau de bord.",
+            f"# TYPE {prefix}_span_seconds histogram",
+        ]
+        for name, e in sorted(spans.items()):
+            label = f'span="{_escape(name)}"'
+            for bound, count in zip(BUCKETS, e["buckets"]):
+                lines.append(f'{prefix}_span_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{prefix}_span_seconds_bucket{{{label},le="+Inf"}} {e["count"]}')
+            lines.append(f"{prefix}_span_seconds_sum{{{label}}} {e['total']:.6f}")
+            lines.append(f"{prefix}_span_seconds_count{{{label}}} {e['count']}")
+        lines += [
+            f"# HELP {prefix}_node_calls_total Appels des nœuds de calcul selon le cache qui les a servis.",
+            f"# TYPE {prefix}_node_calls_total counter",
+        ]
+        for node, counts in sorted(cache.items()):
+            for result, count in counts.items():
+                lines.append(f'{prefix}_node_calls_total{{node="{_escape(node)}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self):
+        """Statistiques agrégées, une ligne JSON par intervalle puis par nœud."""
+        lines = [json.dumps(dict(row, kind="span"), ensure_ascii=False) for row in self.span_rows()]
+        lines += [json.dumps(dict(row, kind="cache"), ensure_ascii=False) for row in self.cache_rows()]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Statistiques de tout le processus, partagées par les sessions
+PROCESS = Stats()
+
+# Fonction renvoyant les statistiques de la session en cours (ou `None`) :
+# fournie par `dashboard.monitoring`, pour ne pas importer Streamlit ici
+_session_provider = None
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+def set_session_provider(provider):
+    global _session_provider
+    _session_provider = provider
+
+
+def session_stats():
+    """Statistiques de la session Streamlit en cours, ou `None` hors d'une page."""
+    bound = getattr(_local, "session", None)
+    if bound is not None:
+        return bound
+    return _session_provider() if _session_provider else None
+
+
+@contextmanager
+def bind_session(stats):
+    """Attribue les mesures du thread courant à `stats` (calculs délégués à un pool)."""
+    previous = getattr(_local, "session", None)
+    _local.session = stats
+    try:
+        yield
+    finally:
+        _local.session = previous
+
+
+def record(name, seconds):
+    """Ajoute une durée mesurée à l'intervalle `name`."""
+    PROCESS.add_span(name, seconds)
+    session = session_stats()
+    if session is not None:
+        session.add_span(name, seconds)
+    if PROFILE_LOG:
+        stack = getattr(_local, "stack", [])
+        event = {"time": round(time.time(), 3), "span": name, "seconds": round(seconds, 6),
+                 "parent": stack[-1] if stack else None, "pid": os.getpid()}
+        with _log_lock, open(PROFILE_LOG, "a", encoding="utf-8") as log:
+            log.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+def count_cache(node, result):
+    """Compte un appel du nœud `node` servi par `result` (cf. `CACHE_RESULTS`)."""
+    PROCESS.add_cache(node, result)
+    session = session_stats()
+    if session is not None:
+        session.add_cache(node, result)
+
+
+@contextmanager
+def span(name):
+    """Mesure la durée du bloc sous le nom `name`."""
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        record(name, seconds)
+
+
+def timed(name):
+    """Décorateur : mesure chaque appel de la fonction sous le nom `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_metrics(path=None):
+    """Réécrit le fichier Prometheus des statistiques du processus, s'il est configuré."""
+    path = path or METRICS_FILE
+    if not path:
+        return
+    with atomic_path(path) as tmp:
+        tmp.write_text(PROCESS.to_prometheus(), encoding="utf-8")
@@ -0,0 +1,348 @@
+"""Résolution des variantes de noms d'auteurs et d'institutions.
+
+Un même chercheur apparaît sous plusieurs graphies (`Fontanili, Franck`,
+`Fontanili, F.`, accents omis…), une même institution aussi (`University of
+Amsterdam [Amsterdam] = Universiteit van Amsterdam (UvA)`, `University of
+Amsterdam (UvA)`). Chaque nouvelle variante est comparée aux seules entrées
+qui partagent une de ses clés de blocage (nom normalisé, sigle…) puis
+rattachée à l'entrée canonique correspondante, ou en crée une.
+
+La table de correspondance variante → nom canonique est enregistrée dans le
+cache (base SQLite partagée par les processus) et ne fait que s'enrichir :
+les variantes déjà vues ne sont jamais recomparées, et un nom canonique
+attribué ne change plus.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# Délai d'attente d'un verrou tenu par un autre processus (millisecondes)
+BUSY_TIMEOUT_MS = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS canonical (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS variants (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    variant TEXT NOT NULL UNIQUE,
+    entry INTEGER NOT NULL
+);
+"""
+
+# Seuils de similarité (rapport de `SequenceMatcher`) pour rattacher deux variantes
+FIRSTNAME_SIMILARITY = 0.85
+INSTITUTION_SIMILARITY = 0.92
+INSTITUTION_ACRONYM_SIMILARITY = 0.6
+
+# Virgule hors parenthèses et crochets : `Université (Toulouse, France)` reste entier
+OUTER_COMMA = r",\s*(?![^()\[\]]*[)\]])"
+
+
+def fold(text):
+    """Forme de comparaison : sans accents, en minuscules, ponctuation réduite à des espaces."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def is_initial(token):
+    """Vrai pour une initiale (`F`, `F.`, `J.-B.`)."""
+    return all(len(part) == 1 for part in fold(token).split()) if fold(token) else False
+
+
+def initials(firstname):
+    return "".join(part[0] for part in fold(firstname).split())
+
+
+# ------------------------ Auteurs ------------------------
+
+def author_blocks(variant):
+    """Clés de blocage d'un auteur `(nom, prénom)` : nom compacté et initiale du prénom.
+
+    La clé inversée rapproche aussi les listes où le prénom précède le nom.
+    """
+    surname, firstname = variant
+    return [
+        f"{fold(surname).replace(' ', '')}|{initials(firstname)[:1]}",
+        f"{fold(firstname).replace(' ', '')}|{initials(surname)[:1]}",
+    ]
+
+
+def same_author(a, b):
+    """Deux variantes d'un même bloc désignent-elles le même auteur ?"""
+    if (fold(a[0]), fold(a[1])) == (fold(b[1]), fold(b[0])):
+        return True
+    if fold(a[0]).replace(" ", "") != fold(b[0]).replace(" ", ""):
+        return False
+    fa, fb = fold(a[1]), fold(b[1])
+    if fa == fb:
+        return True
+    if not fa or not fb:
+        return False
+    # Prénom abrégé : les initiales doivent correspondre
+    if is_initial(a[1]) or is_initial(b[1]):
+        return initials(a[1]) == initials(b[1])
+    return SequenceMatcher(None, fa, fb).ratio() >= FIRSTNAME_SIMILARITY
+
+
+def author_display(variant):
+    surname, firstname = variant
+    return f"{firstname} {surname}".strip()
+
+
+# ------------------------ Institutions ------------------------
+
+def institution_parts(name):
+    """`(variantes normalisées, sigle)` d'une institution HAL.
+
+    `A [Ville] = B (SIGLE)` donne les variantes `a` et `b` et le sigle `sigle`.
+    """
+    acronym = re.search(r"\(([^()]*)\)\s*$", name)
+    main = name[:acronym.start()] if acronym else name
+    main = re.sub(r"\[[^\]]*\]", " ", main)
+    alternatives = [fold(part) for part in main.split(" = ")]
+    return [a for a in alternatives if a], fold(acronym.group(1)) if acronym else ""
+
+
+def institution_blocks(name):
+    alternatives, acronym = institution_parts(name)
+    return alternatives + ([f"sigle:{acronym}"] if acronym else [])
+
+
+def same_institution(a, b):
+    alt_a, acr_a = institution_parts(a)
+    alt_b, acr_b = institution_parts(b)
+    if set(alt_a) & set(alt_b):
+        return True
+    if not alt_a or not alt_b:
+        return bool(acr_a) and acr_a == acr_b
+    ratio = SequenceMatcher(None, alt_a[0], alt_b[0]).ratio()
+    if acr_a and acr_a == acr_b:
+        return ratio >= INSTITUTION_ACRONYM_SIMILARITY
+    return ratio >= INSTITUTION_SIMILARITY
+
+
+# ------------------------ Table de correspondance ------------------------
+
+class Lookup:
+    """Correspondance persistante variante → nom canonique.
+
+    `blocks(variant)` donne les clés de blocage d'une variante, `same(a, b)`
+    compare deux variantes d'un même bloc et `display(variant)` donne le nom
+    affiché d'une nouvelle entrée canonique. Les variantes sont des chaînes
+    ou des tuples de chaînes.
+
+    La table est une base SQLite partagée par les processus de l'hôte. Les
+    nouvelles variantes sont rattachées dans une transaction d'écriture,
+    après relecture de celles que les autres processus ont ajoutées : tous
+    attribuent donc le même nom canonique à une variante.
+    """
+
+    def __init__(self, path, blocks, same, display=str):
+        self.path = path
+        self.blocks, self.same, self.display = blocks, same, display
+        self._lock = threading.Lock()
+        self._conn, self._pid = None, None
+        self._reset()
+        with self._lock:
+            conn = self._connect()
+            self._sync(conn)
+            legacy = path.with_suffix(".json")
+            if not self.canonical and legacy.exists():
+                self._import(conn, json.loads(legacy.read_text(encoding="utf-8")))
+
+    def _reset(self):
+        self.canonical = []
+        self.variants = {}
+        self._members = defaultdict(list)
+        self._index = defaultdict(set)
+        # Dernière variante de la base déjà chargée
+        self._seen = 0
+
+    def _connect(self):
+        """Connexion à la base (rouverte après un `fork`)."""
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(_SCHEMA)
+        self._conn, self._pid = conn, os.getpid()
+        return conn
+
+    def _sync(self, conn):
+        """Charge les entrées et variantes ajoutées à la base depuis la dernière lecture."""
+        rows = conn.execute("SELECT name FROM canonical WHERE id >= ? ORDER BY id", (len(self.canonical),))
+        self.canonical.extend(name for name, in rows)
+        rows = conn.execute("SELECT seq, variant, entry FROM variants WHERE seq > ? ORDER BY seq", (self._seen,))
+        for seq, variant, entry in rows:
+            variant = json.loads(variant)
+            self._add(tuple(variant) if isinstance(variant, list) else variant, entry)
+            self._seen = seq
+
+    def _import(self, conn, saved):
+        """Reprend une table enregistrée par les versions précédentes (JSON)."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM canonical").fetchone()[0] == 0:
+                conn.executemany("INSERT INTO canonical (id, name) VALUES (?, ?)", enumerate(saved["canonical"]))
+                conn.executemany(
+                    "INSERT INTO variants (variant, entry) VALUES (?, ?)",
+                    ((json.dumps(v, ensure_ascii=False), e) for v, e in saved["variants"]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._sync(conn)
+
+    def _add(self, variant, entry):
+        self.variants[variant] = entry
+        self._members[entry].append(variant)
+        for key in self.blocks(variant):
+            self._index[key].add(entry)
+
+    def _match(self, variant):
+        """Entrée canonique de `variant`, ou `None` si aucune (ou plusieurs) ne correspond."""
+        candidates = set()
+        for key in self.blocks(variant):
+            candidates |= self._index.get(key, set())
+        matches = [e for e in sorted(candidates) if any(self.same(variant, m) for m in self._members[e])]
+        return matches[0] if len(matches) == 1 else None
+
+    def known(self):
+        """Variantes déjà rattachées, y compris par les autres processus (copie)."""
+        with self._lock:
+            self._sync(self._connect())
+            return list(self.variants)
+
+    def resolve(self, variants):
+        """Nom canonique de chaque variante de `variants` (dans le même ordre).
+
+        Les variantes sont d'abord traitées par fréquence décroissante : la
+        graphie la plus courante d'un nom devient son nom canonique.
+        """
+        with self._lock:
+            counts = defaultdict(int)
+            for v in variants:
+                counts[v] += 1
+            if any(v not in self.variants for v in counts):
+                self._insert(counts)
+            return [self.canonical[self.variants[v]] for v in variants]
+
+    def _insert(self, counts):
+        """Rattache les variantes de `counts` encore inconnues, dans une transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Un autre processus a pu rattacher ces variantes entre-temps
+            self._sync(conn)
+            new = [v for v in counts if v not in self.variants]
+            for variant in sorted(new, key=lambda v: (-counts[v], -len(str(v)), str(v))):
+                entry = self._match(variant)
+                if entry is None:
+                    entry = len(self.canonical)
+                    self.canonical.append(self.display(variant))
+                    conn.execute("INSERT INTO canonical (id, name) VALUES (?, ?)", (entry, self.canonical[entry]))
+                self._seen = conn.execute(
+                    "INSERT INTO variants (variant, entry) VALUES (?, ?)",
+                    (json.dumps(variant, ensure_ascii=False), entry),
+                ).lastrowid
+                self._add(variant, entry)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            # Les ajouts en mémoire n'ont pas été enregistrés : état relu de la base
+            self._reset()
+            self._sync(conn)
+            raise
+
+
+_lookups = {}
+_lookups_lock = threading.Lock()
+
+
+def lookup(name):
+    """Table de correspondance `name` (« auteurs » ou « lieux »), une par processus."""
+    from dashboard.data import CACHE_DIR
+
+    with _lookups_lock:
+        if name not in _lookups:
+            path = CACHE_DIR / "resolution" / f"{name}.sqlite"
+            if name == "auteurs":
+                _lookups[name] = Lookup(path, author_blocks, same_author, author_display)
+            else:
+                _lookups[name] = Lookup(path, institution_blocks, same_institution)
+        return _lookups[name]
+
+
+# ------------------------ Découpage des listes d'auteurs ------------------------
+
+def segment_authors(tokens, known_pairs, known_surnames):
+    """Regroupe les jetons d'une liste `Nom, Prénom, Nom, Prénom…` irrégulière.
+
+    Quand un nom ou un prénom contient lui-même une virgule (`Vidal, Jean,
+    Baptiste`), l'alternance est rompue. Le découpage retenu maximise un
+    score : couples `(nom, prénom)` déjà rencontrés dans les listes
+    régulières, prénoms composés ou initiales, et pénalise les noms réduits à
+    une initiale ou les jetons isolés. Un prénom composé ne se prolonge pas
+    par un nom connu, ni une initiale par autre chose qu'une initiale ou un
+    prénom connu : `Fontanili, F., Vidal` commence par `(Fontanili, F.)`.
+    Renvoie une liste de `(nom, prénom)`.
+    """
+    n = len(tokens)
+    folded = [fold(t) for t in tokens]
+    known_firstnames = {f for _, f in known_pairs}
+
+    def continues_firstname(first, second):
+        """Vrai si le jeton `second` peut prolonger le prénom commencé par `first`."""
+        if is_initial(tokens[second]) or folded[second] in known_firstnames:
+            return True
+        # Après une initiale vient le nom de l'auteur suivant
+        return not is_initial(tokens[first]) and folded[second] not in known_surnames
+
+    def pair_score(surname, first):
+        score = 0.0
+        if (folded[surname], folded[first]) in known_pairs:
+            score += 2
+        elif folded[surname] in known_surnames:
+            score += 0.5
+        if is_initial(tokens[surname]):
+            score -= 2
+        return score
+
+    best = [float("-inf")] * (n + 1)
+    choice = [None] * (n + 1)
+    best[0] = 0.0
+    for i in range(n):
+        if best[i] == float("-inf"):
+            continue
+        options = [(1, -2.0, (tokens[i], ""))]
+        if i + 1 < n:
+            options.append((2, pair_score(i, i + 1), (tokens[i], tokens[i + 1])))
+            # Prénom placé avant le nom
+            if (folded[i + 1], folded[i]) in known_pairs:
+                options.append((2, 1.5, (tokens[i + 1], tokens[i])))
+        if i + 2 < n and continues_firstname(i + 1, i + 2):
+            bonus = 1.0 if is_initial(tokens[i + 1]) or is_initial(tokens[i + 2]) else 0.0
+            options.append((3, pair_score(i, i + 1) - 1 + bonus, (tokens[i], f"{tokens[i + 1]} {tokens[i + 2]}")))
+        for length, score, author in options:
+            if best[i] + score > best[i + length]:
+                best[i + length] = best[i] + score
+                choice[i + length] = (i, author)
+
+    authors, j = [], n
+    while j > 0:
+        i, author = choice[j]
+        authors.append(author)
+        j = i
+    return authors[::-1]
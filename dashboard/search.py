@@ -0,0 +1,201 @@
+"""Index plein texte (BM25) sur `Titre`, `Résumé` et `Mots_clés`.
+
+L'index est construit une fois par version des données et enregistré à côté
+de l'instantané (`.search.npz`). Il se compose :
+
+- d'un vocabulaire trié, qui sert aussi d'index de préfixes pour la saisie
+  semi-automatique (recherche dichotomique de l'intervalle des termes qui
+  commencent par le préfixe) ;
+- de listes de postings au format CSR (`offsets`, `docs`, `tf`), où la
+  fréquence d'un terme est pondérée selon le champ dans lequel il apparaît ;
+- de la longueur pondérée de chaque document, pour la normalisation BM25.
+
+La tokenisation est commune au français et à l'anglais : accents supprimés,
+minuscules, mots vides des deux langues retirés et pluriels en -s et -aux
+ramenés au singulier.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from dashboard import profiling
+from dashboard.files import atomic_path
+
+# Poids de chaque champ dans la fréquence d'un terme
+FIELD_WEIGHTS = {"Titre": 3.0, "Mots_clés": 2.0, "Résumé": 1.0}
+
+# Paramètres BM25 usuels
+K1 = 1.2
+B = 0.75
+
+# Nombre maximal de termes auxquels un préfixe est étendu
+MAX_PREFIX_EXPANSION = 20
+
+STOPWORDS = frozenset("""
+a ai au aux avec ce ces cet cette dans de des du elle en est et etre il ils
+la le les leur leurs lui mais me meme mes nous on ou par pas pour qu que qui
+sa se ses son sont sur ta te tes un une vos votre vous ne ni plus cela ceci
+afin ainsi aussi entre sans sous tout tous toute toutes tres
+about after all also an and any are as at be been but by can could for from
+had has have how if in into is it its may more most not of on or other our
+such than that the their them then there these they this those through to
+under up was we were what when where which while who will with within would
+""".split())
+
+
+def tokenize(text):
+    """Série de textes → série de listes de jetons normalisés."""
+    text = pd.Series(text, dtype="string").fillna("")
+    folded = (
+        text.str.normalize("NFKD")
+        .str.replace(r"[̀-ͯ]", "", regex=True)
+        .str.lower()
+    )
+    return folded.str.findall(r"[a-z0-9]+")
+
+
+def token_series(text):
+    """Jetons de chaque texte, une ligne par occurrence indexée par la position du texte.
+
+    Même découpage que `tokenize`, mais calculé par Arrow sur toute la
+    colonne à la fois, sans boucle Python par texte.
+    """
+    values = pc.fill_null(pa.array(np.asarray(text, dtype=object), type=pa.string(), from_pandas=True), "")
+    folded = pc.utf8_lower(pc.replace_substring_regex(
+        pc.utf8_normalize(values, "NFKD"), pattern="[\\x{0300}-\\x{036f}]", replacement=""
+    ))
+    lists = pc.split_pattern_regex(folded, pattern="[^a-z0-9]+")
+    tokens, docs = pc.list_flatten(lists), pc.list_parent_indices(lists)
+    keep = pc.not_equal(tokens, "")
+    return pd.Series(
+        pc.filter(tokens, keep).to_numpy(zero_copy_only=False),
+        index=pc.filter(docs, keep).to_numpy(),
+        dtype=object,
+    )
+
+
+def normalise_tokens(tokens):
+    """Filtre les mots vides et ramène les pluriels au singulier (série de jetons).
+
+    Chaque jeton distinct n'est traité qu'une fois, puis le résultat est
+    reporté sur toutes ses occurrences.
+    """
+    codes, uniques = pd.factorize(tokens)
+    uniques = pd.Series(uniques, dtype="string")
+    keep = ((uniques.str.len() > 1) & ~uniques.isin(STOPWORDS)).to_numpy()
+    uniques = uniques.str.replace(r"(?<=[a-z]{2})aux$", "al", regex=True)
+    uniques = uniques.str.replace(r"(?<=[a-z]{3})s$", "", regex=True)
+    mask = keep[codes]
+    return pd.Series(uniques.to_numpy(dtype=object)[codes[mask]], index=tokens.index[mask], dtype=object)
+
+
+def query_terms(query):
+    """Jetons normalisés d'une requête, dans leur ordre d'apparition."""
+    tokens = tokenize([query]).explode().dropna()
+    return normalise_tokens(tokens.astype("string")).tolist()
+
+
+class SearchIndex:
+    def __init__(self, vocabulary, offsets, docs, tf, doc_lengths):
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.docs = docs
+        self.tf = tf
+        self.doc_lengths = doc_lengths
+        self.n_docs = len(doc_lengths)
+        self.avgdl = float(doc_lengths.mean()) if self.n_docs else 0.0
+        self.doc_freq = np.diff(offsets)
+        self.idf = np.log1p((self.n_docs - self.doc_freq + 0.5) / (self.doc_freq + 0.5))
+
+    @classmethod
+    def build(cls, df):
+        parts = []
+        for field, weight in FIELD_WEIGHTS.items():
+            tokens = normalise_tokens(token_series(df[field]))
+            parts.append(pd.DataFrame({"doc": tokens.index.to_numpy(), "term": tokens.to_numpy(), "w": weight}))
+        long = pd.concat(parts, ignore_index=True)
+
+        postings = long.groupby(["term", "doc"], sort=True)["w"].sum()
+        terms = postings.index.get_level_values("term")
+        vocabulary, term_ids = np.unique(terms.to_numpy().astype(str), return_inverse=True)
+        offsets = np.searchsorted(term_ids, np.arange(len(vocabulary) + 1))
+
+        doc_lengths = np.bincount(long["doc"].to_numpy(), weights=long["w"].to_numpy(), minlength=len(df))
+        return cls(
+            vocabulary,
+            offsets.astype(np.int64),
+            postings.index.get_level_values("doc").to_numpy().astype(np.int32),
+            postings.to_numpy().astype(np.float32),
+            doc_lengths.astype(np.float32),
+        )
+
+    def save(self, path):
+        """Écrit l'index dans `path` (.npz), de façon atomique."""
+        with atomic_path(path, ".tmp.npz") as tmp:
+            np.savez(tmp, vocabulary=self.vocabulary, offsets=self.offsets, docs=self.docs,
+                     tf=self.tf, doc_lengths=self.doc_lengths)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls(z["vocabulary"], z["offsets"], z["docs"], z["tf"], z["doc_lengths"])
+
+    def _prefix_range(self, prefix):
+        lo = np.searchsorted(self.vocabulary, prefix, side="left")
+        hi = np.searchsorted(self.vocabulary, prefix + "￿", side="left")
+        return int(lo), int(hi)
+
+    def complete(self, prefix, limit=10):
+        """Termes du vocabulaire commençant par `prefix`, les plus fréquents d'abord."""
+        terms = query_terms(prefix)
+        if not terms:
+            return []
+        lo, hi = self._prefix_range(terms[-1])
+        best = np.argsort(-self.doc_freq[lo:hi], kind="stable")[:limit]
+        return self.vocabulary[lo + best].tolist()
+
+    def _term_ids(self, term, prefix):
+        if prefix:
+            lo, hi = self._prefix_range(term)
+            ids = np.arange(lo, hi)
+            return ids[np.argsort(-self.doc_freq[ids], kind="stable")[:MAX_PREFIX_EXPANSION]]
+        i = np.searchsorted(self.vocabulary, term)
+        if i < len(self.vocabulary) and self.vocabulary[i] == term:
+            return np.array([i])
+        return np.empty(0, dtype=int)
+
+    def scores(self, query, prefix=True):
+        """Score BM25 de chaque document pour `query`.
+
+        Avec `prefix=True`, le dernier mot de la requête est traité comme un
+        préfixe (saisie en cours) et étendu aux termes les plus fréquents qui
+        le prolongent.
+        """
+        terms = query_terms(query)
+        scores = np.zeros(self.n_docs, dtype=np.float64)
+        for position, term in enumerate(terms):
+            # Un préfixe compte comme un seul mot : on garde sa meilleure extension
+            best = np.zeros(self.n_docs, dtype=np.float64)
+            for t in self._term_ids(term, prefix and position == len(terms) - 1):
+                start, end = self.offsets[t], self.offsets[t + 1]
+                docs, tf = self.docs[start:end], self.tf[start:end]
+                norm = K1 * (1 - B + B * self.doc_lengths[docs] / self.avgdl)
+                best[docs] = np.maximum(best[docs], self.idf[t] * tf * (K1 + 1) / (tf + norm))
+            scores += best
+        return scores
+
+    @profiling.timed("search:query")
+    def search(self, query, limit=None, prefix=True):
+        """Positions des documents correspondant à `query`, par score décroissant.
+
+        Renvoie `(rows, scores)` ; seuls les documents de score positif sont
+        retenus.
+        """
+        scores = self.scores(query, prefix=prefix)
+        rows = np.flatnonzero(scores > 0)
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        if limit is not None:
+            rows = rows[:limit]
+        return rows, scores[rows]
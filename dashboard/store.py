@@ -0,0 +1,249 @@
+"""Cache persistant des résultats, partagé par les processus de l'hôte.
+
+Les nœuds de calcul (`dashboard.pipeline`) et les index dérivés coûteux
+(courbes des auteurs, index des lieux) gardent leurs résultats en mémoire ;
+ce cache les enregistre en plus dans une base SQLite du répertoire de cache.
+Après un redémarrage, ou dans un autre réplica du même hôte, un résultat déjà
+calculé est relu au lieu d'être recalculé.
+
+Une entrée est adressée par son contenu : empreinte de (jeu de données et
+version, étape, paramètres, code du paquet `dashboard`). La version d'un jeu
+de données est l'empreinte de son CSV, et l'empreinte du code change à chaque
+déploiement qui modifie le paquet : une entrée n'est donc jamais périmée, au
+pire inutilisée. Les valeurs sont sérialisées avec `pickle`.
+
+La taille totale est plafonnée (`DASHBOARD_RESULT_STORE_MB`, 512 Mo par
+défaut) : au-delà, les entrées les moins récemment utilisées sont supprimées.
+Elle est tenue à jour dans la table `meta` par chaque écriture, qui n'a donc
+pas à parcourir la table des résultats.
+La base est en mode WAL : les lectures ne bloquent pas les écritures des
+autres processus, et chaque écriture est une transaction courte.
+
+    DASHBOARD_RESULT_STORE=0                 # désactive le cache persistant
+    python -m dashboard.store --stats        # taille et entrées par étape
+    python -m dashboard.store --clear
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import warnings
+from pathlib import Path
+
+from dashboard import profiling
+from dashboard.data import CACHE_DIR
+
+_setting = os.environ.get("DASHBOARD_RESULT_STORE", "")
+ENABLED = _setting != "0"
+STORE_PATH = Path(_setting) if _setting not in ("", "0") else CACHE_DIR / "results.sqlite"
+
+# Taille maximale de la base ; une éviction la ramène à 90 % de cette taille
+MAX_BYTES = int(float(os.environ.get("DASHBOARD_RESULT_STORE_MB", 512)) * 2**20)
+
+# Les résultats plus gros qu'une fraction du plafond ne sont pas enregistrés
+MAX_ENTRY_BYTES = MAX_BYTES // 8
+
+# Délai d'attente d'un verrou tenu par un autre processus (millisecondes)
+BUSY_TIMEOUT_MS = 10_000
+
+# Une lecture ne met à jour la date d'utilisation que si elle date de plus de
+# ce délai (secondes) : les lectures fréquentes n'écrivent pas dans la base
+TOUCH_INTERVAL = 60
+
+# Valeur renvoyée par `get` en l'absence d'entrée (`None` est un résultat valide)
+MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+-- Taille totale des entrées, tenue à jour par chaque écriture
+CREATE TABLE IF NOT EXISTS meta (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total INTEGER NOT NULL
+);
+"""
+
+_local = threading.local()
+_disabled_reason = None
+
+
+def _code_version():
+    """Empreinte des sources du paquet `dashboard`."""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def _connect():
+    """Connexion du thread courant (rouverte après un `fork`)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+    STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(STORE_PATH, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    # L'espace des entrées évincées est rendu au système (avant toute table)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(_SCHEMA)
+    if conn.execute("SELECT 1 FROM meta").fetchone() is None:
+        # Base créée par une version sans table `meta` (ou toute neuve)
+        conn.execute("INSERT OR IGNORE INTO meta (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM results")
+    _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+def _disable(error):
+    """Désactive le cache persistant pour ce processus (base illisible, disque plein…)."""
+    global _disabled_reason
+    if _disabled_reason is None:
+        _disabled_reason = str(error)
+        warnings.warn(f"Cache persistant désactivé ({error}) : les résultats restent en mémoire.")
+
+
+def _available():
+    return ENABLED and _disabled_reason is None
+
+
+def key(ds, stage, args):
+    """Clé de l'entrée `stage(ds, *args)`."""
+    content = repr((ds.name, ds.version, stage, args, CODE_VERSION))
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def get(ds, stage, args=()):
+    """Résultat enregistré de `stage(ds, *args)`, ou `MISSING`."""
+    if not _available():
+        return MISSING
+    k = key(ds, stage, args)
+    try:
+        with profiling.span("store:get"):
+            conn = _connect()
+            row = conn.execute("SELECT value, used FROM results WHERE key = ?", (k,)).fetchone()
+            if row is None:
+                return MISSING
+            value, used = row
+            now = time.time()
+            if now - used > TOUCH_INTERVAL:
+                conn.execute("UPDATE results SET used = ? WHERE key = ?", (now, k))
+            return pickle.loads(value)
+    except sqlite3.OperationalError:
+        # Base verrouillée trop longtemps : le résultat sera recalculé
+        return MISSING
+    except (sqlite3.DatabaseError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+        _disable(error)
+        return MISSING
+
+
+def put(ds, stage, args, value):
+    """Enregistre le résultat `value` de `stage(ds, *args)`."""
+    if not _available():
+        return
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # Résultat non sérialisable : il reste en mémoire seulement
+        return
+    if len(data) > MAX_ENTRY_BYTES:
+        return
+    try:
+        with profiling.span("store:put"):
+            conn = _connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                k = key(ds, stage, args)
+                old = conn.execute("SELECT size FROM results WHERE key = ?", (k,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, dataset, stage, size, used, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    (k, f"{ds.name}-{ds.version}", stage, len(data), time.time(), data),
+                )
+                conn.execute("UPDATE meta SET total = total + ? WHERE id = 0", (len(data) - (old[0] if old else 0),))
+                evicted = _evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if evicted:
+                conn.execute("PRAGMA incremental_vacuum")
+    except sqlite3.OperationalError:
+        # Base verrouillée trop longtemps : le résultat n'est pas partagé
+        pass
+    except sqlite3.DatabaseError as error:
+        _disable(error)
+
+
+def _evict(conn):
+    """Supprime les entrées les moins récemment utilisées au-delà de `MAX_BYTES`."""
+    total = conn.execute("SELECT total FROM meta WHERE id = 0").fetchone()[0]
+    if total <= MAX_BYTES:
+        return 0
+    excess = total - int(0.9 * MAX_BYTES)
+    keys, freed = [], 0
+    for k, size in conn.execute("SELECT key, size FROM results ORDER BY used"):
+        keys.append((k,))
+        freed += size
+        if freed >= excess:
+            break
+    conn.executemany("DELETE FROM results WHERE key = ?", keys)
+    conn.execute("UPDATE meta SET total = total - ? WHERE id = 0", (freed,))
+    return len(keys)
+
+
+def cached(ds, stage, compute, args=()):
+    """`compute()`, relu depuis le cache persistant s'il y a déjà été enregistré."""
+    value = get(ds, stage, args)
+    if value is MISSING:
+        value = compute()
+        put(ds, stage, args, value)
+    return value
+
+
+def stats():
+    """Nombre d'entrées et taille totale par étape."""
+    rows = _connect().execute(
+        "SELECT stage, COUNT(*), SUM(size) FROM results GROUP BY stage ORDER BY SUM(size) DESC"
+    ).fetchall()
+    return [{"Étape": stage, "Entrées": n, "Taille (Mo)": round(size / 2**20, 2)} for stage, n, size in rows]
+
+
+def clear():
+    """Supprime toutes les entrées."""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM results")
+    conn.execute("UPDATE meta SET total = 0 WHERE id = 0")
+    conn.execute("COMMIT")
+    conn.execute("PRAGMA incremental_vacuum")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stats", action="store_true", help="afficher les entrées par étape")
+    parser.add_argument("--clear", action="store_true", help="vider le cache persistant")
+    args = parser.parse_args(argv)
+    if args.clear:
+        clear()
+    print(f"{STORE_PATH} (plafond {MAX_BYTES / 2**20:.0f} Mo)")
+    if args.stats or not args.clear:
+        for row in stats():
+            print(f"{row['Étape']:<50} {row['Entrées']:>6} entrées {row['Taille (Mo)']:>10} Mo")
+
+
+if __name__ == "__main__":
+    main()
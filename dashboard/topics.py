@@ -0,0 +1,240 @@
+"""Tendances des thématiques : termes émergents et en déclin.
+
+Les termes sont ceux de la recherche plein texte (`dashboard.search`) : mots
+de `Mots_clés` et de `Résumé`, sans accents ni mots vides, pluriels ramenés au
+singulier. L'index est construit une fois par version des données et
+enregistré à côté de l'instantané (`.topics.npz`). Il contient :
+
+- la matrice creuse publications × termes des fréquences (pondérées selon le
+  champ), dont se déduit la matrice TF-IDF ;
+- le nombre de publications de chaque année qui emploient chaque terme
+  (tableau dense années × termes) ;
+- les termes rencontrés dans `Mots_clés`, que les tendances peuvent seules
+  retenir (les mots courants des résumés sont alors écartés).
+
+Quand des publications sont ajoutées (ingestion incrémentale), seules leurs
+lignes sont tokenisées : les nouveaux termes sont ajoutés à la fin du
+vocabulaire, les lignes empilées sous les anciennes et les comptages annuels
+prolongés.
+
+Les tendances se calculent pour tous les termes à la fois : rapport (en
+logarithme) de la part des publications récentes qui emploient un terme à sa
+part dans les années précédentes, et pente de sa part annuelle.
+"""
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import scipy.sparse as sp
+
+from dashboard.files import atomic_path
+from dashboard.search import normalise_tokens, token_series
+
+# Poids de chaque champ dans la fréquence d'un terme
+FIELD_WEIGHTS = {"Mots_clés": 2.0, "Résumé": 1.0}
+
+# Lissage des parts dans le score de croissance (évite les divisions par zéro)
+SMOOTHING = 0.5
+
+
+def _tokens(df):
+    """Table longue `(doc, term, w)` des termes de `df` (positions des lignes)."""
+    parts = []
+    for field, weight in FIELD_WEIGHTS.items():
+        tokens = normalise_tokens(token_series(df[field]))
+        parts.append(pd.DataFrame({"doc": tokens.index.to_numpy(), "term": tokens.to_numpy(), "w": weight}))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _spellings(df):
+    """Graphie la plus fréquente (minuscules, accents conservés) de chaque terme."""
+    text = np.concatenate([np.asarray(df[field], dtype=object) for field in FIELD_WEIGHTS])
+    lower = pc.utf8_lower(pc.fill_null(pa.array(text, type=pa.string(), from_pandas=True), ""))
+    words = pc.list_flatten(pc.split_pattern_regex(lower, pattern="[^\\p{L}\\p{N}]+"))
+    counts = pc.value_counts(pc.filter(words, pc.not_equal(words, "")))
+    words = counts.field("values").to_numpy(zero_copy_only=False)
+    counts = counts.field("counts").to_numpy()
+    # Chaque graphie distincte n'est normalisée qu'une fois ; les graphies
+    # qui se découpent en plusieurs jetons (« l'usine ») sont ignorées
+    folded = token_series(words)
+    single = folded.index.value_counts()
+    folded = folded[folded.index.isin(single.index[single == 1])]
+    terms = normalise_tokens(folded)
+    spellings = pd.DataFrame({"term": terms.to_numpy(), "word": words[terms.index], "n": counts[terms.index]})
+    spellings = spellings.sort_values("n", ascending=False, kind="stable").drop_duplicates("term")
+    return spellings.set_index("term")["word"]
+
+
+def _year_counts(tf, years, year_values):
+    """Nombre de publications de chaque année de `year_values` employant chaque terme."""
+    year_ids = np.searchsorted(year_values, years)
+    by_year = sp.csr_matrix(
+        (np.ones(len(years), dtype=np.int32), (year_ids, np.arange(len(years)))),
+        shape=(len(year_values), len(years)),
+    )
+    present = tf.copy()
+    present.data = np.ones_like(present.data, dtype=np.int32)
+    return np.asarray((by_year @ present).todense(), dtype=np.int32)
+
+
+class TopicIndex:
+    """Matrice publications × termes d'un jeu de données et comptages annuels."""
+
+    def __init__(self, vocabulary, display, in_keywords, tf, years, year_values, year_counts):
+        self.vocabulary = vocabulary
+        self.display = display
+        self.in_keywords = in_keywords
+        self.tf = tf
+        self.years = years
+        self.year_values = year_values
+        self.year_counts = year_counts
+
+    @classmethod
+    def _from_frame(cls, df, vocabulary=None, display=None, in_keywords=None):
+        """Lignes de `df` sur le vocabulaire `vocabulary`, prolongé des nouveaux termes."""
+        long = _tokens(df)
+        vocabulary = np.array([], dtype=object) if vocabulary is None else vocabulary
+        display = np.array([], dtype=object) if display is None else display
+        in_keywords = np.zeros(0, dtype=bool) if in_keywords is None else in_keywords
+        codes, terms = pd.factorize(long["term"].to_numpy())
+        new = pd.Index(terms, dtype=object).difference(pd.Index(vocabulary, dtype=object))
+        if len(new):
+            spellings = _spellings(df)
+            vocabulary = np.concatenate([vocabulary, new.to_numpy(dtype=object)])
+            display = np.concatenate([display, spellings.reindex(new).fillna(pd.Series(new, index=new)).to_numpy(dtype=object)])
+        term_ids = pd.Index(vocabulary, dtype=object).get_indexer(terms)[codes]
+        in_keywords = np.concatenate([in_keywords, np.zeros(len(vocabulary) - len(in_keywords), dtype=bool)])
+        in_keywords[term_ids[long["w"].to_numpy() == FIELD_WEIGHTS["Mots_clés"]]] = True
+
+        tf = sp.csr_matrix(
+            (long["w"].to_numpy(dtype=np.float32), (long["doc"].to_numpy(), term_ids)),
+            shape=(len(df), len(vocabulary)),
+        )
+        tf.sum_duplicates()
+        years = df["Année"].to_numpy().astype(np.int16)
+        year_values = np.unique(years)
+        return cls(vocabulary, display, in_keywords, tf, years, year_values, _year_counts(tf, years, year_values))
+
+    @classmethod
+    def build(cls, df):
+        return cls._from_frame(df)
+
+    def extend(self, tail):
+        """Index après ajout des publications de `tail` (lignes ajoutées seulement)."""
+        added = TopicIndex._from_frame(tail, self.vocabulary, self.display, self.in_keywords.copy())
+        n_terms = len(added.vocabulary)
+        old = self.tf.copy()
+        old.resize((old.shape[0], n_terms))
+        tf = sp.vstack([old, added.tf], format="csr")
+
+        year_values = np.union1d(self.year_values, added.year_values)
+        year_counts = np.zeros((len(year_values), n_terms), dtype=np.int32)
+        year_counts[np.ix_(np.searchsorted(year_values, self.year_values), np.arange(len(self.vocabulary)))] += self.year_counts
+        year_counts[np.searchsorted(year_values, added.year_values)] += added.year_counts
+        return TopicIndex(added.vocabulary, added.display, added.in_keywords, tf,
+                          np.concatenate([self.years, added.years]), year_values, year_counts)
+
+    def take(self, rows):
+        """Index restreint aux publications `rows` (positions)."""
+        tf = self.tf[rows]
+        years = self.years[rows]
+        year_values = np.unique(years)
+        return TopicIndex(self.vocabulary, self.display, self.in_keywords, tf, years, year_values,
+                          _year_counts(tf, years, year_values))
+
+    def save(self, path):
+        """Écrit l'index dans `path` (.npz), de façon atomique."""
+        with atomic_path(path, ".tmp.npz") as tmp:
+            np.savez(
+                tmp, vocabulary=self.vocabulary.astype(str), display=self.display.astype(str),
+                in_keywords=self.in_keywords, data=self.tf.data, indices=self.tf.indices, indptr=self.tf.indptr,
+                shape=np.array(self.tf.shape), years=self.years, year_values=self.year_values,
+                year_counts=self.year_counts,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            tf = sp.csr_matrix((z["data"], z["indices"], z["indptr"]), shape=tuple(z["shape"]))
+            return cls(z["vocabulary"].astype(object), z["display"].astype(object), z["in_keywords"], tf,
+                       z["years"], z["year_values"], z["year_counts"])
+
+    @property
+    def n_docs(self):
+        return self.tf.shape[0]
+
+    @cached_property
+    def idf(self):
+        doc_freq = np.bincount(self.tf.indices, minlength=self.tf.shape[1])
+        return np.log((1 + self.n_docs) / (1 + doc_freq)) + 1
+
+    @cached_property
+    def tfidf(self):
+        """Matrice TF-IDF, lignes normalisées (norme euclidienne)."""
+        weighted = (self.tf @ sp.diags(self.idf.astype(np.float32))).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        return (sp.diags(1 / np.maximum(norms, 1e-12)) @ weighted).tocsr()
+
+    def counts(self, rows, years):
+        """Comptages annuels `(publications par année, années × termes)` des publications `rows`.
+
+        `years` est la liste complète des années, absentes comprises.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == self.n_docs and np.isin(self.year_values, years).all():
+            positions = np.searchsorted(self.year_values, years)
+            present = np.isin(years, self.year_values)
+            counts = np.zeros((len(years), len(self.vocabulary)), dtype=np.int32)
+            counts[present] = self.year_counts[positions[present]]
+        else:
+            counts = _year_counts(self.tf[rows], self.years[rows], np.asarray(years))
+        docs = np.bincount(np.searchsorted(years, self.years[rows]), minlength=len(years))
+        return docs, counts
+
+    def salience(self, rows):
+        """Poids TF-IDF cumulé de chaque terme sur les publications `rows`."""
+        return np.asarray(self.tfidf[np.asarray(rows, dtype=np.int64)].sum(axis=0)).ravel()
+
+
+def trends(index, rows, years, recent=2, min_docs=5, keywords_only=True):
+    """Tendance de chaque terme sur les publications `rows` et les années `years`.
+
+    Les `recent` dernières années sont comparées aux précédentes : la
+    croissance est le logarithme du rapport des parts de publications qui
+    emploient le terme. La pente est celle de la part annuelle (en points de
+    pourcentage par an), par moindres carrés. Seuls les termes employés par au
+    moins `min_docs` publications sont gardés, et avec `keywords_only` ceux
+    qui figurent dans des mots-clés.
+    """
+    years = np.asarray(years)
+    docs, counts = index.counts(rows, years)
+    recent = min(recent, len(years) - 1)
+    if recent < 1:
+        return pd.DataFrame(columns=["Terme", "Publications", "Récentes", "Croissance", "Pente", "Saillance", "Tendance"])
+
+    total = counts.sum(axis=0)
+    keep = (total >= min_docs) & (index.in_keywords if keywords_only else True)
+    keep = np.flatnonzero(keep)
+    counts = counts[:, keep]
+
+    recent_counts = counts[-recent:].sum(axis=0)
+    earlier_counts = counts[:-recent].sum(axis=0)
+    recent_docs, earlier_docs = docs[-recent:].sum(), docs[:-recent].sum()
+    growth = (np.log((recent_counts + SMOOTHING) / (recent_docs + SMOOTHING))
+              - np.log((earlier_counts + SMOOTHING) / (earlier_docs + SMOOTHING)))
+
+    share = 100 * counts / np.maximum(docs, 1)[:, None]
+    t = years - years.mean()
+    slope = t @ (share - share.mean(axis=0)) / (t @ t)
+
+    return pd.DataFrame({
+        "Terme": index.display[keep],
+        "Publications": total[keep],
+        "Récentes": recent_counts,
+        "Croissance": growth,
+        "Pente": slope,
+        "Saillance": index.salience(rows)[keep],
+        "Tendance": [list(map(float, column)) for column in np.round(share.T, 2)],
+    })
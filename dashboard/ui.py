@@ -0,0 +1,186 @@
+"""Éléments d'interface Streamlit communs à plusieurs pages."""
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from dashboard import profiling
+from dashboard.data import DATASETS, deduplicate, get_dataset
+from dashboard.monitoring import plotly_chart
+
+# Page affichant les graphiques de chaque type de jeu de données
+PAGES = {
+    "publications": "pages/1_Les publications publiées entre 2019 et 2024.py",
+    "congres": "pages/2_Les communications de congrès.py",
+}
+
+# Clé de `st.session_state` où la page de recherche dépose ses résultats
+SEARCH_FILTER_KEY = "filtre_recherche"
+
+# Clé de `st.session_state` de l'option « doublons écartés », commune aux pages
+DEDUP_KEY = "dedoublonner"
+
+# Sections repliées des pages : leur contenu n'est calculé qu'une fois dépliées
+SECTIONS = ("nuage", "categories", "auteurs", "lieux", "reseau", "doublons")
+
+# Threads construisant les graphiques des pages, partagés par toutes les
+# sessions ; 0 construit chaque graphique à son emplacement, dans l'ordre
+FIGURE_WORKERS = int(os.environ.get("DASHBOARD_FIGURE_WORKERS", 4))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def dataset_key(kind):
+    """Clé de `st.session_state` du jeu de données choisi pour les pages de type `kind`."""
+    return f"jeu_{kind}"
+
+
+def section_key(name):
+    """Clé de `st.session_state` indiquant si la section `name` est dépliée."""
+    return f"section_{name}"
+
+
+def lazy_section(name, label):
+    """Section repliée dont le contenu n'est calculé qu'à l'ouverture.
+
+    Déplier ou replier la section relance la page ; la propriété `open` du
+    conteneur renvoyé indique si son contenu doit être calculé :
+
+        section = lazy_section("nuage", "Nuage de mots")
+        with section:
+            if section.open:
+                ...
+    """
+    return st.expander(label, key=section_key(name), on_change="rerun")
+
+
+def select_dataset(kind):
+    """Jeu de données affiché par une page de type `kind`.
+
+    Quand le registre en déclare plusieurs de ce type, un sélecteur est
+    ajouté à la barre latérale.
+    """
+    names = [name for name, spec in DATASETS.items() if spec.kind == kind]
+    if len(names) > 1:
+        name = st.sidebar.selectbox(
+            "Jeu de données", names, format_func=lambda n: DATASETS[n].label, key=dataset_key(kind)
+        )
+    else:
+        name = names[0]
+    return get_dataset(name)
+
+
+def set_search_filter(ds, query, rows):
+    """Restreint les graphiques de `ds` aux lignes `rows` trouvées par `query`."""
+    st.session_state.setdefault(SEARCH_FILTER_KEY, {})[ds.name] = {
+        "query": query,
+        "version": ds.version,
+        "rows": tuple(int(r) for r in rows),
+    }
+
+
+def apply_search_filter(ds):
+    """Jeu de données à afficher : `ds`, ou les résultats de la dernière recherche.
+
+    Affiche un rappel du filtre actif avec un bouton pour le retirer.
+    """
+    filtre = st.session_state.get(SEARCH_FILTER_KEY, {}).get(ds.name)
+    if not filtre:
+        return ds
+    if filtre["version"] != ds.version:
+        # Les données ont été rechargées depuis la recherche : la relancer
+        rows, _ = ds.search_index.search(filtre["query"])
+        set_search_filter(ds, filtre["query"], rows)
+        filtre = st.session_state[SEARCH_FILTER_KEY][ds.name]
+
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.info(f"🔎 Graphiques restreints aux {len(filtre['rows'])} résultats de la recherche « {filtre['query']} ».")
+    with col2:
+        if st.button("Retirer le filtre", key=f"retirer_filtre_{ds.name}"):
+            del st.session_state[SEARCH_FILTER_KEY][ds.name]
+            st.rerun()
+    return ds.subset(filtre["rows"])
+
+
+def apply_dedup_filter(ds):
+    """Jeu de données à afficher : `ds`, sans ses quasi-doublons si l'option est activée.
+
+    L'option est un interrupteur de la barre latérale qui garde sa valeur
+    d'une page à l'autre. Les doublons sont cherchés dans tous les jeux de
+    données (cf. `dashboard.dedup`) : un travail déjà présent dans un jeu
+    précédent du registre est écarté des comptages de celui-ci.
+    """
+    actif = st.sidebar.toggle(
+        "Dédupliqué", value=st.session_state.get(DEDUP_KEY, False), key=f"option_{DEDUP_KEY}",
+        help="Compter une seule fois les travaux présents plusieurs fois (titres et auteurs quasi identiques).",
+    )
+    st.session_state[DEDUP_KEY] = actif
+    if not actif:
+        return ds
+    view = deduplicate(ds)
+    st.sidebar.caption(f"{len(ds) - len(view)} doublon(s) écarté(s) des comptages.")
+    return view
+
+
+def _figure_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=FIGURE_WORKERS, thread_name_prefix="figures")
+        return _pool
+
+
+class FigureTasks:
+    """Graphiques d'une page construits en parallèle.
+
+    Chaque appel à `plotly` ou `image` réserve un emplacement dans la page à
+    l'endroit courant et confie la construction du graphique au pool de
+    threads ; `render` remplit ensuite les emplacements dans l'ordre où les
+    graphiques sont prêts. Un graphique coûteux (nuage de mots, disposition
+    d'un réseau) ne retarde donc plus les graphiques simples placés au-dessus,
+    et l'exécution de la page dure à peu près autant que son graphique le plus
+    lent. Les constructeurs sont des nœuds de `dashboard.figures` : ils ne
+    lisent que des données partagées en lecture seule.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._session = profiling.session_stats()
+
+    def _run(self, build, args):
+        # Les mesures des threads du pool sont rattachées à la session de la page
+        with profiling.bind_session(self._session):
+            return build(*args)
+
+    def _submit(self, show, build, args):
+        placeholder = st.empty()
+        if FIGURE_WORKERS <= 0:
+            show(placeholder, build(*args))
+            return
+        future = _figure_pool().submit(self._run, build, args)
+        self._pending[future] = (placeholder, show)
+
+    def plotly(self, build, *args, **chart_kwargs):
+        """Graphique Plotly `build(*args)`."""
+        self._submit(lambda target, fig: plotly_chart(fig, target, **chart_kwargs), build, args)
+
+    def image(self, build, *args, empty_message=None):
+        """Image `build(*args)`, ou `empty_message` si elle vaut `None`."""
+        def show(target, image):
+            if image is None:
+                target.info(empty_message)
+            else:
+                target.image(image)
+        self._submit(show, build, args)
+
+    def render(self):
+        """Affiche les graphiques soumis, au fur et à mesure qu'ils sont prêts."""
+        pending = set(self._pending)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                placeholder, show = self._pending.pop(future)
+                show(placeholder, future.result())
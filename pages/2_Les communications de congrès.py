@@ -1,52 +1,50 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import matplotlib.pyplot as plt
-import networkx as nx
-import random
-from matplotlib.animation import FuncAnimation
-from wordcloud import WordCloud
 
-# Utiliser @st.cache_resource pour la mise en cache des données
-@st.cache_resource
-def load_data():
-    return pd.read_csv('data/Donnes_Congres.csv')
+from dashboard import figures
+from dashboard.data import enable_copy_on_write
+from dashboard.monitoring import finish_page, plotly_chart, start_page
+from dashboard.ui import FigureTasks, apply_dedup_filter, apply_search_filter, lazy_section, select_dataset
 
-df = load_data()
+enable_copy_on_write()
+
+# Mesure de l'exécution de la page (barre latérale de débogage : ?debug=1)
+start_page("congres")
+
+# Jeu de données partagé par toutes les sessions du processus (instantané Arrow
+# mappé en mémoire). Chaque graphique est un nœud mis en cache selon ses propres
+# entrées : changer un contrôle ne recalcule que les graphiques qui en dépendent.
+ds = select_dataset("congres")
+# Les bornes du curseur sont celles des données
+premiere, derniere = ds.years[0], ds.years[-1]
 
 # Titre principal de la page
-st.title("📈 Visualisation des communications de congrès entre 2019 et 2024")
+st.title(f"📈 Visualisation des communications de congrès entre {premiere} et {derniere}")
+
+# Restreindre les graphiques aux résultats de la page de recherche, le cas échéant
+ds = apply_search_filter(ds)
+# Écarter les quasi-doublons des comptages si l'option est activée
+ds = apply_dedup_filter(ds)
+
+# Les graphiques sont construits en parallèle et affichés dès qu'ils sont prêts
+# (cf. `FigureTasks`) : chaque appel réserve leur emplacement dans la page
+graphiques = FigureTasks()
 
 # Créer deux colonnes : une pour le premier graphique et l'autre pour le filtre
 col1, col2 = st.columns([3, 1])  # Ratio de largeur de 3 pour la colonne de gauche et 1 pour la colonne de droite
 
 with col2:
     # Créer un slider pour sélectionner la plage d'années
-    annees = st.select_slider('Sélectionnez la plage d\'années', options=list(range(2019, 2025)), value=(2019, 2024))
+    annees = st.select_slider('Sélectionnez la plage d\'années', options=ds.years, value=(premiere, derniere))
 
-# Filtrer les données selon la plage d'années sélectionnée
 annee_debut, annee_fin = annees
-df_filtered = df[(df['Année'] >= annee_debut) & (df['Année'] <= annee_fin)]
 
 with col1:
-    # Calcul de la répartition des types de publications après le filtrage
-    type_counts = df_filtered['Type'].value_counts().reset_index()
-    type_counts.columns = ['Type', 'Nombre de congrès']
-
-    # Création du graphique avec Plotly
-    fig1 = px.bar(type_counts, x='Type', y='Nombre de congrès', 
-                  title=f"Répartition des communications de congrès ({annee_debut} - {annee_fin})",
-                  labels={'Type': 'Type de congrès', 'Nombre de congrès': 'Nombre de congrès'},
-                  color='Type', color_discrete_sequence=px.colors.sequential.Viridis)
-
-    # Affichage du premier graphique dans Streamlit
-    st.plotly_chart(fig1)
-
-# Calcul du cumul des publications par type et année
-df_grouped = df_filtered.groupby(['Année', 'Type']).size().reset_index(name='Nombre de congrès')
-
-# Calcul du cumul des publications par type
-df_grouped['Nombre de congrès cumulées'] = df_grouped.groupby('Type')['Nombre de congrès'].cumsum()
+    # Répartition des communications de congrès sur la plage d'années
+    graphiques.plotly(
+        figures.types_bar, ds, annees,
+        f"Répartition des communications de congrès ({annee_debut} - {annee_fin})",
+        'Type de congrès',
+    )
 
 # Créer deux colonnes pour afficher les graphiques côte à côte
 col3, col4 = st.columns([2, 1])  # Ratio de largeur de 2 pour la colonne de gauche et 1 pour la colonne de droite
@@ -54,379 +52,102 @@ col3, col4 = st.columns([2, 1])  # Ratio de largeur de 2 pour la colonne de gauc
 # Afficher le graphique cumulatif dans la première colonne
 with col3:
     st.subheader(f"Évolution cumulée des congrès de {annee_debut} à {annee_fin}")
-    fig2 = px.line(df_grouped, x="Année", y="Nombre de congrès cumulées", color="Type", 
-                   title=f"Évolution cumulée des congrès par type ({annee_debut} - {annee_fin})", 
-                   labels={'Année': 'Année', 'Nombre de congrès cumulées': 'Nombre de congrès cumulées'})
-
-    # Mettre à jour les axes pour personnaliser les graduations
-    fig2.update_xaxes(dtick=1, tickformat="%Y")
-
-    # Affichage du graphique cumulatif dans Streamlit
-    st.plotly_chart(fig2)
+    graphiques.plotly(
+        figures.types_cumulative, ds, annees,
+        f"Évolution cumulée des congrès par type ({annee_debut} - {annee_fin})"
+    )
 
 # Afficher le graphique en camembert de la répartition des langues dans la deuxième colonne
 with col4:
     st.subheader("Répartition des langues des congrès")
-    langue_counts = df_filtered['Langue'].value_counts()
-
-    # Création du graphique en camembert (pie chart) avec Plotly
-    fig3 = px.pie(langue_counts, names=langue_counts.index, values=langue_counts, 
-                  title='Répartition des langues des congrès', 
-                  color_discrete_sequence=px.colors.sequential.Plasma)
-
-    # Affichage du graphique de répartition des langues
-    st.plotly_chart(fig3)
+    graphiques.plotly(figures.langues_pie, ds, annees, 'Répartition des langues des congrès')
 
 # -------------------------------------------
-# Ajout des graphiques de répartition par famille
-
-# Calcul de la répartition des publications par famille
-famille_counts = df_filtered['Famille'].value_counts().reset_index()
-famille_counts.columns = ['Famille', 'Nombre de congrès']
-
-# Création du graphique de répartition des publications par famille
-fig4 = px.bar(famille_counts, x='Famille', y='Nombre de congrès',
-              title="Répartition des congrès par famille",
-              labels={'Famille': 'Famille', 'Nombre de congrès': 'Nombre de congrès'},
-              color='Famille', color_discrete_sequence=px.colors.sequential.Viridis)
-
-# Affichage du graphique dans Streamlit
-st.plotly_chart(fig4)
-# Assurez-vous que la colonne Date est au format datetime
-df['Date'] = pd.to_datetime(df['Date'], errors='coerce')  # Convertit en datetime et ignore les erreurs
-
-# Filtrer les dates valides
-df_filtered = df.dropna(subset=['Date'])
-
-# Ajouter une colonne 'Année' si nécessaire pour référence
-df_filtered['Année'] = df_filtered['Date'].dt.year
+# Répartition par famille sur la plage d'années (toutes familles)
+graphiques.plotly(figures.familles_bar, ds, annees, (), "Répartition des congrès par famille")
 
 # Interface Streamlit
 st.title("Évolution cumulée des congrès par famille au fil du temps")
 
-# **Filtre sur les familles**  
-familles_uniques = df_filtered['Famille'].unique().tolist()
+# **Filtre sur les familles**
+familles_uniques = figures.familles(ds, annees)
 famille_selectionnee = st.multiselect(
     'Sélectionnez les familles à afficher :',
     options=familles_uniques,
     default=familles_uniques  # Par défaut, toutes les familles sont sélectionnées
 )
+familles = tuple(famille_selectionnee)
 
-# Appliquer le filtre sur les familles sélectionnées
-if famille_selectionnee:
-    df_filtered = df_filtered[df_filtered['Famille'].isin(famille_selectionnee)]
-
-# Calculer le nombre de publications par famille et date
-df_grouped_famille = df_filtered.groupby(['Date', 'Famille']).size().reset_index(name='Nombre de congrès')
-
-# Calculer le nombre de publications cumulées par famille
-df_grouped_famille['Nombre de congrès cumulées'] = df_grouped_famille.groupby('Famille')['Nombre de congrès'].cumsum()
-
-# **Création du graphique de l'évolution cumulée des publications par famille**
-fig5 = px.line(
-    df_grouped_famille, 
-    x="Date",  # Utiliser la date pour l'axe X
-    y="Nombre de congrès cumulées",  # Nombre de publications cumulées pour l'axe Y
-    color="Famille",  # Séparer par famille
-    title="Évolution cumulée des congrès par famille au fil du temps",
-    labels={'Date': 'Date', 'Nombre de congrès cumulées': 'Nombre de congrès cumulées'}
-)
-
-# Personnalisation des axes
-fig5.update_xaxes(
-    tickformat="%Y-%m-%d",  # Afficher les dates au format AAAA-MM-JJ
-    title="Date"
+# **Graphique de l'évolution cumulée des congrès par famille**
+graphiques.plotly(
+    figures.familles_cumulative, ds, annees, familles,
+    "Évolution cumulée des congrès par famille au fil du temps"
 )
 
-# **Affichage du graphique cumulatif dans Streamlit**
-st.plotly_chart(fig5)
-
+# Les sections suivantes sont repliées : leurs graphiques (et les bibliothèques
+# qu'ils importent, comme wordcloud) ne sont calculés qu'une fois dépliées, ce
+# qui avance l'affichage des premiers graphiques de la page
 # ------------------------ Word Cloud ------------------------
-st.subheader("🌐 Nuage de mots (Word Cloud) des mots-clés")
-# Extraire les mots-clés de la colonne 'Mots_clés' et les joindre en une seule chaîne
-mots_cles = ' '.join(df['Mots_clés'].dropna().astype(str))
-
-# Créer un WordCloud
-wordcloud = WordCloud(width=800, height=400, background_color='white').generate(mots_cles)
-
-# Afficher le WordCloud avec matplotlib
-plt.figure(figsize=(10, 5))
-plt.imshow(wordcloud, interpolation='bilinear')
-plt.axis('off')
-st.pyplot(plt)
+nuage = lazy_section("nuage", "🌐 Nuage de mots (Word Cloud) des mots-clés")
+with nuage:
+    if nuage.open:
+        # Image PNG mise en cache : un même filtre n'est dessiné qu'une fois
+        graphiques.image(figures.wordcloud_png, ds, annees, familles,
+                         empty_message="Aucun mot-clé ne correspond aux filtres sélectionnés.")
 
 # ------------------------ Parallel Categories ------------------------
-
-# Ajoutez une colonne 'size' avec les occurrences des combinaisons uniques
-df_filtered['size'] = df_filtered.groupby(['Famille', 'Type', 'Année'])['Famille'].transform('count')
-
-# Créez un dictionnaire de couleurs pour chaque Famille
-palette = px.colors.qualitative.Set2  # Palette de couleurs attrayante
-unique_familles = df_filtered['Famille'].unique()
-color_map = {famille: palette[i % len(palette)] for i, famille in enumerate(unique_familles)}
-
-# Ajoutez une colonne 'color' correspondant à la couleur de chaque 'Famille'
-df_filtered['color'] = df_filtered['Famille'].map(color_map)
-
-# Créez le graphique avec des couleurs cohérentes
-fig = px.parallel_categories(
-    df_filtered,
-    dimensions=['Famille', 'Année', 'Type'],
-    color='color',  # Utilisez la colonne 'color' pour appliquer les couleurs
-    color_continuous_scale=px.colors.sequential.Inferno
-)
-
-# Mise à jour de la mise en page pour cacher la barre de couleur
-fig.update_layout(
-    title_text="Diagramme Parallel Categories : Famille → Type → Année",
-    title_font=dict(size=18, color='rgb(0, 0, 0)', family='Arial, sans-serif'),  # Police du titre plus claire
-    font=dict(size=14, color='rgb(0, 0, 0)', family='Arial, sans-serif'),  # Police des autres textes claire
-    width=2000,  # Augmenter la largeur
-    height=900,  # Augmenter la hauteur
-    coloraxis_showscale=False,  # Cache l'échelle de couleur
-    plot_bgcolor='rgb(255, 255, 255)',  # Fond blanc pour plus de clarté
-    paper_bgcolor='rgb(255, 255, 255)',  # Fond blanc de la page
-    margin=dict(t=40, b=40, l=200, r=20)
-)
-
-# Afficher le graphique Parallel Categories dans Streamlit
-st.plotly_chart(fig)
-
-
-
-
-
-
-
-import pandas as pd
-import plotly.express as px
-import streamlit as st
-
-# Définir la fonction pour analyser les dates
-def parse_date(date_str):
-    if pd.isna(date_str):  # Si la valeur est NaN (NaT), la laisser telle quelle
-        return pd.NaT
-    
-    # Si la valeur est déjà un Timestamp (datetime), la laisser telle quelle
-    if isinstance(date_str, pd.Timestamp):
-        return date_str
-    
-    # Vérifier si la date est une chaîne de caractères avant de tenter de la traiter
-    if isinstance(date_str, str):
-        if len(date_str) == 4 and date_str.isdigit():  # Cas de l'année seule
-            return pd.to_datetime(date_str + "-01-01")
-        
-        # Si la date est au format année-mois (exemple "2020-11"), ajouter le 1er jour du mois
-        if len(date_str) == 7 and date_str[4] == '-' and date_str[:4].isdigit() and date_str[5:].isdigit():
-            return pd.to_datetime(date_str + "-01")
-        
-        # Si la date est déjà complète (exemple "05/07/2022"), tenter de la convertir
-        try:
-            return pd.to_datetime(date_str, dayfirst=True)
-        except:
-            return pd.NaT  # Si la conversion échoue, renvoyer NaT
-    else:
-        return pd.NaT  # Si ce n'est pas une chaîne ou un Timestamp valide, retourner NaT
-
-# Appliquer la fonction à la colonne 'Date'
-df['Date'] = df['Date'].apply(parse_date)
-
-# Créer une liste vide pour stocker les données
-data = []
-
-# Exemple : Parcourir chaque ligne et récupérer les auteurs et les dates
-for _, row in df.iterrows():
-    auteurs_split = row['Auteurs'].split(',')  # Séparer les auteurs (assumé format "Nom, Prénom")
-    for i in range(0, len(auteurs_split), 2):  # Nom et Prénom alternent
-        prenom = auteurs_split[i].strip()
-        nom = auteurs_split[i+1].strip() if i + 1 < len(auteurs_split) else ""
-        auteur = f"{nom} {prenom}"
-        date = row['Date']
-        data.append([auteur, date])
-
-# Convertir en DataFrame
-df_auteurs = pd.DataFrame(data, columns=['Auteur', 'Date'])
-
-# Groupement par Auteur et Date pour compter les occurrences par auteur et par date
-df_grouped = df_auteurs.groupby(['Auteur', 'Date']).size().reset_index(name='Nombre de publications')
-
-# Calculer le nombre cumulatif de publications par auteur
-df_grouped['Nombre de publications cumulées'] = df_grouped.groupby('Auteur')['Nombre de publications'].cumsum()
-
-# Trouver les 10 auteurs les plus fréquents en fonction du nombre total de publications
-top_10_auteurs = df_grouped.groupby('Auteur')['Nombre de publications'].sum().nlargest(10).index
-
-# Filtrer les données pour ne conserver que les 10 auteurs les plus fréquents
-df_top_10 = df_grouped[df_grouped['Auteur'].isin(top_10_auteurs)]
-st.title("Analyse de l'évolution cumulée des publications selon les auteurs")
-# Ajouter une barre de défilement pour choisir le nombre d'auteurs
-number_of_authors = st.slider(
-    "Sélectionner le nombre d'auteurs",
-    min_value=1,
-    max_value=7,  # Ajustez selon vos besoins
-    value=5  # Valeur par défaut
-)
-
-# Trouver les auteurs les plus fréquents en fonction du nombre sélectionné
-top_auteurs_limit = df_grouped.groupby('Auteur')['Nombre de publications'].sum().nlargest(number_of_authors).index
-
-# Filtrer les données en fonction du nombre d'auteurs sélectionnés
-df_selected_authors = df_grouped[df_grouped['Auteur'].isin(top_auteurs_limit)]
-
-# Créer un graphique avec Plotly pour l'évolution cumulée des publications par auteur au fil du temps
-fig = px.line(
-    df_selected_authors, 
-    x="Date",  # Utiliser la date pour l'axe X
-    y="Nombre de publications cumulées",  # Nombre de publications cumulées pour l'axe Y
-    color="Auteur",  # Séparer par auteur
-    title="Évolution cumulée des publications des auteurs au fil du temps",
-    labels={'Date': 'Date', 'Nombre de publications cumulées': 'Nombre de publications cumulées'}
-)
-
-# Personnalisation des axes
-fig.update_xaxes(
-    tickformat="%Y-%m-%d",  # Afficher les dates au format AAAA-MM-JJ
-    title="Date"
-)
-
-# Afficher le graphique
-st.plotly_chart(fig)
-
-
-
-
-
-
-import pandas as pd
-import plotly.express as px
-import streamlit as st
-
-# Définir la fonction pour analyser les dates
-def parse_date(date_str):
-    if pd.isna(date_str):  # Si la valeur est NaN (NaT), la laisser telle quelle
-        return pd.NaT
-    
-    # Si la valeur est déjà un Timestamp (datetime), la laisser telle quelle
-    if isinstance(date_str, pd.Timestamp):
-        return date_str
-    
-    # Vérifier si la date est une chaîne de caractères avant de tenter de la traiter
-    if isinstance(date_str, str):
-        if len(date_str) == 4 and date_str.isdigit():  # Cas de l'année seule
-            return pd.to_datetime(date_str + "-01-01")
-        
-        # Si la date est au format année-mois (exemple "2020-11"), ajouter le 1er jour du mois
-        if len(date_str) == 7 and date_str[4] == '-' and date_str[:4].isdigit() and date_str[5:].isdigit():
-            return pd.to_datetime(date_str + "-01")
-        
-        # Si la date est déjà complète (exemple "05/07/2022"), tenter de la convertir
-        try:
-            return pd.to_datetime(date_str, dayfirst=True)
-        except:
-            return pd.NaT  # Si la conversion échoue, renvoyer NaT
-    else:
-        return pd.NaT  # Si ce n'est pas une chaîne ou un Timestamp valide, retourner NaT
-
-# Appliquer la fonction à la colonne 'Date'
-df['Date'] = df['Date'].apply(parse_date)
-
-# Créer une liste vide pour stocker les données
-data = []
-
-# Exemple : Parcourir chaque ligne et récupérer les lieux et les dates
-for _, row in df.iterrows():
-    lieux_split = row['Lieu'].split(',')  # Séparer les lieux (assumé format "Lieu1, Lieu2, ...")
-    for lieu in lieux_split:  # Parcourir chaque lieu séparé
-        lieu = lieu.strip()  # Nettoyer l'espace
-        date = row['Date']
-        data.append([lieu, date])
-
-# Convertir en DataFrame
-df_lieux = pd.DataFrame(data, columns=['Lieu', 'Date'])
-
-# Exclure les deux lieux spécifiques
-df_lieux = df_lieux[~df_lieux['Lieu'].isin(["IMT École nationale supérieure des Mines d'Albi-Carmaux (IMT Mines Albi)", 
-                                              "Centre Génie Industriel (CGI)"])]
-
-# Groupement par Lieu et Date pour compter les occurrences par lieu et par date
-df_grouped = df_lieux.groupby(['Lieu', 'Date']).size().reset_index(name='Nombre de publications')
-
-# Calculer le nombre cumulatif de publications par lieu
-df_grouped['Nombre de publications cumulées'] = df_grouped.groupby('Lieu')['Nombre de publications'].cumsum()
-
-# Trouver les 10 lieux les plus fréquents en fonction du nombre total de publications
-top_10_lieux = df_grouped.groupby('Lieu')['Nombre de publications'].sum().nlargest(10).index
-
-# Filtrer les données pour ne conserver que les 10 lieux les plus fréquents
-df_top_10 = df_grouped[df_grouped['Lieu'].isin(top_10_lieux)]
-
-# Titre de la section avec Streamlit
-st.title("Analyse de l'évolution cumulée des publications selon les lieux")
-
-# Ajouter une barre de défilement pour choisir le nombre de lieux
-number_of_places = st.slider(
-    "Sélectionner le nombre de lieux",
-    min_value=1,
-    max_value=7,  # Ajustez selon vos besoins
-    value=5  # Valeur par défaut
-)
-
-# Trouver les lieux les plus fréquents en fonction du nombre sélectionné
-top_lieux_limit = df_grouped.groupby('Lieu')['Nombre de publications'].sum().nlargest(number_of_places).index
-
-# Filtrer les données en fonction du nombre de lieux sélectionnés
-df_selected_places = df_grouped[df_grouped['Lieu'].isin(top_lieux_limit)]
-
-# Créer un graphique avec Plotly pour l'évolution cumulée des publications par lieu au fil du temps
-fig = px.line(
-    df_selected_places, 
-    x="Date",  # Utiliser la date pour l'axe X
-    y="Nombre de publications cumulées",  # Nombre de publications cumulées pour l'axe Y
-    color="Lieu",  # Séparer par lieu
-    title="Évolution cumulée des publications des lieux au fil du temps",
-    labels={'Date': 'Date', 'Nombre de publications cumulées': 'Nombre de publications cumulées'},
-    width=5000,  # Largeur du graphique
-    height=450   # Hauteur du graphique
-)
-
-# Personnalisation des axes
-fig.update_xaxes(
-    tickformat="%Y-%m-%d",  # Afficher les dates au format AAAA-MM-JJ
-    title="Date"
-)
-
-# Afficher le graphique
-st.plotly_chart(fig)
-    
-
-
-
-
-
-    # ---------------------- Network Graph ----------------------
-
-# Créez un graphe réseau simple
-G = nx.Graph()
-
-# Ajouter des noeuds pour chaque famille
-for famille in df_filtered['Famille'].unique():
-    G.add_node(famille)
-
-# Ajouter des arêtes entre les familles et les types de congrès
-for _, row in df_filtered.iterrows():
-    G.add_edge(row['Famille'], row['Année'])
-
-# Créez la visualisation du graph
-fig_network = plt.figure(figsize=(10, 8))
-pos = nx.spring_layout(G)  # Positionnement des noeuds
-nx.draw_networkx_nodes(G, pos, node_size=2000, node_color='skyblue', alpha=0.6)
-nx.draw_networkx_edges(G, pos, width=2, alpha=0.5, edge_color='gray')
-nx.draw_networkx_labels(G, pos, font_size=12, font_family='Arial')
-plt.title("Graphique des Relations Congrès - Famille et Type")
-
-st.pyplot(fig_network)
+categories = lazy_section("categories", "🔀 Diagramme Parallel Categories : Famille → Type → Année")
+with categories:
+    if categories.open:
+        graphiques.plotly(figures.parallel_categories, ds, annees, familles)
+
+# Afficher les graphiques ci-dessus au fur et à mesure de leur construction
+graphiques.render()
+
+
+# Les curseurs des sections auteurs et lieux ne relancent que leur fragment
+@st.fragment
+def section_auteurs():
+    # Ajouter une barre de défilement pour choisir le nombre d'auteurs
+    number_of_authors = st.slider(
+        "Sélectionner le nombre d'auteurs",
+        min_value=1,
+        max_value=7,  # Ajustez selon vos besoins
+        value=5  # Valeur par défaut
+    )
+    plotly_chart(figures.authors_cumulative(ds, number_of_authors))
+
+
+@st.fragment
+def section_lieux():
+    # Ajouter une barre de défilement pour choisir le nombre de lieux
+    number_of_places = st.slider(
+        "Sélectionner le nombre de lieux",
+        min_value=1,
+        max_value=7,  # Ajustez selon vos besoins
+        value=5  # Valeur par défaut
+    )
+    plotly_chart(figures.places_cumulative(ds, number_of_places))
+
+
+auteurs = lazy_section("auteurs", "👥 Analyse de l'évolution cumulée des publications selon les auteurs")
+with auteurs:
+    if auteurs.open:
+        section_auteurs()
+
+lieux = lazy_section("lieux", "📍 Analyse de l'évolution cumulée des publications selon les lieux")
+with lieux:
+    if lieux.open:
+        section_lieux()
+
+# ---------------------- Network Graph ----------------------
+reseau = lazy_section("reseau", "🕸️ Graphique des relations Congrès - Famille et Année")
+with reseau:
+    if reseau.open:
+        graphiques.plotly(figures.famille_network, ds, annees, familles)
+graphiques.render()
+
+finish_page()
 
 if st.button("⬅️ Retour à l'accueil"):
     st.switch_page("Application.py")
-
-
@@ -0,0 +1,79 @@
+import streamlit as st
+
+from dashboard.data import DATASETS, enable_copy_on_write, get_dataset, get_duplicates
+from dashboard.monitoring import finish_page, start_page
+from dashboard.ui import PAGES, dataset_key, lazy_section, set_search_filter
+
+enable_copy_on_write()
+
+# Mesure de l'exécution de la page (barre latérale de débogage : ?debug=1)
+start_page("recherche")
+
+# Titre principal de la page
+st.title("🔎 Recherche dans les publications et les communications de congrès")
+
+nom = st.radio(
+    "Rechercher dans :",
+    options=list(DATASETS),
+    format_func=lambda n: DATASETS[n].label,
+    horizontal=True
+)
+ds = get_dataset(nom)
+
+# L'index plein texte est construit une fois par version des données (dashboard/search.py)
+index = ds.search_index
+
+requete = st.text_input(
+    "Mots recherchés dans le titre, le résumé et les mots-clés",
+    placeholder="jumeau numérique, supply chain, hôpital…"
+)
+
+if requete:
+    # Le dernier mot est traité comme un préfixe : « jum » trouve « jumeau »
+    suggestions = index.complete(requete)
+    if suggestions:
+        st.caption("Suggestions : " + ", ".join(suggestions))
+
+    rows, scores = index.search(requete)
+    st.write(f"**{len(rows)}** résultat(s)")
+
+    if len(rows):
+        resultats = ds.frame.iloc[rows][['Titre', 'Année', 'Type', 'Famille', 'Auteurs', 'Lien']]
+        resultats = resultats.assign(Score=scores.round(2))
+        st.dataframe(
+            resultats.head(200),
+            column_config={'Lien': st.column_config.LinkColumn('Lien')},
+            hide_index=True
+        )
+
+        # Les résultats peuvent servir de filtre aux graphiques de la page du jeu de données
+        if st.button("📊 Afficher les graphiques pour ces résultats"):
+            set_search_filter(ds, requete, rows)
+            # La page du jeu de données s'ouvre sur celui-ci
+            st.session_state[dataset_key(ds.spec.kind)] = nom
+            st.switch_page(PAGES[ds.spec.kind])
+
+# ------------------------ Doublons ------------------------
+# Groupes de quasi-doublons (titres et auteurs presque identiques) entre tous
+# les jeux de données, détectés par MinHash et LSH (dashboard/dedup.py)
+doublons = lazy_section("doublons", "🧬 Quasi-doublons entre les publications et les congrès")
+with doublons:
+    if doublons.open:
+        with st.spinner("Recherche des doublons…"):
+            groupes = get_duplicates()
+            tableau = groupes.table({n: get_dataset(n).frame for n in groupes.names})
+        st.caption(
+            f"{groupes.n_groups()} groupe(s) de doublons. Dans chaque groupe, la ligne « conservée » est "
+            "la seule comptée quand l'option « Dédupliqué » de la barre latérale est activée."
+        )
+        tableau = tableau.assign(Jeu=tableau["Jeu"].map(lambda n: DATASETS[n].label))
+        st.dataframe(
+            tableau[['Groupe', 'Jeu', 'Conservée', 'Titre', 'Année', 'Type', 'Auteurs', 'Lien']],
+            column_config={'Lien': st.column_config.LinkColumn('Lien')},
+            hide_index=True
+        )
+
+finish_page()
+
+if st.button("⬅️ Retour à l'accueil"):
+    st.switch_page("Application.py")
@@ -0,0 +1,80 @@
+import streamlit as st
+
+from dashboard import figures
+from dashboard.data import DATASETS, enable_copy_on_write, get_dataset
+from dashboard.monitoring import finish_page, plotly_chart, start_page
+from dashboard.ui import apply_dedup_filter
+
+enable_copy_on_write()
+
+# Mesure de l'exécution de la page (barre latérale de débogage : ?debug=1)
+start_page("coauteurs")
+
+# Titre principal de la page
+st.title("🤝 Réseau des co-auteurs")
+
+nom = st.radio(
+    "Jeu de données :",
+    options=list(DATASETS),
+    format_func=lambda n: DATASETS[n].label,
+    horizontal=True
+)
+# Écarter les quasi-doublons des comptages si l'option est activée
+ds = apply_dedup_filter(get_dataset(nom))
+
+# Réseau construit une fois par version des données (dashboard/coauthors.py)
+with st.spinner("Calcul du réseau de co-signature…"):
+    reseau = ds.coauthors
+
+col1, col2 = st.columns(2)
+col1.metric("Auteurs", f"{reseau.n_authors:,}".replace(",", " "))
+col2.metric("Collaborations", f"{reseau.n_edges:,}".replace(",", " "))
+
+# Ajouter une barre de défilement pour choisir le nombre d'auteurs affichés ;
+# avec 10 auteurs ou moins (petit jeu, vue dédupliquée), ils sont tous affichés
+if reseau.n_authors > 10:
+    nombre_auteurs = st.slider(
+        "Nombre d'auteurs affichés (les plus connectés)",
+        min_value=10,
+        max_value=min(200, reseau.n_authors),
+        value=min(60, reseau.n_authors)
+    )
+else:
+    nombre_auteurs = reseau.n_authors
+
+# Seul l'onglet affiché est calculé : les communautés (Louvain) et
+# l'intermédiarité ne le sont qu'à l'ouverture des onglets qui les montrent
+onglet_reseau, onglet_centralites, onglet_evolution = st.tabs(
+    ["Réseau", "Auteurs les plus connectés", "Évolution"], key="onglet_coauteurs", on_change="rerun"
+)
+
+with onglet_reseau:
+    if onglet_reseau.open:
+        # La disposition d'un même sous-graphe est mise en cache : elle ne « saute » pas
+        with st.spinner("Détection des communautés…"):
+            figure = figures.coauthor_network(ds, nombre_auteurs)
+        plotly_chart(figure)
+        st.caption(f"{reseau.communities.max() + 1 if reseau.n_authors else 0} communautés détectées par la méthode de Louvain.")
+
+with onglet_centralites:
+    if onglet_centralites.open:
+        with st.spinner("Calcul des centralités…"):
+            st.dataframe(
+                figures.coauthor_table(ds, nombre_auteurs),
+                column_config={
+                    "Centralité de degré": st.column_config.NumberColumn(format="%.3f"),
+                    "Intermédiarité": st.column_config.NumberColumn(format="%.3f"),
+                },
+                hide_index=True
+            )
+        st.caption("Intermédiarité estimée à partir d'un échantillon d'auteurs ; communautés détectées par la méthode de Louvain.")
+
+with onglet_evolution:
+    if onglet_evolution.open:
+        # Évolution des collaborations
+        plotly_chart(figures.collaboration_timeline(ds))
+
+finish_page()
+
+if st.button("⬅️ Retour à l'accueil"):
+    st.switch_page("Application.py")
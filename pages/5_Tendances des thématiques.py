@@ -0,0 +1,73 @@
+import streamlit as st
+
+from dashboard import figures
+from dashboard.data import DATASETS, enable_copy_on_write, get_dataset
+from dashboard.monitoring import finish_page, plotly_chart, start_page
+from dashboard.ui import apply_dedup_filter
+
+enable_copy_on_write()
+
+# Mesure de l'exécution de la page (barre latérale de débogage : ?debug=1)
+start_page("thematiques")
+
+# Titre principal de la page
+st.title("🧭 Tendances des thématiques")
+
+nom = st.radio(
+    "Jeu de données :",
+    options=list(DATASETS),
+    format_func=lambda n: DATASETS[n].label,
+    horizontal=True
+)
+# Écarter les quasi-doublons des comptages si l'option est activée
+ds = apply_dedup_filter(get_dataset(nom))
+premiere, derniere = ds.years[0], ds.years[-1]
+
+col1, col2 = st.columns(2)
+with col1:
+    # Créer un slider pour sélectionner la plage d'années
+    annees = st.select_slider('Sélectionnez la plage d\'années', options=ds.years, value=(premiere, derniere))
+    famille = st.selectbox("Famille", ["Toutes les familles"] + figures.familles(ds, annees))
+with col2:
+    recentes = st.slider("Années récentes comparées aux précédentes", min_value=1, max_value=3, value=2)
+    mots_cles = st.checkbox("Seulement les termes présents dans des mots-clés", value=True,
+                            help="Écarte les mots courants des résumés")
+familles = () if famille == "Toutes les familles" else (famille,)
+
+# Index des termes construit une fois par version des données (dashboard/topics.py)
+with st.spinner("Calcul des tendances…"):
+    tendances = figures.topic_trends(ds, annees, familles, recentes, mots_cles)
+
+if tendances.empty:
+    st.info("Il faut au moins deux années et des termes employés par plusieurs publications pour dégager des tendances.")
+else:
+    colonnes = {
+        "Croissance": st.column_config.NumberColumn(format="%.2f", help="Logarithme du rapport des parts récente et antérieure"),
+        "Pente": st.column_config.NumberColumn(format="%.2f", help="Évolution de la part annuelle, en points par an"),
+        "Tendance": st.column_config.LineChartColumn("Part annuelle (%)", y_min=0),
+    }
+    affichees = ["Terme", "Publications", "Récentes", "Croissance", "Pente", "Tendance"]
+
+    col3, col4 = st.columns(2)
+    with col3:
+        st.subheader("📈 Thématiques émergentes")
+        emergentes = tendances.sort_values(["Croissance", "Récentes"], ascending=False).head(15)
+        st.dataframe(emergentes[affichees], column_config=colonnes, hide_index=True)
+    with col4:
+        st.subheader("📉 Thématiques en déclin")
+        declin = tendances.sort_values(["Croissance", "Publications"], ascending=[True, False]).head(15)
+        st.dataframe(declin[affichees], column_config=colonnes, hide_index=True)
+
+    # Comparer l'évolution de quelques termes
+    termes = st.multiselect(
+        "Termes à comparer :",
+        options=tendances.sort_values("Saillance", ascending=False)["Terme"].tolist(),
+        default=emergentes["Terme"].head(5).tolist()
+    )
+    if termes:
+        plotly_chart(figures.topic_lines(ds, annees, familles, recentes, mots_cles, tuple(termes)))
+
+finish_page()
+
+if st.button("⬅️ Retour à l'accueil"):
+    st.switch_page("Application.py")
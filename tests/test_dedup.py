@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.dedup import DuplicateIndex
+
+MINITRACK = "Introduction to the minitrack on Disaster Information, Technology, and Resilience in Digital Government"
+PROCEEDINGS = "Navigating Unpredictability: Collaborative Networks in Non-linear Worlds. Part {}. Albi, France"
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["Titre", "Auteurs", "Année"])
+
+
+def _groups(index, name):
+    return index.groups[index._slice(name)].tolist()
+
+
+def test_cross_source_duplicate():
+    frames = {
+        "publications": _frame([("The RESIIST project: resilience of interconnected infrastructures",
+                                 "Bénaben, Frédérick, Lauras, Matthieu", 2019)]),
+        "congres": _frame([("Resilience of interconnected infrastructures: the RESIIST project",
+                            "Bénaben, Frédérick, Lauras, Matthieu", 2020)]),
+    }
+    index = DuplicateIndex.build(frames)
+    assert _groups(index, "publications") == [0]
+    assert _groups(index, "congres") == [0]
+    assert index.keep("publications").tolist() == [True]
+    assert index.keep("congres").tolist() == [False]
+
+
+def test_yearly_repeats_are_not_chained():
+    authors = "Comes, Tina, Van de Walle, Bartel"
+    frames = {
+        "publications": _frame([(MINITRACK, authors, 2019)]),
+        "congres": _frame([(MINITRACK, authors, year) for year in (2020, 2021, 2022)]),
+    }
+    index = DuplicateIndex.build(frames)
+    # Seule l'édition de l'année suivante, dans l'autre jeu, est un doublon
+    assert _groups(index, "publications") == [0]
+    assert _groups(index, "congres") == [0, -1, -1]
+    assert index.n_groups() == 1
+
+
+def test_same_source_needs_same_year():
+    authors = "Comes, Tina, Van de Walle, Bartel"
+    frames = {"congres": _frame([(MINITRACK, authors, 2019), (MINITRACK, authors, 2020), (MINITRACK, authors, 2020)])}
+    index = DuplicateIndex.build(frames)
+    assert _groups(index, "congres") == [-1, 0, 0]
+
+
+def test_parts_are_distinct():
+    authors = "Camarinha-Matos, Luis, Ortiz, Angel, Boucher, Xavier, Barthe-Delanoë, Anne-Marie"
+    frames = {
+        "publications": _frame([(PROCEEDINGS.format("I"), authors, 2024), (PROCEEDINGS.format("II"), authors, 2024)]),
+        "congres": _frame([(PROCEEDINGS.format("II"), authors, 2024)]),
+    }
+    index = DuplicateIndex.build(frames)
+    assert _groups(index, "publications") == [-1, 0]
+    assert _groups(index, "congres") == [0]
+    assert np.array_equal(index.keep("publications"), [True, True])
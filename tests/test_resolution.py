@@ -0,0 +1,53 @@
+import json
+
+from dashboard.resolution import Lookup, author_blocks, author_display, same_author, segment_authors
+
+
+def _authors(path):
+    return Lookup(path, author_blocks, same_author, author_display)
+
+
+def test_compound_firstname():
+    tokens = ["Vidal", "Jean", "Baptiste", "Martin", "Paul"]
+    known = {("martin", "paul")}
+    assert segment_authors(tokens, known, {"martin"}) == [("Vidal", "Jean Baptiste"), ("Martin", "Paul")]
+
+
+def test_initials_form_a_firstname():
+    tokens = ["Vidal", "J.", "B.", "Martin", "Paul"]
+    assert segment_authors(tokens, set(), set()) == [("Vidal", "J. B."), ("Martin", "Paul")]
+
+
+def test_initial_is_not_followed_by_next_surname():
+    tokens = ["Fontanili", "F.", "Vidal", "Jean", "Baptiste"]
+    assert segment_authors(tokens, set(), set()) == [("Fontanili", "F."), ("Vidal", "Jean Baptiste")]
+
+
+def test_initial_then_surname_without_known_pairs():
+    authors = segment_authors(["Dupont", "J.", "Martin", "Paul", "Durand"], set(), set())
+    assert authors[0] == ("Dupont", "J.")
+    assert all("Martin" not in firstname for _, firstname in authors)
+
+
+def test_known_surname_does_not_extend_firstname():
+    known = {("martin", "paul"), ("durand", "pierre")}
+    authors = segment_authors(["Dupont", "J.", "Martin", "Paul", "Durand"], known, {"martin", "durand"})
+    assert authors == [("Dupont", "J."), ("Martin", "Paul"), ("Durand", "")]
+
+
+def test_lookup_shared_between_processes(tmp_path):
+    # Deux tables ouvertes sur la même base, comme deux processus
+    first, second = _authors(tmp_path / "auteurs.sqlite"), _authors(tmp_path / "auteurs.sqlite")
+    assert first.resolve([("Fontanili", "Franck")]) == ["Franck Fontanili"]
+    assert second.resolve([("Fontanili", "F."), ("Vidal", "Jean")]) == ["Franck Fontanili", "Jean Vidal"]
+    assert set(first.known()) == {("Fontanili", "Franck"), ("Fontanili", "F."), ("Vidal", "Jean")}
+    assert first.variants == second.variants
+    assert _authors(tmp_path / "auteurs.sqlite").canonical == ["Franck Fontanili", "Jean Vidal"]
+
+
+def test_lookup_imports_json_table(tmp_path):
+    saved = {"canonical": ["Franck Fontanili"], "variants": [[["Fontanili", "Franck"], 0]]}
+    (tmp_path / "auteurs.json").write_text(json.dumps(saved), encoding="utf-8")
+    lookup = _authors(tmp_path / "auteurs.sqlite")
+    assert lookup.variants == {("Fontanili", "Franck"): 0}
+    assert lookup.resolve([("Fontanili", "F.")]) == ["Franck Fontanili"]